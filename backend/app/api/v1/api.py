@@ -1,5 +1,6 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import emails, categories, analytics, preferences, summaries
+from app.core.config import settings
+from app.api.v1.endpoints import emails, categories, analytics, preferences, summaries, search, events, debug
 
 api_router = APIRouter()
 
@@ -7,4 +8,9 @@ api_router.include_router(emails.router, prefix="/emails", tags=["emails"])
 api_router.include_router(categories.router, prefix="/categories", tags=["categories"])
 api_router.include_router(summaries.router, prefix="/summaries", tags=["summaries"])
 api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
-api_router.include_router(preferences.router, prefix="/preferences", tags=["preferences"])
\ No newline at end of file
+api_router.include_router(preferences.router, prefix="/preferences", tags=["preferences"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+api_router.include_router(events.router, tags=["events"])
+
+if settings.DEBUG_PERF_ENABLED:
+    api_router.include_router(debug.router, prefix="/debug", tags=["debug"])
@@ -1,34 +1,95 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import select, func, cast, String
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any
 
-from app.core.database import get_db
-from app.models.email import Email
-from app.models.analyzed_content import AnalyzedContent
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.database import read_session_factory, read_your_writes
 from app.models.category import Category
+from app.models.email_rollup import EmailRollup
+from app.services.analysis_cache import analysis_cache
+from app.services.llm_client import llm_client
+from app.services.pre_classifier import pre_classifier
+from app.services.rollups import (
+    truncate,
+    DIMENSION_TOTAL,
+    DIMENSION_CATEGORY,
+    DIMENSION_SENDER_DOMAIN
+)
 
 router = APIRouter()
 
 @router.get("/overview")
 async def get_analytics_overview(
-    db: AsyncSession = Depends(get_db)
+    session_factory: async_sessionmaker = Depends(read_session_factory),
+    fresh: bool = Depends(read_your_writes)
 ) -> Dict[str, Any]:
-    total_emails = await db.scalar(select(func.count(Email.id)))
-    processed_emails = await db.scalar(
-        select(func.count(Email.id)).where(Email.processed == True)
+    return await response_cache.get_or_load(
+        "analytics",
+        "overview",
+        settings.RESPONSE_CACHE_ANALYTICS_TTL,
+        build_analytics_overview,
+        session_factory,
+        bypass=fresh
     )
+
+@router.get("/trends")
+async def get_email_trends(
+    days: int = 30,
+    session_factory: async_sessionmaker = Depends(read_session_factory),
+    fresh: bool = Depends(read_your_writes)
+) -> Dict[str, Any]:
+    return await response_cache.get_or_load(
+        "analytics",
+        f"trends:{days}",
+        settings.RESPONSE_CACHE_ANALYTICS_TTL,
+        lambda db: build_email_trends(db, days),
+        session_factory,
+        bypass=fresh
+    )
+
+@router.get("/analysis-cache")
+async def get_analysis_cache_stats() -> Dict[str, Any]:
+    return analysis_cache.stats()
+
+@router.get("/llm")
+async def get_llm_stats() -> Dict[str, Any]:
+    return llm_client.stats()
+
+@router.get("/pre-classifier")
+async def get_pre_classifier_stats() -> Dict[str, Any]:
+    return pre_classifier.stats()
+
+async def build_analytics_overview(db: AsyncSession) -> Dict[str, Any]:
+    totals = (await db.execute(
+        select(
+            func.coalesce(func.sum(EmailRollup.received), 0).label("received"),
+            func.coalesce(func.sum(EmailRollup.processed), 0).label("processed")
+        )
+        .where(
+            EmailRollup.granularity == "day",
+            EmailRollup.dimension == DIMENSION_TOTAL
+        )
+    )).one()
+    total_emails = totals.received
+    processed_emails = totals.processed
     
-    today = datetime.utcnow().date()
+    today = datetime.now(timezone.utc).date()
     week_ago = today - timedelta(days=7)
     
     emails_this_week = await db.scalar(
-        select(func.count(Email.id))
-        .where(Email.received_at >= week_ago)
+        select(func.coalesce(func.sum(EmailRollup.received), 0))
+        .where(
+            EmailRollup.granularity == "day",
+            EmailRollup.dimension == DIMENSION_TOTAL,
+            EmailRollup.bucket >= datetime.combine(week_ago, datetime.min.time(), tzinfo=timezone.utc)
+        )
     )
     
     category_stats = await get_category_statistics(db)
+    sender_domains = await get_sender_domain_statistics(db)
     
     return {
         "total_emails": total_emails,
@@ -36,24 +97,26 @@ async def get_analytics_overview(
         "processing_rate": (processed_emails / total_emails * 100) if total_emails > 0 else 0,
         "emails_this_week": emails_this_week,
         "category_distribution": category_stats,
+        "top_sender_domains": sender_domains,
         "last_updated": datetime.utcnow().isoformat()
     }
 
-@router.get("/trends")
-async def get_email_trends(
-    days: int = 30,
-    db: AsyncSession = Depends(get_db)
-) -> Dict[str, Any]:
-    start_date = datetime.utcnow() - timedelta(days=days)
+async def build_email_trends(db: AsyncSession, days: int) -> Dict[str, Any]:
+    start_date = datetime.now(timezone.utc) - timedelta(days=days)
+    day = func.date(func.timezone("UTC", EmailRollup.bucket))
     
     daily_counts = await db.execute(
         select(
-            func.date(Email.received_at).label("date"),
-            func.count(Email.id).label("count")
+            day.label("date"),
+            func.sum(EmailRollup.received).label("count")
         )
-        .where(Email.received_at >= start_date)
-        .group_by(func.date(Email.received_at))
-        .order_by(func.date(Email.received_at))
+        .where(
+            EmailRollup.granularity == "hour",
+            EmailRollup.dimension == DIMENSION_TOTAL,
+            EmailRollup.bucket >= truncate(start_date, "hour")
+        )
+        .group_by(day)
+        .order_by(day)
     )
     
     trends = [
@@ -69,14 +132,20 @@ async def get_email_trends(
     }
 
 async def get_category_statistics(db: AsyncSession) -> list:
+    count = func.sum(EmailRollup.processed)
     result = await db.execute(
         select(
             Category.name,
             Category.color,
-            func.count(AnalyzedContent.id).label("count")
+            count.label("count")
+        )
+        .join(EmailRollup, cast(Category.id, String) == EmailRollup.key)
+        .where(
+            EmailRollup.granularity == "day",
+            EmailRollup.dimension == DIMENSION_CATEGORY
         )
-        .join(AnalyzedContent, Category.id == AnalyzedContent.category_id)
         .group_by(Category.id, Category.name, Category.color)
+        .having(count > 0)
     )
     
     return [
@@ -86,4 +155,25 @@ async def get_category_statistics(db: AsyncSession) -> list:
             "count": row.count
         }
         for row in result
-    ]
\ No newline at end of file
+    ]
+
+async def get_sender_domain_statistics(db: AsyncSession, limit: int = 10) -> list:
+    count = func.sum(EmailRollup.received)
+    result = await db.execute(
+        select(EmailRollup.key, count.label("count"))
+        .where(
+            EmailRollup.granularity == "day",
+            EmailRollup.dimension == DIMENSION_SENDER_DOMAIN
+        )
+        .group_by(EmailRollup.key)
+        .order_by(count.desc())
+        .limit(limit)
+    )
+    
+    return [
+        {
+            "domain": row.key,
+            "count": row.count
+        }
+        for row in result
+    ]
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy import select
 from typing import List
 from uuid import UUID
 
-from app.core.database import get_db
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.database import get_db, read_session_factory, read_your_writes
 from app.models.category import Category
 from app.schemas.category import CategoryCreate, CategoryResponse, CategoryUpdate
 
@@ -12,11 +14,18 @@ router = APIRouter()
 
 @router.get("/", response_model=List[CategoryResponse])
 async def get_categories(
-    db: AsyncSession = Depends(get_db)
+    session_factory: async_sessionmaker = Depends(read_session_factory),
+    fresh: bool = Depends(read_your_writes)
 ):
-    result = await db.execute(select(Category))
-    categories = result.scalars().all()
-    return [CategoryResponse.from_orm(cat) for cat in categories]
+    async def load(db: AsyncSession):
+        result = await db.execute(select(Category))
+        categories = result.scalars().all()
+        return [CategoryResponse.from_orm(cat) for cat in categories]
+    
+    return await response_cache.get_or_load(
+        "categories", "all", settings.RESPONSE_CACHE_CATEGORIES_TTL, load, session_factory,
+        bypass=fresh
+    )
 
 @router.post("/", response_model=CategoryResponse)
 async def create_category(
@@ -33,22 +42,30 @@ async def create_category(
     db.add(category)
     await db.commit()
     await db.refresh(category)
+    await response_cache.invalidate("categories", "analytics")
     
     return CategoryResponse.from_orm(category)
 
 @router.get("/{category_id}", response_model=CategoryResponse)
 async def get_category(
     category_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    session_factory: async_sessionmaker = Depends(read_session_factory),
+    fresh: bool = Depends(read_your_writes)
 ):
-    query = select(Category).where(Category.id == category_id)
-    result = await db.execute(query)
-    category = result.scalar_one_or_none()
-    
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
+    async def load(db: AsyncSession):
+        query = select(Category).where(Category.id == category_id)
+        result = await db.execute(query)
+        category = result.scalar_one_or_none()
+        
+        if not category:
+            raise HTTPException(status_code=404, detail="Category not found")
+        
+        return CategoryResponse.from_orm(category)
     
-    return CategoryResponse.from_orm(category)
+    return await response_cache.get_or_load(
+        "categories", str(category_id), settings.RESPONSE_CACHE_CATEGORIES_TTL, load, session_factory,
+        bypass=fresh
+    )
 
 @router.put("/{category_id}", response_model=CategoryResponse)
 async def update_category(
@@ -69,6 +86,7 @@ async def update_category(
     
     await db.commit()
     await db.refresh(category)
+    await response_cache.invalidate("categories", "analytics")
     
     return CategoryResponse.from_orm(category)
 
@@ -86,5 +104,6 @@ async def delete_category(
     
     await db.delete(category)
     await db.commit()
+    await response_cache.invalidate("categories", "analytics")
     
     return {"message": "Category deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,43 @@
+import hmac
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from typing import Dict, Any, Optional
+
+from app.core.config import settings
+from app.core.loop_profiler import loop_profiler
+from app.core.query_profiler import query_profiler
+
+async def require_debug_token(x_debug_token: Optional[str] = Header(None)):
+    if not settings.DEBUG_PERF_TOKEN:
+        if settings.DEBUG:
+            return
+        raise HTTPException(status_code=403, detail="Set DEBUG_PERF_TOKEN to use debug endpoints")
+
+    if not x_debug_token or not hmac.compare_digest(x_debug_token, settings.DEBUG_PERF_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid debug token")
+
+router = APIRouter(dependencies=[Depends(require_debug_token)])
+
+@router.get("/perf")
+async def get_perf(top: Optional[int] = Query(None, ge=1, le=500)) -> Dict[str, Any]:
+    return query_profiler.snapshot(top)
+
+@router.delete("/perf")
+async def reset_perf() -> Dict[str, Any]:
+    query_profiler.reset()
+    return {"reset": True}
+
+@router.get("/perf/profile")
+async def profile_event_loop(
+    seconds: float = Query(5.0, gt=0),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    limit: int = Query(30, ge=1, le=500)
+) -> Dict[str, Any]:
+    if seconds > settings.DEBUG_PROFILE_MAX_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Profiles are limited to {settings.DEBUG_PROFILE_MAX_SECONDS:.0f}s"
+        )
+    if loop_profiler.busy:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+
+    return await loop_profiler.profile(seconds, interval_ms / 1000, limit)
@@ -1,64 +1,128 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
-from typing import List, Optional
+from sqlalchemy.orm import undefer
+from sqlalchemy import select
+from typing import List, Optional, Dict, Any
 from datetime import datetime
 from uuid import UUID
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.core.pagination import apply_keyset, build_page, InvalidCursorError
 from app.models.email import Email
 from app.models.analyzed_content import AnalyzedContent
 from app.schemas.email import EmailCreate, EmailResponse, EmailListResponse
-from app.services.email_processor import EmailProcessor
-from app.services.ai_analyzer import AIAnalyzer
+from app.services.analysis_queue import analysis_queue
+from app.services.email_ingestion import (
+    ingest_emails,
+    submit_email,
+    check_capacity,
+    BackendSaturatedError
+)
 
 router = APIRouter()
 
+EMAIL_LIST_COLUMNS = (
+    Email.id,
+    Email.subject,
+    Email.sender_email,
+    Email.sender_name,
+    Email.received_at,
+    Email.processed,
+    Email.duplicate_of_id
+)
+
 @router.post("/receive", response_model=EmailResponse)
-async def receive_email(
-    email_data: EmailCreate,
-    background_tasks: BackgroundTasks,
+async def receive_email(email_data: EmailCreate):
+    try:
+        await check_capacity()
+    except BackendSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    
+    email = await submit_email(email_data)
+    
+    return EmailResponse.from_orm(email)
+
+@router.post("/receive/batch", response_model=List[EmailResponse])
+async def receive_email_batch(
+    emails_data: List[EmailCreate],
     db: AsyncSession = Depends(get_db)
 ):
-    email = Email(
-        subject=email_data.subject,
-        sender_email=email_data.sender_email,
-        sender_name=email_data.sender_name,
-        raw_content=email_data.raw_content,
-        received_at=datetime.utcnow()
-    )
+    if len(emails_data) > settings.INGEST_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.INGEST_BATCH_MAX_ITEMS} emails"
+        )
     
-    db.add(email)
-    await db.commit()
-    await db.refresh(email)
+    try:
+        await check_capacity()
+    except BackendSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
     
-    background_tasks.add_task(process_email, str(email.id))
+    emails = await ingest_emails(db, emails_data)
     
-    return EmailResponse.from_orm(email)
+    return [EmailResponse.from_orm(email) for email in emails]
 
 @router.get("/", response_model=List[EmailListResponse])
 async def get_emails(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
     processed: Optional[bool] = None,
-    db: AsyncSession = Depends(get_db)
+    include_duplicates: bool = True,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = select(Email).offset(skip).limit(limit)
+    query = select(*EMAIL_LIST_COLUMNS)
     
     if processed is not None:
         query = query.where(Email.processed == processed)
     
-    result = await db.execute(query.order_by(Email.received_at.desc()))
-    emails = result.scalars().all()
+    if not include_duplicates:
+        query = query.where(Email.duplicate_of_id.is_(None))
+    
+    if skip and not cursor:
+        query = query.order_by(Email.received_at.desc()).offset(skip).limit(limit)
+        result = await db.execute(query)
+        return [EmailListResponse.from_orm(row) for row in result.all()]
+    
+    try:
+        query = apply_keyset(
+            query,
+            [Email.received_at, Email.id],
+            [datetime, UUID],
+            cursor,
+            limit
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return [EmailListResponse.from_orm(email) for email in emails]
+    result = await db.execute(query)
+    rows, next_cursor = build_page(
+        result.all(),
+        limit,
+        key=lambda row: (row.received_at, row.id)
+    )
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    return [EmailListResponse.from_orm(row) for row in rows]
+
+@router.get("/queue/stats")
+async def get_queue_stats() -> Dict[str, Any]:
+    return await analysis_queue.stats()
 
 @router.get("/{email_id}", response_model=EmailResponse)
 async def get_email(
     email_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = select(Email).where(Email.id == email_id)
+    query = (
+        select(Email)
+        .where(Email.id == email_id)
+        .options(undefer(Email.raw_content))
+    )
     result = await db.execute(query)
     email = result.scalar_one_or_none()
     
@@ -70,40 +134,13 @@ async def get_email(
 @router.post("/{email_id}/analyze")
 async def analyze_email(
     email_id: UUID,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
-    query = select(Email).where(Email.id == email_id)
-    result = await db.execute(query)
-    email = result.scalar_one_or_none()
+    exists = await db.scalar(select(Email.id).where(Email.id == email_id))
     
-    if not email:
+    if not exists:
         raise HTTPException(status_code=404, detail="Email not found")
     
-    background_tasks.add_task(process_email, str(email_id))
+    await analysis_queue.requeue_dead(str(email_id))
     
     return {"message": "Email analysis started", "email_id": str(email_id)}
-
-async def process_email(email_id: str):
-    async with AsyncSessionLocal() as db:
-        processor = EmailProcessor()
-        analyzer = AIAnalyzer()
-        
-        query = select(Email).where(Email.id == UUID(email_id))
-        result = await db.execute(query)
-        email = result.scalar_one_or_none()
-        
-        if email:
-            processed_content = await processor.process(email.raw_content)
-            analysis_result = await analyzer.analyze(
-                subject=email.subject,
-                sender=email.sender_email,
-                content=processed_content
-            )
-            
-            await db.execute(
-                update(Email)
-                .where(Email.id == UUID(email_id))
-                .values(processed=True)
-            )
-            await db.commit()
\ No newline at end of file
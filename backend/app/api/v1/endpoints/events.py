@@ -0,0 +1,61 @@
+import json
+from typing import Optional
+from fastapi import APIRouter, Header, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.services.event_bus import event_bus, Subscriber
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.websocket("/ws/feed")
+async def websocket_feed(
+    websocket: WebSocket,
+    last_event_id: Optional[str] = None
+):
+    await websocket.accept()
+    subscriber = Subscriber(settings.EVENT_STREAM_BUFFER_SIZE)
+
+    try:
+        async for event in event_bus.events(
+            subscriber,
+            last_event_id=last_event_id,
+            heartbeat=settings.EVENT_STREAM_HEARTBEAT
+        ):
+            await websocket.send_json(event or {"type": "heartbeat"})
+    except WebSocketDisconnect:
+        return
+    except Exception as e:
+        logger.info(f"Event feed websocket closed: {e}")
+        return
+
+    if subscriber.overflowed:
+        await websocket.close(code=1013, reason="Subscriber too slow, resume with last_event_id")
+
+@router.get("/events/feed")
+async def sse_feed(
+    last_event_id: Optional[str] = None,
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    subscriber = Subscriber(settings.EVENT_STREAM_BUFFER_SIZE)
+
+    async def stream():
+        yield f"retry: {settings.EVENT_STREAM_RETRY_MS}\n\n"
+        async for event in event_bus.events(
+            subscriber,
+            last_event_id=last_event_id_header or last_event_id,
+            heartbeat=settings.EVENT_STREAM_HEARTBEAT
+        ):
+            if event is None:
+                yield ": heartbeat\n\n"
+                continue
+            yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
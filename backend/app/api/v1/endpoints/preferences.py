@@ -3,31 +3,36 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from uuid import UUID
 
-from app.core.database import get_db
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.database import get_db, read_your_writes
 from app.models.user_preference import UserPreference
 from app.schemas.preference import PreferenceCreate, PreferenceResponse, PreferenceUpdate
 
 router = APIRouter()
 
 @router.get("/", response_model=PreferenceResponse)
-async def get_preferences(
-    db: AsyncSession = Depends(get_db)
-):
-    result = await db.execute(select(UserPreference).limit(1))
-    preference = result.scalar_one_or_none()
-    
-    if not preference:
-        preference = UserPreference(
-            layout_preference="newspaper",
-            theme="light",
-            category_weights={},
-            notification_settings={}
-        )
-        db.add(preference)
-        await db.commit()
-        await db.refresh(preference)
+async def get_preferences(fresh: bool = Depends(read_your_writes)):
+    async def load(db: AsyncSession):
+        result = await db.execute(select(UserPreference).limit(1))
+        preference = result.scalar_one_or_none()
+        
+        if not preference:
+            preference = UserPreference(
+                layout_preference="newspaper",
+                theme="light",
+                category_weights={},
+                notification_settings={}
+            )
+            db.add(preference)
+            await db.commit()
+            await db.refresh(preference)
+        
+        return PreferenceResponse.from_orm(preference)
     
-    return PreferenceResponse.from_orm(preference)
+    return await response_cache.get_or_load(
+        "preferences", "current", settings.RESPONSE_CACHE_PREFERENCES_TTL, load, bypass=fresh
+    )
 
 @router.put("/", response_model=PreferenceResponse)
 async def update_preferences(
@@ -47,5 +52,6 @@ async def update_preferences(
     
     await db.commit()
     await db.refresh(preference)
+    await response_cache.invalidate("preferences")
     
     return PreferenceResponse.from_orm(preference)
\ No newline at end of file
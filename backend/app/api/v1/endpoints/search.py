@@ -0,0 +1,117 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from typing import Optional
+from datetime import date, datetime, timedelta, timezone
+from uuid import UUID
+
+from app.core.database import get_read_db
+from app.core.pagination import apply_keyset, build_page, InvalidCursorError
+from app.models.email import Email
+from app.models.analyzed_content import AnalyzedContent, SEARCH_CONFIG
+from app.models.category import Category
+from app.schemas.search import SearchHit, SearchResponse
+
+router = APIRouter()
+
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+
+def sender_filter(sender: str):
+    sender = sender.lower()
+    if "@" in sender:
+        return func.lower(Email.sender_email) == sender
+    return func.lower(Email.sender_email).endswith(f"@{sender}", autoescape=True)
+
+@router.get("/", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    category: Optional[str] = None,
+    sender: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    sort: str = Query("relevance", pattern="^(relevance|recent)$"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    rank = func.ts_rank_cd(AnalyzedContent.search_vector, ts_query)
+    
+    matches = (
+        select(
+            AnalyzedContent.id.label("id"),
+            Email.received_at.label("received_at"),
+            rank.label("rank")
+        )
+        .join(Email, Email.id == AnalyzedContent.email_id)
+        .where(AnalyzedContent.search_vector.op("@@")(ts_query))
+    )
+    
+    if category:
+        matches = matches.join(Category, Category.id == AnalyzedContent.category_id).where(
+            func.upper(Category.name) == category.upper()
+        )
+    if sender:
+        matches = matches.where(sender_filter(sender))
+    if date_from:
+        matches = matches.where(Email.received_at >= datetime.combine(date_from, datetime.min.time(), tzinfo=timezone.utc))
+    if date_to:
+        matches = matches.where(
+            Email.received_at < datetime.combine(date_to + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+        )
+    
+    if sort == "recent":
+        sort_columns, sort_types = [Email.received_at, AnalyzedContent.id], [datetime, UUID]
+    else:
+        sort_columns, sort_types = [rank, AnalyzedContent.id], [float, UUID]
+    
+    try:
+        matches = apply_keyset(matches, sort_columns, sort_types, cursor, limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    page = matches.subquery()
+    query = (
+        select(
+            AnalyzedContent.id,
+            AnalyzedContent.email_id,
+            Email.subject,
+            Email.sender_email,
+            Email.received_at,
+            Category.name.label("category"),
+            AnalyzedContent.importance_score,
+            AnalyzedContent.title_optimized,
+            func.ts_headline(
+                SEARCH_CONFIG,
+                func.coalesce(AnalyzedContent.title_optimized, ""),
+                ts_query,
+                HEADLINE_OPTIONS
+            ).label("title_highlight"),
+            func.ts_headline(
+                SEARCH_CONFIG,
+                func.coalesce(AnalyzedContent.summary, ""),
+                ts_query,
+                HEADLINE_OPTIONS
+            ).label("summary_highlight"),
+            page.c.rank
+        )
+        .join(page, page.c.id == AnalyzedContent.id)
+        .join(Email, Email.id == AnalyzedContent.email_id)
+        .outerjoin(Category, Category.id == AnalyzedContent.category_id)
+    )
+    
+    if sort == "recent":
+        query = query.order_by(page.c.received_at.desc(), page.c.id.desc())
+        key = lambda row: (row.received_at, row.id)
+    else:
+        query = query.order_by(page.c.rank.desc(), page.c.id.desc())
+        key = lambda row: (row.rank, row.id)
+    
+    result = await db.execute(query)
+    rows, next_cursor = build_page(result.all(), limit, key)
+    
+    return SearchResponse(
+        query=q,
+        items=[SearchHit(**row._mapping) for row in rows],
+        next_cursor=next_cursor
+    )
@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy import select
 from typing import Optional
 from datetime import date, datetime
 from uuid import UUID
 
-from app.core.database import get_db
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_db, read_session_factory, read_your_writes
 from app.models.daily_summary import DailySummary
 from app.schemas.summary import DailySummaryResponse
 from app.services.summary_generator import SummaryGenerator
@@ -15,31 +17,41 @@ router = APIRouter()
 @router.get("/daily", response_model=DailySummaryResponse)
 async def get_daily_summary(
     summary_date: Optional[date] = None,
-    db: AsyncSession = Depends(get_db)
+    session_factory: async_sessionmaker = Depends(read_session_factory),
+    fresh: bool = Depends(read_your_writes)
 ):
     if not summary_date:
         summary_date = datetime.utcnow().date()
     
-    query = select(DailySummary).where(DailySummary.date == summary_date)
-    result = await db.execute(query)
-    summary = result.scalar_one_or_none()
-    
-    if not summary:
-        generator = SummaryGenerator()
-        summary = await generator.generate_daily_summary(summary_date, db)
+    async def load(db: AsyncSession):
+        query = select(DailySummary).where(DailySummary.date == summary_date)
+        result = await db.execute(query)
+        summary = result.scalar_one_or_none()
+        
+        if not summary:
+            generator = SummaryGenerator()
+            async with AsyncSessionLocal() as primary:
+                summary = await generator.generate_daily_summary(summary_date, primary)
+        
+        return DailySummaryResponse.from_orm(summary)
     
-    return DailySummaryResponse.from_orm(summary)
+    return await response_cache.get_or_load(
+        "summaries", str(summary_date), settings.RESPONSE_CACHE_SUMMARIES_TTL, load, session_factory,
+        bypass=fresh
+    )
 
 @router.post("/generate")
 async def generate_summary(
     summary_date: Optional[date] = None,
+    rebuild: bool = False,
     db: AsyncSession = Depends(get_db)
 ):
     if not summary_date:
         summary_date = datetime.utcnow().date()
     
     generator = SummaryGenerator()
-    summary = await generator.generate_daily_summary(summary_date, db)
+    summary = await generator.generate_daily_summary(summary_date, db, rebuild=rebuild)
+    await response_cache.invalidate("summaries")
     
     return {
         "message": "Summary generated successfully",
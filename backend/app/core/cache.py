@@ -0,0 +1,206 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from fastapi.encoders import jsonable_encoder
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis import redis_client
+import logging
+
+logger = logging.getLogger(__name__)
+
+LOCK_POLL_INTERVAL = 0.05
+
+Loader = Callable[[AsyncSession], Awaitable[Any]]
+
+class ResponseCache:
+    def __init__(
+        self,
+        redis: Redis,
+        max_entries: int,
+        local_ttl: float,
+        lock_timeout: float,
+        prefix: str = "response_cache"
+    ):
+        self.redis = redis
+        self.max_entries = max_entries
+        self.local_ttl = local_ttl
+        self.lock_timeout = lock_timeout
+        self.prefix = prefix
+        self._local: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._generations: Dict[str, int] = {}
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        key: str,
+        ttl: int,
+        loader: Loader,
+        session_factory: Optional[async_sessionmaker] = None,
+        bypass: bool = False
+    ) -> Any:
+        session_factory = session_factory or AsyncSessionLocal
+        if bypass or not settings.RESPONSE_CACHE_ENABLED:
+            return await self._run_loader(loader, session_factory)
+
+        local_key = f"{namespace}:{key}"
+        entry = self._local.get(local_key)
+        if entry is not None:
+            expires_at, _, value = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(local_key)
+                return value
+            del self._local[local_key]
+
+        task = self._inflight.get(local_key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(namespace, key, ttl, loader, session_factory))
+            self._inflight[local_key] = task
+            task.add_done_callback(lambda done: self._forget(local_key, done))
+
+        return await asyncio.shield(task)
+
+    async def invalidate(self, *namespaces: str):
+        for namespace in namespaces:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        for local_key in [
+            local_key for local_key, (_, namespace, _) in self._local.items()
+            if namespace in namespaces
+        ]:
+            del self._local[local_key]
+        for local_key in [
+            local_key for local_key in self._inflight
+            if local_key.split(":", 1)[0] in namespaces
+        ]:
+            del self._inflight[local_key]
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for namespace in namespaces:
+                    pipe.incr(self._version_key(namespace))
+                    pipe.set(
+                        self._recent_write_key(namespace), "1",
+                        ex=max(int(settings.DB_READ_YOUR_WRITES_SECONDS), 1)
+                    )
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Response cache invalidation failed for {namespaces}: {e}")
+
+    async def _load(
+        self,
+        namespace: str,
+        key: str,
+        ttl: int,
+        loader: Loader,
+        session_factory: async_sessionmaker
+    ) -> Any:
+        generation = self._generations.get(namespace, 0)
+        try:
+            version, recent_write = await self.redis.mget(
+                self._version_key(namespace), self._recent_write_key(namespace)
+            )
+        except Exception as e:
+            logger.warning(f"Response cache lookup failed: {e}")
+            return jsonable_encoder(await self._run_loader(loader, session_factory))
+
+        if recent_write:
+            session_factory = AsyncSessionLocal
+        redis_key = f"{self.prefix}:{namespace}:{version or '0'}:{key}"
+        value = await self._get_shared(redis_key)
+        if value is not None:
+            self._set_local(namespace, key, ttl, value, generation)
+            return value
+
+        lock_key = f"{redis_key}:lock"
+        acquired = await self._acquire(lock_key)
+        if not acquired:
+            value = await self._wait_for_value(redis_key)
+            if value is not None:
+                self._set_local(namespace, key, ttl, value, generation)
+                return value
+
+        try:
+            value = jsonable_encoder(await self._run_loader(loader, session_factory))
+            await self._set_shared(redis_key, value, ttl)
+        finally:
+            if acquired:
+                await self._release(lock_key)
+
+        self._set_local(namespace, key, ttl, value, generation)
+        return value
+
+    async def _run_loader(self, loader: Loader, session_factory: async_sessionmaker) -> Any:
+        async with session_factory() as db:
+            return await loader(db)
+
+    async def _get_shared(self, redis_key: str) -> Optional[Any]:
+        try:
+            raw = await self.redis.get(redis_key)
+        except Exception as e:
+            logger.warning(f"Response cache lookup failed: {e}")
+            return None
+
+        return json.loads(raw) if raw is not None else None
+
+    async def _set_shared(self, redis_key: str, value: Any, ttl: int):
+        try:
+            await self.redis.set(redis_key, json.dumps(value), ex=ttl)
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    async def _acquire(self, lock_key: str) -> bool:
+        try:
+            return bool(await self.redis.set(
+                lock_key, "1", nx=True, px=int(self.lock_timeout * 1000)
+            ))
+        except Exception as e:
+            logger.warning(f"Response cache lock failed: {e}")
+            return False
+
+    async def _release(self, lock_key: str):
+        try:
+            await self.redis.delete(lock_key)
+        except Exception as e:
+            logger.warning(f"Response cache unlock failed: {e}")
+
+    async def _wait_for_value(self, redis_key: str) -> Optional[Any]:
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            value = await self._get_shared(redis_key)
+            if value is not None:
+                return value
+        return None
+
+    def _set_local(self, namespace: str, key: str, ttl: int, value: Any, generation: int):
+        if self._generations.get(namespace, 0) != generation:
+            return
+
+        local_key = f"{namespace}:{key}"
+        self._local[local_key] = (time.monotonic() + min(ttl, self.local_ttl), namespace, value)
+        self._local.move_to_end(local_key)
+
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    def _forget(self, local_key: str, task: asyncio.Task):
+        if self._inflight.get(local_key) is task:
+            del self._inflight[local_key]
+
+    def _version_key(self, namespace: str) -> str:
+        return f"{self.prefix}:version:{namespace}"
+
+    def _recent_write_key(self, namespace: str) -> str:
+        return f"{self.prefix}:recent_write:{namespace}"
+
+response_cache = ResponseCache(
+    redis_client,
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    local_ttl=settings.RESPONSE_CACHE_LOCAL_TTL,
+    lock_timeout=settings.RESPONSE_CACHE_LOCK_TIMEOUT
+)
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field, validator
-from typing import List, Optional
+from typing import Dict, List, Optional
 import os
 from pathlib import Path
 
@@ -11,6 +11,19 @@ class Settings(BaseSettings):
     
     DATABASE_URL: str = Field(..., env="DATABASE_URL")
     NEON_DATABASE_URL: Optional[str] = Field(None, env="NEON_DATABASE_URL")
+    DATABASE_READ_URL: Optional[str] = Field(None, env="DATABASE_READ_URL")
+    DB_POOL_SIZE: int = Field(default=10, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(default=10, env="DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT: float = Field(default=30.0, env="DB_POOL_TIMEOUT")
+    DB_POOL_RECYCLE: int = Field(default=1800, env="DB_POOL_RECYCLE")
+    DB_POOL_PRE_PING: bool = Field(default=True, env="DB_POOL_PRE_PING")
+    DB_STATEMENT_CACHE_MODE: str = Field(
+        default="auto",
+        pattern="^(auto|prepared|pgbouncer)$",
+        env="DB_STATEMENT_CACHE_MODE"
+    )
+    DB_STATEMENT_CACHE_SIZE: int = Field(default=100, env="DB_STATEMENT_CACHE_SIZE")
+    DB_READ_YOUR_WRITES_SECONDS: float = Field(default=5.0, env="DB_READ_YOUR_WRITES_SECONDS")
     
     OPENROUTER_API_KEY: str = Field(..., env="OPENROUTER_API_KEY")
     OPENROUTER_BASE_URL: str = Field(
@@ -18,9 +31,118 @@ class Settings(BaseSettings):
         env="OPENROUTER_BASE_URL"
     )
     
+    LLM_REQUESTS_PER_MINUTE: int = Field(default=120, env="LLM_REQUESTS_PER_MINUTE")
+    LLM_TOKENS_PER_MINUTE: int = Field(default=200_000, env="LLM_TOKENS_PER_MINUTE")
+    LLM_MAX_RETRIES: int = Field(default=3, env="LLM_MAX_RETRIES")
+    LLM_RETRY_BASE_DELAY: float = Field(default=0.5, env="LLM_RETRY_BASE_DELAY")
+    LLM_RETRY_MAX_DELAY: float = Field(default=20.0, env="LLM_RETRY_MAX_DELAY")
+    LLM_REQUEST_TIMEOUT: float = Field(default=30.0, env="LLM_REQUEST_TIMEOUT")
+    LLM_HEDGE_MODEL: Optional[str] = Field(default=None, env="LLM_HEDGE_MODEL")
+    LLM_HEDGE_MIN_SAMPLES: int = Field(default=20, env="LLM_HEDGE_MIN_SAMPLES")
+    LLM_HEDGE_MIN_DELAY: float = Field(default=1.0, env="LLM_HEDGE_MIN_DELAY")
+    LLM_BREAKER_FAILURE_THRESHOLD: int = Field(default=5, env="LLM_BREAKER_FAILURE_THRESHOLD")
+    LLM_BREAKER_RESET_TIMEOUT: float = Field(default=30.0, env="LLM_BREAKER_RESET_TIMEOUT")
+    LLM_STATS_WINDOW: int = Field(default=500, env="LLM_STATS_WINDOW")
+    
+    HTTP_CLIENT_HTTP2: bool = Field(default=True, env="HTTP_CLIENT_HTTP2")
+    HTTP_CLIENT_MAX_CONNECTIONS: int = Field(default=100, env="HTTP_CLIENT_MAX_CONNECTIONS")
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = Field(
+        default=20,
+        env="HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS"
+    )
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = Field(default=30.0, env="HTTP_CLIENT_KEEPALIVE_EXPIRY")
+    HTTP_CLIENT_CONNECT_TIMEOUT: float = Field(default=5.0, env="HTTP_CLIENT_CONNECT_TIMEOUT")
+    HTTP_CLIENT_READ_TIMEOUT: float = Field(default=30.0, env="HTTP_CLIENT_READ_TIMEOUT")
+    HTTP_CLIENT_WRITE_TIMEOUT: float = Field(default=10.0, env="HTTP_CLIENT_WRITE_TIMEOUT")
+    HTTP_CLIENT_POOL_TIMEOUT: float = Field(default=5.0, env="HTTP_CLIENT_POOL_TIMEOUT")
+    
+    ANALYSIS_BATCH_ENABLED: bool = Field(default=False, env="ANALYSIS_BATCH_ENABLED")
+    ANALYSIS_BATCH_MAX_SIZE: int = Field(default=8, env="ANALYSIS_BATCH_MAX_SIZE")
+    ANALYSIS_BATCH_TOKEN_BUDGET: int = Field(default=12000, env="ANALYSIS_BATCH_TOKEN_BUDGET")
+    ANALYSIS_BATCH_OUTPUT_TOKENS_PER_EMAIL: int = Field(
+        default=1500,
+        env="ANALYSIS_BATCH_OUTPUT_TOKENS_PER_EMAIL"
+    )
+    ANALYSIS_BATCH_MAX_OUTPUT_TOKENS: int = Field(
+        default=8000,
+        env="ANALYSIS_BATCH_MAX_OUTPUT_TOKENS"
+    )
+    
+    ANALYSIS_PROMPT_VARIANT: str = Field(
+        default="slim",
+        pattern="^(full|slim)$",
+        env="ANALYSIS_PROMPT_VARIANT"
+    )
+    
+    ANALYSIS_CONTENT_TOKEN_BUDGET: int = Field(default=800, env="ANALYSIS_CONTENT_TOKEN_BUDGET")
+    ANALYSIS_CONTENT_TOKEN_BUDGETS: Dict[str, int] = Field(
+        default_factory=dict,
+        env="ANALYSIS_CONTENT_TOKEN_BUDGETS"
+    )
+    CONTENT_REDUCER_ENCODING: str = Field(default="cl100k_base", env="CONTENT_REDUCER_ENCODING")
+    TIKTOKEN_CACHE_DIR: str = Field(default="data/tiktoken", env="TIKTOKEN_CACHE_DIR")
+    
+    ANALYSIS_CACHE_ENABLED: bool = Field(default=True, env="ANALYSIS_CACHE_ENABLED")
+    ANALYSIS_CACHE_TTL: int = Field(default=7 * 24 * 3600, env="ANALYSIS_CACHE_TTL")
+    ANALYSIS_CACHE_MAX_ENTRIES: int = Field(default=1024, env="ANALYSIS_CACHE_MAX_ENTRIES")
+    
+    DEDUP_ENABLED: bool = Field(default=True, env="DEDUP_ENABLED")
+    DEDUP_THRESHOLD: float = Field(default=0.75, env="DEDUP_THRESHOLD")
+    DEDUP_NUM_PERM: int = Field(default=32, env="DEDUP_NUM_PERM")
+    DEDUP_BANDS: int = Field(default=16, env="DEDUP_BANDS")
+    DEDUP_WINDOW: int = Field(default=7 * 24 * 3600, env="DEDUP_WINDOW")
+    DEDUP_MIN_TOKENS: int = Field(default=20, env="DEDUP_MIN_TOKENS")
+    DEDUP_MAX_CANDIDATES: int = Field(default=64, env="DEDUP_MAX_CANDIDATES")
+    
+    PRE_CLASSIFIER_ENABLED: bool = Field(default=True, env="PRE_CLASSIFIER_ENABLED")
+    PRE_CLASSIFIER_MODEL_PATH: str = Field(
+        default="data/pre_classifier.json.gz",
+        env="PRE_CLASSIFIER_MODEL_PATH"
+    )
+    PRE_CLASSIFIER_MIN_CONFIDENCE: float = Field(default=0.9, env="PRE_CLASSIFIER_MIN_CONFIDENCE")
+    PRE_CLASSIFIER_MAX_LOCAL_IMPORTANCE: int = Field(default=4, env="PRE_CLASSIFIER_MAX_LOCAL_IMPORTANCE")
+    PRE_CLASSIFIER_AUDIT_RATE: float = Field(default=0.05, env="PRE_CLASSIFIER_AUDIT_RATE")
+    
+    RESPONSE_CACHE_ENABLED: bool = Field(default=True, env="RESPONSE_CACHE_ENABLED")
+    RESPONSE_CACHE_LOCAL_TTL: float = Field(default=5.0, env="RESPONSE_CACHE_LOCAL_TTL")
+    RESPONSE_CACHE_MAX_ENTRIES: int = Field(default=256, env="RESPONSE_CACHE_MAX_ENTRIES")
+    RESPONSE_CACHE_LOCK_TIMEOUT: float = Field(default=10.0, env="RESPONSE_CACHE_LOCK_TIMEOUT")
+    RESPONSE_CACHE_CATEGORIES_TTL: int = Field(default=600, env="RESPONSE_CACHE_CATEGORIES_TTL")
+    RESPONSE_CACHE_SUMMARIES_TTL: int = Field(default=300, env="RESPONSE_CACHE_SUMMARIES_TTL")
+    RESPONSE_CACHE_PREFERENCES_TTL: int = Field(default=600, env="RESPONSE_CACHE_PREFERENCES_TTL")
+    RESPONSE_CACHE_ANALYTICS_TTL: int = Field(default=60, env="RESPONSE_CACHE_ANALYTICS_TTL")
+    
+    EMAIL_PROCESSOR_EXECUTOR: str = Field(
+        default="process",
+        pattern="^(process|thread|inline)$",
+        env="EMAIL_PROCESSOR_EXECUTOR"
+    )
+    EMAIL_PROCESSOR_WORKERS: int = Field(default=2, env="EMAIL_PROCESSOR_WORKERS")
+    EMAIL_PROCESSOR_TIMEOUT: float = Field(default=10.0, env="EMAIL_PROCESSOR_TIMEOUT")
+    EMAIL_PROCESSOR_MAX_INPUT_CHARS: int = Field(
+        default=2_000_000,
+        env="EMAIL_PROCESSOR_MAX_INPUT_CHARS"
+    )
+    HTML_CLEANER_ENGINE: str = Field(
+        default="lxml",
+        pattern="^(lxml|html2text)$",
+        env="HTML_CLEANER_ENGINE"
+    )
+    
     SMTP_HOST: str = Field(default="0.0.0.0", env="SMTP_HOST")
     SMTP_PORT: int = Field(default=2525, env="SMTP_PORT")
     ALLOWED_SENDERS: List[str] = Field(default_factory=list, env="ALLOWED_SENDERS")
+    SMTP_INGEST_MODE: str = Field(default="http", pattern="^(http|direct)$", env="SMTP_INGEST_MODE")
+    SMTP_FORWARD_URL: str = Field(
+        default="http://localhost:8000/api/v1/emails/receive",
+        env="SMTP_FORWARD_URL"
+    )
+    SMTP_EMBEDDED: bool = Field(default=False, env="SMTP_EMBEDDED")
+    INGEST_MAX_QUEUE_DEPTH: int = Field(default=10000, env="INGEST_MAX_QUEUE_DEPTH")
+    INGEST_BATCH_MAX_ITEMS: int = Field(default=500, env="INGEST_BATCH_MAX_ITEMS")
+    INGEST_MICRO_BATCH_ENABLED: bool = Field(default=True, env="INGEST_MICRO_BATCH_ENABLED")
+    INGEST_MICRO_BATCH_WINDOW_MS: float = Field(default=5.0, env="INGEST_MICRO_BATCH_WINDOW_MS")
+    INGEST_MICRO_BATCH_MAX_SIZE: int = Field(default=100, env="INGEST_MICRO_BATCH_MAX_SIZE")
     
     @validator("ALLOWED_SENDERS", pre=True)
     def parse_allowed_senders(cls, v):
@@ -30,6 +152,41 @@ class Settings(BaseSettings):
     
     REDIS_URL: str = Field(default="redis://localhost:6379/0", env="REDIS_URL")
     
+    EVENT_STREAM_MAX_LEN: int = Field(default=10000, env="EVENT_STREAM_MAX_LEN")
+    EVENT_STREAM_BUFFER_SIZE: int = Field(default=256, env="EVENT_STREAM_BUFFER_SIZE")
+    EVENT_STREAM_HEARTBEAT: float = Field(default=15.0, env="EVENT_STREAM_HEARTBEAT")
+    EVENT_STREAM_RETRY_MS: int = Field(default=3000, env="EVENT_STREAM_RETRY_MS")
+    
+    ANALYSIS_QUEUE_CONCURRENCY: int = Field(default=4, env="ANALYSIS_QUEUE_CONCURRENCY")
+    ANALYSIS_QUEUE_VISIBILITY_TIMEOUT: float = Field(
+        default=300.0,
+        env="ANALYSIS_QUEUE_VISIBILITY_TIMEOUT"
+    )
+    ANALYSIS_QUEUE_VISIBILITY_MARGIN: float = Field(
+        default=15.0,
+        env="ANALYSIS_QUEUE_VISIBILITY_MARGIN"
+    )
+    ANALYSIS_QUEUE_MAX_ATTEMPTS: int = Field(default=5, env="ANALYSIS_QUEUE_MAX_ATTEMPTS")
+    ANALYSIS_QUEUE_RETRY_BASE_DELAY: float = Field(
+        default=5.0,
+        env="ANALYSIS_QUEUE_RETRY_BASE_DELAY"
+    )
+    ANALYSIS_QUEUE_RETRY_MAX_DELAY: float = Field(
+        default=600.0,
+        env="ANALYSIS_QUEUE_RETRY_MAX_DELAY"
+    )
+    ANALYSIS_QUEUE_POLL_INTERVAL: float = Field(default=0.5, env="ANALYSIS_QUEUE_POLL_INTERVAL")
+    
+    METRICS_ENABLED: bool = Field(default=True, env="METRICS_ENABLED")
+    QUERY_PROFILING_ENABLED: bool = Field(default=False, env="QUERY_PROFILING_ENABLED")
+    SLOW_QUERY_THRESHOLD_MS: float = Field(default=200.0, env="SLOW_QUERY_THRESHOLD_MS")
+    QUERY_STATS_TOP_N: int = Field(default=20, env="QUERY_STATS_TOP_N")
+    QUERY_STATS_MAX_STATEMENTS: int = Field(default=2000, env="QUERY_STATS_MAX_STATEMENTS")
+    QUERY_COUNT_WARN_THRESHOLD: int = Field(default=50, env="QUERY_COUNT_WARN_THRESHOLD")
+    DEBUG_PERF_ENABLED: bool = Field(default=False, env="DEBUG_PERF_ENABLED")
+    DEBUG_PERF_TOKEN: Optional[str] = Field(None, env="DEBUG_PERF_TOKEN")
+    DEBUG_PROFILE_MAX_SECONDS: float = Field(default=30.0, env="DEBUG_PROFILE_MAX_SECONDS")
+    
     SECRET_KEY: str = Field(..., env="SECRET_KEY")
     ALGORITHM: str = Field(default="HS256", env="ALGORITHM")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
@@ -1,15 +1,73 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import time
+from typing import Any, Dict
+from uuid import uuid4
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKOUT_SECONDS
+from app.core.query_profiler import query_profiler
 import logging
 
 logger = logging.getLogger(__name__)
 
-engine = create_async_engine(
-    settings.NEON_DATABASE_URL or settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True
-)
+READ_CONSISTENCY_HEADER = "X-Read-Consistency"
+LAST_WRITE_COOKIE = "last_write"
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - started)
+
+def _statement_cache_mode(url: str) -> str:
+    if settings.DB_STATEMENT_CACHE_MODE != "auto":
+        return settings.DB_STATEMENT_CACHE_MODE
+    if url == settings.NEON_DATABASE_URL or "-pooler" in (make_url(url).host or ""):
+        return "pgbouncer"
+    return "prepared"
+
+def _connect_args(url: str) -> Dict[str, Any]:
+    if make_url(url).get_driver_name() != "asyncpg":
+        return {}
+    if _statement_cache_mode(url) == "pgbouncer":
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__"
+        }
+    return {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+
+def _create_engine(url: str, role: str) -> AsyncEngine:
+    connect_args = _connect_args(url)
+    engine = create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        future=True,
+        poolclass=TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args
+    )
+    if settings.QUERY_PROFILING_ENABLED:
+        query_profiler.install(engine.sync_engine)
+    logger.info(
+        f"{role} database pool: size {settings.DB_POOL_SIZE}, overflow {settings.DB_MAX_OVERFLOW}, "
+        f"prepared statement cache {connect_args.get('prepared_statement_cache_size', 'default')}"
+    )
+    return engine
+
+engine = _create_engine(settings.NEON_DATABASE_URL or settings.DATABASE_URL, "Primary")
+read_engine = _create_engine(settings.DATABASE_READ_URL, "Replica") if settings.DATABASE_READ_URL else engine
 
 AsyncSessionLocal = async_sessionmaker(
     engine, 
@@ -17,6 +75,12 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False
 )
 
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
 
 async def get_db() -> AsyncSession:
@@ -26,8 +90,63 @@ async def get_db() -> AsyncSession:
         finally:
             await session.close()
 
+def _wants_primary(request: Request) -> bool:
+    if request.headers.get(READ_CONSISTENCY_HEADER, "").lower() == "primary":
+        return True
+    try:
+        last_write = float(request.cookies.get(LAST_WRITE_COOKIE, 0))
+    except ValueError:
+        return False
+    return time.time() - last_write < settings.DB_READ_YOUR_WRITES_SECONDS
+
+def read_your_writes(request: Request) -> bool:
+    return _wants_primary(request)
+
+def read_session_factory(request: Request) -> async_sessionmaker:
+    if read_engine is engine or _wants_primary(request):
+        return AsyncSessionLocal
+    return ReadSessionLocal
+
+async def get_read_db(request: Request) -> AsyncSession:
+    async with read_session_factory(request)() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                max_age = max(int(settings.DB_READ_YOUR_WRITES_SECONDS), 1)
+                cookie = f"{LAST_WRITE_COOKIE}={time.time():.3f}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax"
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
 async def init_db():
     async with engine.begin() as conn:
-        from app.models import email, category, analyzed_content, daily_summary, user_preference
+        from app.models import (
+            email, category, analyzed_content, daily_summary, daily_aggregate, email_rollup,
+            user_preference
+        )
         await conn.run_sync(Base.metadata.create_all)
-        logger.info("Database tables created successfully")
\ No newline at end of file
+        for statement in email.EMAIL_DDL:
+            await conn.execute(text(statement))
+        for statement in analyzed_content.ANALYZED_CONTENT_DDL + analyzed_content.SEARCH_VECTOR_DDL:
+            await conn.execute(text(statement))
+        await conn.run_sync(_create_missing_indexes)
+        logger.info("Database tables created successfully")
+
+def _create_missing_indexes(sync_conn):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
\ No newline at end of file
@@ -0,0 +1,148 @@
+import asyncio
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+MAX_STACK_DEPTH = 64
+
+IDLE_FRAMES = {
+    ("selectors.py", "_select"),
+    ("selectors.py", "select"),
+    ("base_events.py", "run_forever"),
+    ("base_events.py", "run_until_complete"),
+    ("runners.py", "run")
+}
+
+ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+
+Frame = Tuple[str, str, int]
+
+class LoopProfiler:
+    def __init__(self):
+        self._lock = asyncio.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    async def profile(self, seconds: float, interval: float, limit: int) -> Dict[str, Any]:
+        async with self._lock:
+            stacks: Counter = Counter()
+            started = time.perf_counter()
+            if threading.current_thread() is threading.main_thread() and hasattr(signal, "setitimer"):
+                mode = "signal"
+                await _profile_with_timer(seconds, interval, stacks)
+            else:
+                mode = "thread"
+                await _profile_with_thread(seconds, interval, stacks)
+            elapsed = time.perf_counter() - started
+
+        return {"mode": mode, **_summarize(stacks, elapsed, interval, limit)}
+
+async def _profile_with_timer(seconds: float, interval: float, stacks: Counter):
+    previous = signal.signal(signal.SIGALRM, lambda signum, frame: _record(frame, stacks))
+    signal.setitimer(signal.ITIMER_REAL, interval, interval)
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+async def _profile_with_thread(seconds: float, interval: float, stacks: Counter):
+    thread_id = threading.get_ident()
+    stop = threading.Event()
+
+    def sample():
+        while not stop.wait(interval):
+            _record(sys._current_frames().get(thread_id), stacks)
+
+    sampler = threading.Thread(target=sample, name="loop-profiler", daemon=True)
+    sampler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        stop.set()
+        await asyncio.to_thread(sampler.join)
+
+def _record(frame, stacks: Counter):
+    stack: List[Frame] = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        stack.append((code.co_filename, code.co_name, code.co_firstlineno))
+        frame = frame.f_back
+    if stack:
+        stacks[tuple(reversed(stack))] += 1
+
+def _label(frame: Frame) -> str:
+    filename, name, line = frame
+    for marker in ("site-packages" + os.sep, "backend" + os.sep):
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+            break
+    return f"{name} ({filename}:{line})"
+
+def _is_idle(stack: Tuple[Frame, ...]) -> bool:
+    filename, name, _ = stack[-1]
+    return (os.path.basename(filename), name) in IDLE_FRAMES
+
+def _application_frames(stack: Tuple[Frame, ...]) -> List[Frame]:
+    return [frame for frame in stack if not frame[0].startswith(ASYNCIO_DIR)]
+
+def _summarize(stacks: Counter, elapsed: float, interval: float, limit: int) -> Dict[str, Any]:
+    total = sum(stacks.values())
+    idle = sum(count for stack, count in stacks.items() if _is_idle(stack))
+    own: Counter = Counter()
+    cumulative: Counter = Counter()
+
+    for stack, count in stacks.items():
+        if _is_idle(stack):
+            continue
+        own[stack[-1]] += count
+        for frame in set(_application_frames(stack)):
+            cumulative[frame] += count
+
+    busy = max(total - idle, 1)
+
+    def top(counter: Counter) -> List[Dict[str, Any]]:
+        return [
+            {"function": _label(frame), "samples": count, "busy_ratio": round(count / busy, 3)}
+            for frame, count in counter.most_common(limit)
+        ]
+
+    return {
+        "seconds": round(elapsed, 2),
+        "interval_ms": interval * 1000,
+        "samples": total,
+        "idle_ratio": round(idle / total, 3) if total else None,
+        "top_self": top(own),
+        "top_cumulative": top(cumulative),
+        "stacks": [
+            {"stack": ";".join(_label(frame) for frame in _application_frames(stack)), "samples": count}
+            for stack, count in stacks.most_common(limit)
+            if not _is_idle(stack)
+        ],
+        "tasks": _task_snapshot(limit)
+    }
+
+def _task_snapshot(limit: int) -> List[Dict[str, Any]]:
+    waiting: Counter = Counter()
+    for task in asyncio.all_tasks():
+        coro = task.get_coro()
+        name = getattr(coro, "__qualname__", repr(coro))
+        frames = task.get_stack(limit=1)
+        location: Optional[str] = None
+        if frames:
+            code = frames[0].f_code
+            location = _label((code.co_filename, code.co_name, frames[0].f_lineno))
+        waiting[(name, location)] += 1
+
+    return [
+        {"coroutine": name, "awaiting_in": location, "tasks": count}
+        for (name, location), count in waiting.most_common(limit)
+    ]
+
+loop_profiler = LoopProfiler()
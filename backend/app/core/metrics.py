@@ -0,0 +1,115 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.openmetrics import exposition as openmetrics
+from app.core.tracing import get_trace_id
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0, 120.0)
+LAG_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+POOL_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = tuple(float(1024 * 4 ** i) for i in range(9))
+
+SMTP_ACCEPT_SECONDS = Histogram(
+    "smtp_accept_seconds", "Time to answer an SMTP DATA command", ["result"], buckets=LATENCY_BUCKETS
+)
+SMTP_REJECTED = Counter("smtp_rejected", "SMTP messages not accepted for delivery", ["reason"])
+INGEST_COMMIT_SECONDS = Histogram(
+    "email_ingest_commit_seconds", "Time to insert and commit a group of received emails", buckets=LATENCY_BUCKETS
+)
+PROCESSOR_SECONDS = Histogram(
+    "email_processor_seconds", "Email content parse time", ["operation"], buckets=LATENCY_BUCKETS
+)
+PROCESSOR_INPUT_CHARS = Histogram(
+    "email_processor_input_chars", "Raw email content size handed to the processor", ["operation"], buckets=SIZE_BUCKETS
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_seconds", "AI analysis request latency including retries", ["kind", "outcome"], buckets=LLM_BUCKETS
+)
+LLM_TOKENS = Counter("llm_tokens", "Tokens reported by the LLM provider", ["model", "type"])
+ANALYSIS_PARSE_FAILURES = Counter(
+    "analysis_json_parse_failures", "LLM responses that were not valid JSON", ["kind"]
+)
+ANALYSIS_FALLBACKS = Counter(
+    "analysis_fallbacks", "Default analyses stored instead of an LLM result", ["reason"]
+)
+PIPELINE_STAGE_SECONDS = Histogram(
+    "email_pipeline_stage_seconds", "Time spent per email pipeline stage", ["stage"], buckets=LATENCY_BUCKETS
+)
+EMAIL_PROCESSING_LAG_SECONDS = Histogram(
+    "email_processing_lag_seconds", "Time from receipt to persisted analysis", buckets=LAG_BUCKETS
+)
+SUMMARY_GENERATION_SECONDS = Histogram(
+    "summary_generation_seconds", "Daily summary generation time", ["rebuild"], buckets=LATENCY_BUCKETS
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds", "Time waiting for a pooled database connection", buckets=POOL_BUCKETS
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_seconds", "Database statement execution time when query profiling is enabled", ["operation"],
+    buckets=POOL_BUCKETS
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "Database statements executed per HTTP request", ["method", "route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_seconds", "HTTP request latency by route", ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+
+def exemplar() -> Optional[Dict[str, str]]:
+    trace_id = get_trace_id()
+    return {"trace_id": trace_id} if trace_id else None
+
+@contextmanager
+def observe_seconds(histogram: Histogram, **labels) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metric = histogram.labels(**labels) if labels else histogram
+        metric.observe(time.perf_counter() - started, exemplar=exemplar())
+
+@contextmanager
+def pipeline_stage(stage: str, timings: Dict[str, float]) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        timings[stage] = timings.get(stage, 0.0) + elapsed
+        PIPELINE_STAGE_SECONDS.labels(stage).observe(elapsed, exemplar=exemplar())
+
+def render_metrics(accept: str) -> Tuple[bytes, str]:
+    if "application/openmetrics-text" in accept:
+        return openmetrics.generate_latest(REGISTRY), openmetrics.CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status)
+            ).observe(time.perf_counter() - started, exemplar=exemplar())
@@ -0,0 +1,67 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Type
+from uuid import UUID
+from sqlalchemy import Select, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+class InvalidCursorError(ValueError):
+    pass
+
+def encode_cursor(*values: Any) -> str:
+    payload = json.dumps([_serialize(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, types: Sequence[Type]) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise InvalidCursorError("Cursor does not match the sort key")
+        return [_coerce(value, value_type) for value, value_type in zip(values, types)]
+    except InvalidCursorError:
+        raise
+    except Exception as e:
+        raise InvalidCursorError(f"Malformed cursor: {e}")
+
+def _serialize(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+def _coerce(value: Any, value_type: Type) -> Any:
+    if value_type is datetime:
+        return datetime.fromisoformat(value)
+    if value_type is UUID:
+        return UUID(value)
+    return value_type(value)
+
+def apply_keyset(
+    query: Select,
+    columns: Sequence[ColumnElement],
+    types: Sequence[Type],
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True
+) -> Select:
+    if cursor:
+        values = decode_cursor(cursor, types)
+        if descending:
+            query = query.where(tuple_(*columns) < tuple_(*values))
+        else:
+            query = query.where(tuple_(*columns) > tuple_(*values))
+
+    order_by = [column.desc() if descending else column.asc() for column in columns]
+    return query.order_by(*order_by).limit(limit + 1)
+
+def build_page(
+    rows: Sequence[Any],
+    limit: int,
+    key: Callable[[Any], Tuple[Any, ...]]
+) -> Tuple[List[Any], Optional[str]]:
+    items = list(rows[:limit])
+    next_cursor = encode_cursor(*key(items[-1])) if len(rows) > limit and items else None
+    return items, next_cursor
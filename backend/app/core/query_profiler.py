@@ -0,0 +1,236 @@
+import re
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.core.metrics import DB_QUERIES_PER_REQUEST, DB_QUERY_SECONDS
+from app.core.tracing import get_trace_id
+import logging
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE_RE = re.compile(r"\s+")
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?\b")
+PLACEHOLDER_RE = re.compile(r"(?:\$\d+|%\(\w+\)s|\?)(?:::[\w\[\]]+)?")
+TUPLE_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+REPEATED_TUPLES_RE = re.compile(r"(\(\?, \.\.\.\))(?:, \(\?, \.\.\.\))+")
+
+MAX_SHAPE_CHARS = 200
+
+@lru_cache(maxsize=4096)
+def normalize_sql(statement: str) -> str:
+    sql = WHITESPACE_RE.sub(" ", statement).strip()
+    sql = STRING_RE.sub("?", sql)
+    sql = PLACEHOLDER_RE.sub("?", sql)
+    sql = NUMBER_RE.sub("?", sql)
+    sql = TUPLE_RE.sub("(?, ...)", sql)
+    return REPEATED_TUPLES_RE.sub(r"\1, ...", sql)
+
+def bind_shape(parameters: Any, executemany: bool = False) -> str:
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        return f"{len(parameters)} x {bind_shape(parameters[0])}"
+
+    if isinstance(parameters, dict):
+        shape = "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    elif isinstance(parameters, (list, tuple)):
+        runs: List[List[Any]] = []
+        for value in parameters:
+            name = type(value).__name__
+            if runs and runs[-1][0] == name:
+                runs[-1][1] += 1
+            else:
+                runs.append([name, 1])
+        shape = "(" + ", ".join(name if count == 1 else f"{name} x{count}" for name, count in runs) + ")"
+    else:
+        shape = type(parameters).__name__
+
+    return shape if len(shape) <= MAX_SHAPE_CHARS else shape[:MAX_SHAPE_CHARS] + "..."
+
+class RequestQueries:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+
+_request_queries: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+class StatementStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.slow = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 1),
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 1),
+            "slow": self.slow
+        }
+
+class RouteStats:
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.seconds = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "queries_mean": round(self.queries / self.requests, 1) if self.requests else 0.0,
+            "queries_max": self.max_queries,
+            "db_ms_mean": round(self.seconds / self.requests * 1000, 1) if self.requests else 0.0
+        }
+
+class QueryProfiler:
+    def __init__(
+        self,
+        slow_threshold_ms: float,
+        top_n: int,
+        max_statements: int,
+        request_warn_threshold: int,
+        slow_log_size: int = 100
+    ):
+        self.slow_threshold = slow_threshold_ms / 1000
+        self.top_n = top_n
+        self.max_statements = max_statements
+        self.request_warn_threshold = request_warn_threshold
+        self.installed = False
+        self._statements: Dict[str, StatementStats] = {}
+        self._routes: Dict[str, RouteStats] = {}
+        self._slow: Deque[Dict[str, Any]] = deque(maxlen=slow_log_size)
+        self._dropped = 0
+        self._started = time.time()
+
+    def install(self, engine: Engine):
+        if event.contains(engine, "before_cursor_execute", self._before_cursor_execute):
+            return
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        self.installed = True
+        logger.info(f"Query profiling enabled, slow query threshold {self.slow_threshold * 1000:.0f}ms")
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_started", None)
+        if started is not None:
+            self.record(statement, parameters, executemany, time.perf_counter() - started)
+
+    def record(self, statement: str, parameters: Any, executemany: bool, elapsed: float):
+        sql = normalize_sql(statement)
+        DB_QUERY_SECONDS.labels(sql.split(" ", 1)[0].upper()).observe(elapsed)
+
+        stats = self._statements.get(sql)
+        if stats is None:
+            if len(self._statements) >= self.max_statements:
+                self._dropped += 1
+            else:
+                stats = self._statements[sql] = StatementStats()
+        if stats is not None:
+            stats.count += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+
+        request = _request_queries.get()
+        if request is not None:
+            request.count += 1
+            request.seconds += elapsed
+            request.statements[sql] += 1
+
+        if elapsed >= self.slow_threshold:
+            if stats is not None:
+                stats.slow += 1
+            shape = bind_shape(parameters, executemany)
+            self._slow.append({
+                "at": time.time(),
+                "duration_ms": round(elapsed * 1000, 1),
+                "sql": sql,
+                "binds": shape,
+                "trace_id": get_trace_id()
+            })
+            logger.warning(f"Slow query {elapsed * 1000:.0f}ms: {sql} binds {shape}")
+
+    def begin_request(self) -> RequestQueries:
+        request = RequestQueries()
+        _request_queries.set(request)
+        return request
+
+    def end_request(self, method: str, route: str, request: RequestQueries):
+        key = f"{method} {route}"
+        stats = self._routes.get(key)
+        if stats is None:
+            stats = self._routes[key] = RouteStats()
+        stats.requests += 1
+        stats.queries += request.count
+        stats.seconds += request.seconds
+        stats.max_queries = max(stats.max_queries, request.count)
+        DB_QUERIES_PER_REQUEST.labels(method, route).observe(request.count)
+
+        if request.count > self.request_warn_threshold:
+            sql, repeats = request.statements.most_common(1)[0]
+            logger.warning(
+                f"{key} ran {request.count} queries in {request.seconds * 1000:.0f}ms, "
+                f"most repeated {repeats}x: {sql}"
+            )
+
+    def snapshot(self, top: Optional[int] = None) -> Dict[str, Any]:
+        top = top or self.top_n
+        statements = sorted(self._statements.items(), key=lambda item: item[1].total, reverse=True)
+        routes = sorted(self._routes.items(), key=lambda item: item[1].max_queries, reverse=True)
+        return {
+            "enabled": self.installed,
+            "since": self._started,
+            "slow_query_threshold_ms": self.slow_threshold * 1000,
+            "distinct_statements": len(self._statements),
+            "untracked_statements": self._dropped,
+            "top_statements": [{"sql": sql, **stats.to_dict()} for sql, stats in statements[:top]],
+            "routes": [{"route": route, **stats.to_dict()} for route, stats in routes[:top]],
+            "slow_queries": list(self._slow)[-top:][::-1]
+        }
+
+    def reset(self):
+        self._statements.clear()
+        self._routes.clear()
+        self._slow.clear()
+        self._dropped = 0
+        self._started = time.time()
+
+class QueryCountMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = query_profiler.begin_request()
+
+        async def send_with_count(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-query-count", str(request.count).encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_count)
+        finally:
+            route = scope.get("route")
+            query_profiler.end_request(scope["method"], getattr(route, "path", "unmatched"), request)
+
+query_profiler = QueryProfiler(
+    slow_threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    top_n=settings.QUERY_STATS_TOP_N,
+    max_statements=settings.QUERY_STATS_MAX_STATEMENTS,
+    request_warn_threshold=settings.QUERY_COUNT_WARN_THRESHOLD
+)
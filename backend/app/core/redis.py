@@ -0,0 +1,14 @@
+import redis.asyncio as redis
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+redis_client = redis.from_url(
+    settings.REDIS_URL,
+    decode_responses=True
+)
+
+async def close_redis():
+    await redis_client.close()
+    logger.info("Redis connection closed")
@@ -0,0 +1,63 @@
+import logging
+import re
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+TRACE_HEADER = "X-Trace-ID"
+
+TRACE_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+_trace_id: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex
+
+def get_trace_id() -> Optional[str]:
+    return _trace_id.get()
+
+@contextmanager
+def trace_context(trace_id: Optional[str] = None) -> Iterator[str]:
+    trace_id = trace_id or new_trace_id()
+    token = _trace_id.set(trace_id)
+    try:
+        yield trace_id
+    finally:
+        _trace_id.reset(token)
+
+def install_log_record_factory():
+    factory = logging.getLogRecordFactory()
+    if getattr(factory, "traced", False):
+        return
+
+    def record_factory(*args, **kwargs):
+        record = factory(*args, **kwargs)
+        record.trace_id = _trace_id.get() or "-"
+        return record
+
+    record_factory.traced = True
+    logging.setLogRecordFactory(record_factory)
+
+class TraceMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for name, value in scope["headers"]:
+            if name == b"x-trace-id":
+                incoming = value.decode("latin-1")
+                break
+
+        with trace_context(incoming if incoming and TRACE_ID_RE.match(incoming) else None) as trace_id:
+            async def send_with_trace(message):
+                if message["type"] == "http.response.start":
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-trace-id", trace_id.encode())]
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace)
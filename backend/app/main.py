@@ -1,20 +1,61 @@
-from fastapi import FastAPI
+import asyncio
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 from app.core.config import settings
 from app.api.v1.api import api_router
-from app.core.database import init_db
+from app.core.database import ReadYourWritesMiddleware, init_db
+from app.core.redis import close_redis
+from app.core.http import get_http_client, close_http_client
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.query_profiler import QueryCountMiddleware
+from app.core.tracing import TRACE_HEADER, TraceMiddleware, install_log_record_factory
+from app.services.analysis_queue import analysis_queue
+from app.services.content_reducer import content_reducer
+from app.services.event_bus import event_bus
+from app.services.email_receiver import EmailReceiver
+from app.services.email_processor import get_executor, shutdown_executor
+from app.services.email_pipeline import process_email, process_emails, requeue_unprocessed
+from app.services.pre_classifier import pre_classifier
 
-logging.basicConfig(level=logging.INFO)
+install_log_record_factory()
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s:[%(trace_id)s] %(message)s")
 logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting up...")
     await init_db()
+    get_http_client()
+    get_executor()
+    pre_classifier.load()
+    await asyncio.to_thread(content_reducer.load)
+    await requeue_unprocessed()
+    await analysis_queue.start(
+        process_email,
+        batch_handler=process_emails if settings.ANALYSIS_BATCH_ENABLED else None
+    )
+    await event_bus.start()
+    
+    email_receiver = None
+    if settings.SMTP_EMBEDDED:
+        email_receiver = EmailReceiver(
+            client=get_http_client(),
+            ingest_mode="direct",
+            embedded=True
+        )
+        await email_receiver.start()
+    
     yield
     logger.info("Shutting down...")
+    if email_receiver:
+        await email_receiver.stop()
+    await analysis_queue.stop()
+    await event_bus.stop()
+    shutdown_executor()
+    await close_http_client()
+    await close_redis()
 
 app = FastAPI(
     title="Email Aggregator API",
@@ -29,7 +70,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", TRACE_HEADER, "X-Query-Count"],
 )
+if settings.DATABASE_READ_URL:
+    app.add_middleware(ReadYourWritesMiddleware)
+if settings.QUERY_PROFILING_ENABLED:
+    app.add_middleware(QueryCountMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+app.add_middleware(TraceMiddleware)
 
 app.include_router(api_router, prefix="/api/v1")
 
@@ -43,4 +92,10 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics(request: Request):
+        content, media_type = render_metrics(request.headers.get("accept", ""))
+        return Response(content=content, media_type=media_type)
\ No newline at end of file
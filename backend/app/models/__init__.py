@@ -2,6 +2,8 @@ from app.models.email import Email
 from app.models.category import Category
 from app.models.analyzed_content import AnalyzedContent
 from app.models.daily_summary import DailySummary
+from app.models.daily_aggregate import DailyAggregate
+from app.models.email_rollup import EmailRollup
 from app.models.user_preference import UserPreference
 
 __all__ = [
@@ -9,5 +11,7 @@ __all__ = [
     "Category",
     "AnalyzedContent",
     "DailySummary",
+    "DailyAggregate",
+    "EmailRollup",
     "UserPreference"
 ]
\ No newline at end of file
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from app.core.database import Base
 import uuid
 
@@ -14,15 +14,78 @@ class AnalyzedContent(Base):
     importance_score = Column(Integer)
     title_optimized = Column(String(500))
     summary = Column(Text)
-    content_markdown = Column(Text)
-    key_points = Column(JSONB)
-    tags = Column(JSONB)
-    images = Column(JSONB)
-    important_links = Column(JSONB)
+    content_markdown = deferred(Column(Text), group="body")
+    key_points = deferred(Column(JSONB), group="body")
+    tags = deferred(Column(JSONB), group="body")
+    images = deferred(Column(JSONB), group="body")
+    important_links = deferred(Column(JSONB), group="body")
     reading_time = Column(Integer)
     sentiment = Column(String(20))
-    action_items = Column(JSONB)
+    source = Column(String(20))
+    action_items = deferred(Column(JSONB), group="body")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    search_vector = deferred(Column(TSVECTOR))
     
     email = relationship("Email", backref="analyzed_content")
-    category = relationship("Category", backref="analyzed_content")
\ No newline at end of file
+    category = relationship("Category", backref="analyzed_content")
+    
+    __table_args__ = (
+        Index(
+            "ix_analyzed_content_search_vector",
+            "search_vector",
+            postgresql_using="gin"
+        ),
+    )
+
+ANALYZED_CONTENT_DDL = [
+    "ALTER TABLE analyzed_content ADD COLUMN IF NOT EXISTS source VARCHAR(20)"
+]
+
+SEARCH_CONFIG = "english"
+
+SEARCH_VECTOR_DDL = [
+    "ALTER TABLE analyzed_content ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    """
+    CREATE OR REPLACE FUNCTION jsonb_array_to_text(value jsonb) RETURNS text AS $$
+        SELECT CASE
+            WHEN jsonb_typeof(value) = 'array'
+                THEN (SELECT string_agg(item, ' ') FROM jsonb_array_elements_text(value) AS item)
+            ELSE ''
+        END
+    $$ LANGUAGE sql IMMUTABLE
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION analyzed_content_search_vector_update() RETURNS trigger AS $$
+    DECLARE
+        email_subject text;
+    BEGIN
+        SELECT subject INTO email_subject FROM emails WHERE id = NEW.email_id;
+        NEW.search_vector :=
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(email_subject, '')), 'A') ||
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.title_optimized, '')), 'A') ||
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.summary, '')), 'B') ||
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(jsonb_array_to_text(NEW.tags), '')), 'B') ||
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(jsonb_array_to_text(NEW.key_points), '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_trigger
+            WHERE tgname = 'analyzed_content_search_vector_trigger'
+              AND tgrelid = 'analyzed_content'::regclass
+        ) THEN
+            CREATE TRIGGER analyzed_content_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF email_id, title_optimized, summary, tags, key_points
+            ON analyzed_content
+            FOR EACH ROW EXECUTE FUNCTION analyzed_content_search_vector_update();
+
+            UPDATE analyzed_content SET summary = summary WHERE search_vector IS NULL;
+        END IF;
+    END
+    $$
+    """
+]
\ No newline at end of file
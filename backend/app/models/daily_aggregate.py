@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Date, Integer, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class DailyAggregate(Base):
+    __tablename__ = "daily_aggregates"
+    
+    date = Column(Date, primary_key=True)
+    total_emails = Column(Integer, nullable=False, default=0)
+    analyzed_count = Column(Integer, nullable=False, default=0)
+    top_stories = Column(JSONB, nullable=False, default=list)
+    categories = Column(JSONB, nullable=False, default=dict)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, Text, DateTime, Boolean
+from sqlalchemy import Column, String, Text, DateTime, Boolean, Index, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
+from sqlalchemy.orm import deferred
 from app.core.database import Base
 import uuid
 
@@ -11,6 +12,23 @@ class Email(Base):
     subject = Column(String(500))
     sender_email = Column(String(255), nullable=False)
     sender_name = Column(String(255))
-    raw_content = Column(Text)
+    raw_content = deferred(Column(Text))
     received_at = Column(DateTime(timezone=True), server_default=func.now())
-    processed = Column(Boolean, default=False)
\ No newline at end of file
+    processed = Column(Boolean, default=False)
+    duplicate_of_id = Column(UUID(as_uuid=True), ForeignKey("emails.id"), nullable=True)
+    trace_id = Column(String(64))
+    
+    __table_args__ = (
+        Index("ix_emails_received_at_id", "received_at", "id"),
+        Index(
+            "ix_emails_unprocessed_received_at",
+            "received_at",
+            "id",
+            postgresql_where=processed == False
+        ),
+    )
+
+EMAIL_DDL = [
+    "ALTER TABLE emails ADD COLUMN IF NOT EXISTS duplicate_of_id UUID REFERENCES emails(id)",
+    "ALTER TABLE emails ADD COLUMN IF NOT EXISTS trace_id VARCHAR(64)"
+]
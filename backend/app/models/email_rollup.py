@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Integer, DateTime, Index
+from app.core.database import Base
+
+class EmailRollup(Base):
+    __tablename__ = "email_rollups"
+    
+    granularity = Column(String(8), primary_key=True)
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    dimension = Column(String(20), primary_key=True)
+    key = Column(String(255), primary_key=True, default="")
+    received = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        Index("ix_email_rollups_dimension_bucket", "granularity", "dimension", "bucket"),
+    )
@@ -16,6 +16,8 @@ class EmailResponse(EmailBase):
     id: UUID
     received_at: datetime
     processed: bool = False
+    duplicate_of_id: Optional[UUID] = None
+    trace_id: Optional[str] = None
     
     class Config:
         from_attributes = True
@@ -27,6 +29,7 @@ class EmailListResponse(BaseModel):
     sender_name: Optional[str]
     received_at: datetime
     processed: bool
+    duplicate_of_id: Optional[UUID] = None
     
     class Config:
         from_attributes = True
\ No newline at end of file
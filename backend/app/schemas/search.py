@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from uuid import UUID
+
+class SearchHit(BaseModel):
+    id: UUID
+    email_id: UUID
+    subject: Optional[str]
+    sender_email: str
+    received_at: datetime
+    category: Optional[str]
+    importance_score: Optional[int]
+    title_optimized: Optional[str]
+    title_highlight: Optional[str]
+    summary_highlight: Optional[str]
+    rank: float
+
+class SearchResponse(BaseModel):
+    query: str
+    items: List[SearchHit]
+    next_cursor: Optional[str] = None
@@ -1,95 +1,309 @@
+import asyncio
 import json
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional
 import httpx
 from app.core.config import settings
+from app.core.http import get_http_client
+from app.core.metrics import ANALYSIS_FALLBACKS, ANALYSIS_PARSE_FAILURES, LLM_REQUEST_SECONDS, exemplar
+from app.services.analysis_cache import analysis_cache
+from app.services.content_reducer import content_reducer
+from app.services.email_processor import EmailProcessor
+from app.services.llm_client import LLMClient, LLMUnavailableError, llm_client
 import logging
 
 logger = logging.getLogger(__name__)
 
+ANALYSIS_TASKS = """1. **Content Classification**: Determine email type (AI_NEWS|SHOPPING|EVENT|TECH|FINANCE|OTHER)
+2. **Importance Scoring**: Rate 1-10 scale based on content value and timeliness
+3. **Markdown Reformatting**: Reorganize content into clean Markdown format
+4. **Image Processing**: Extract image URLs, add appropriate alt descriptions
+5. **Content Distillation**: Generate concise summary and key points"""
+
+ANALYSIS_FIELDS = """  "category": "classification",
+  "importance_score": score,
+  "title_optimized": "optimized title",
+  "summary": "one-sentence compelling summary",
+  "content_markdown": "reformatted Markdown content",
+  "key_points": ["key points list"],
+  "tags": ["relevant tags"],
+  "images": [{"url": "image_link", "alt": "description", "caption": "title"}],
+  "important_links": ["important links"],
+  "reading_time": estimated_minutes,
+  "sentiment": "positive|neutral|negative",
+  "action_items": ["actionable suggestions"]"""
+
+SLIM_ANALYSIS_TASKS = """1. **Content Classification**: Determine email type (AI_NEWS|SHOPPING|EVENT|TECH|FINANCE|OTHER)
+2. **Importance Scoring**: Rate 1-10 scale based on content value and timeliness
+3. **Content Distillation**: Generate concise summary and key points"""
+
+SLIM_ANALYSIS_FIELDS = """  "category": "classification",
+  "importance_score": score,
+  "title_optimized": "optimized title",
+  "summary": "one-sentence compelling summary",
+  "key_points": ["key points list"],
+  "tags": ["relevant tags"],
+  "sentiment": "positive|neutral|negative",
+  "action_items": ["actionable suggestions"]"""
+
+ANALYSIS_PROMPTS = {
+    "full": (ANALYSIS_TASKS, ANALYSIS_FIELDS, 2000),
+    "slim": (SLIM_ANALYSIS_TASKS, SLIM_ANALYSIS_FIELDS, 600)
+}
+
+PROMPT_VERSION = "v3"
+
+REQUIRED_FIELDS = ("category", "importance_score", "title_optimized", "summary")
+
+def is_complete_analysis(value: Any) -> bool:
+    return isinstance(value, dict) and all(field in value for field in REQUIRED_FIELDS)
+
 class AIAnalyzer:
-    def __init__(self):
-        self.api_key = settings.OPENROUTER_API_KEY
-        self.base_url = settings.OPENROUTER_BASE_URL
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, llm: Optional[LLMClient] = None):
+        self.client = client or get_http_client()
+        self.llm = llm or llm_client
         self.model = "anthropic/claude-3-haiku"
-        
+        self.variant = settings.ANALYSIS_PROMPT_VARIANT
+        self.tasks, self.fields, self.max_tokens = ANALYSIS_PROMPTS[self.variant]
+        self.content_budget = settings.ANALYSIS_CONTENT_TOKEN_BUDGETS.get(
+            self.model, settings.ANALYSIS_CONTENT_TOKEN_BUDGET
+        )
+        self.processor = EmailProcessor()
+
     async def analyze(self, subject: str, sender: str, content: str) -> Dict[str, Any]:
+        cache_key = self._cache_key(subject, sender, content)
+        cached = await analysis_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        return await self._analyze_reduced(cache_key, subject, sender, await self._reduce(content))
+
+    async def _analyze_reduced(self, cache_key: str, subject: str, sender: str, content: str) -> Dict[str, Any]:
         prompt = self._create_analysis_prompt(subject, sender, content)
-        
+
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        "HTTP-Referer": "http://localhost:3000",
-                        "X-Title": "Email Aggregator"
-                    },
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {
-                                "role": "system",
-                                "content": "You are a professional email content editor. Always respond with valid JSON."
-                            },
-                            {
-                                "role": "user",
-                                "content": prompt
-                            }
-                        ],
-                        "temperature": 0.3,
-                        "max_tokens": 2000
-                    },
-                    timeout=30.0
-                )
-                
-                response.raise_for_status()
-                result = response.json()
-                
-                content = result["choices"][0]["message"]["content"]
-                
-                try:
-                    return json.loads(content)
-                except json.JSONDecodeError:
-                    logger.error(f"Failed to parse AI response as JSON: {content}")
-                    return self._get_default_analysis()
-                    
+            response_content = await self._complete(prompt, max_tokens=self.max_tokens)
+
+            try:
+                analysis = json.loads(response_content)
+            except json.JSONDecodeError:
+                ANALYSIS_PARSE_FAILURES.labels("single").inc()
+                logger.error(f"Failed to parse AI response as JSON: {response_content}")
+                return self._get_default_analysis("parse_error")
+
+            if not is_complete_analysis(analysis):
+                ANALYSIS_PARSE_FAILURES.labels("single").inc()
+                logger.error(f"AI response is not a complete analysis: {response_content}")
+                return self._get_default_analysis("parse_error")
+
+        except LLMUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error analyzing email with AI: {e}")
-            return self._get_default_analysis()
-    
+            return self._get_default_analysis("llm_error")
+
+        await analysis_cache.set(cache_key, analysis)
+        return analysis
+
+    async def analyze_batch(self, emails: List[Dict[str, str]]) -> Dict[str, Dict[str, Any]]:
+        results: Dict[str, Dict[str, Any]] = {}
+        cache_keys = {
+            item["id"]: self._cache_key(item["subject"], item["sender"], item["content"])
+            for item in emails
+        }
+
+        uncached = []
+        for item in emails:
+            cached = await analysis_cache.get(cache_keys[item["id"]])
+            if cached is not None:
+                results[item["id"]] = cached
+            else:
+                uncached.append(item)
+
+        reduced = await asyncio.gather(*[self._reduce(item["content"]) for item in uncached])
+        uncached = [{**item, "content": content} for item, content in zip(uncached, reduced)]
+
+        for batch in self._pack_batches(uncached):
+            if len(batch) == 1:
+                item = batch[0]
+                results[item["id"]] = await self._analyze_reduced(
+                    cache_keys[item["id"]], item["subject"], item["sender"], item["content"]
+                )
+                continue
+
+            parsed = await self._analyze_batch_request(batch)
+
+            for email_id, analysis in parsed.items():
+                await analysis_cache.set(cache_keys[email_id], analysis)
+
+            fallback = [item for item in batch if item["id"] not in parsed]
+            if fallback:
+                logger.warning(
+                    f"Batch analysis missing {len(fallback)}/{len(batch)} results, "
+                    f"falling back to single-email analysis"
+                )
+
+            fallback_results = await asyncio.gather(*[
+                self._analyze_reduced(cache_keys[item["id"]], item["subject"], item["sender"], item["content"])
+                for item in fallback
+            ])
+
+            results.update(parsed)
+            results.update({
+                item["id"]: analysis
+                for item, analysis in zip(fallback, fallback_results)
+            })
+
+        return results
+
+    async def _analyze_batch_request(self, batch: List[Dict[str, str]]) -> Dict[str, Dict[str, Any]]:
+        prompt = self._create_batch_analysis_prompt(batch)
+        max_tokens = min(
+            min(settings.ANALYSIS_BATCH_OUTPUT_TOKENS_PER_EMAIL, self.max_tokens) * len(batch),
+            settings.ANALYSIS_BATCH_MAX_OUTPUT_TOKENS
+        )
+
+        try:
+            content = await self._complete(prompt, max_tokens=max_tokens, kind="batch")
+        except LLMUnavailableError:
+            raise
+        except Exception as e:
+            logger.error(f"Error analyzing email batch with AI: {e}")
+            return {}
+
+        try:
+            items = json.loads(content)
+        except json.JSONDecodeError:
+            ANALYSIS_PARSE_FAILURES.labels("batch").inc()
+            logger.error(f"Failed to parse AI batch response as JSON: {content}")
+            return {}
+
+        if isinstance(items, dict):
+            items = items.get("results", [])
+        if not isinstance(items, list):
+            return {}
+
+        expected_ids = {item["id"] for item in batch}
+        parsed = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+
+            email_id = str(item.pop("id", ""))
+            if email_id not in expected_ids:
+                continue
+            if not is_complete_analysis(item):
+                continue
+
+            parsed[email_id] = item
+
+        return parsed
+
+    def _pack_batches(self, emails: List[Dict[str, str]]) -> List[List[Dict[str, str]]]:
+        budget = settings.ANALYSIS_BATCH_TOKEN_BUDGET
+        max_size = settings.ANALYSIS_BATCH_MAX_SIZE
+        overhead = self._estimate_tokens(self._create_batch_analysis_prompt([]))
+
+        batches: List[List[Dict[str, str]]] = []
+        current: List[Dict[str, str]] = []
+        used = overhead
+
+        for item in emails:
+            cost = self._estimate_tokens(self._format_batch_email(item))
+
+            if current and (used + cost > budget or len(current) >= max_size):
+                batches.append(current)
+                current = []
+                used = overhead
+
+            current.append(item)
+            used += cost
+
+        if current:
+            batches.append(current)
+
+        return batches
+
+    async def _complete(self, prompt: str, max_tokens: int, kind: str = "single") -> str:
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            content = await self.llm.complete(
+                self.client,
+                self.model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are a professional email content editor. Always respond with valid JSON."
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                max_tokens=max_tokens,
+                estimated_tokens=self._estimate_tokens(prompt)
+            )
+            outcome = "ok"
+            return content
+        except LLMUnavailableError:
+            outcome = "unavailable"
+            raise
+        finally:
+            LLM_REQUEST_SECONDS.labels(kind, outcome).observe(time.perf_counter() - started, exemplar=exemplar())
+
+    def _cache_key(self, subject: str, sender: str, content: str) -> str:
+        return analysis_cache.make_key(self.model, f"{PROMPT_VERSION}-{self.variant}", subject, sender, content)
+
+    def _estimate_tokens(self, text: str) -> int:
+        return content_reducer.count_tokens(text)
+
+    async def _reduce(self, content: str) -> str:
+        return await self.processor.reduce(content, self.content_budget, strip_links=self.variant == "slim")
+
     def _create_analysis_prompt(self, subject: str, sender: str, content: str) -> str:
         return f"""You are a professional email content editor. Please intelligently process the following email:
 
 Original Email:
 Subject: {subject}
 Sender: {sender}
-Content: {content[:3000]}
+Content: {content}
 
 Please perform the following tasks:
-1. **Content Classification**: Determine email type (AI_NEWS|SHOPPING|EVENT|TECH|FINANCE|OTHER)
-2. **Importance Scoring**: Rate 1-10 scale based on content value and timeliness
-3. **Markdown Reformatting**: Reorganize content into clean Markdown format
-4. **Image Processing**: Extract image URLs, add appropriate alt descriptions
-5. **Content Distillation**: Generate concise summary and key points
+{self.tasks}
 
 Return JSON format:
 {{
-  "category": "classification",
-  "importance_score": score,
-  "title_optimized": "optimized title",
-  "summary": "one-sentence compelling summary",
-  "content_markdown": "reformatted Markdown content",
-  "key_points": ["key points list"],
-  "tags": ["relevant tags"],
-  "images": [{{"url": "image_link", "alt": "description", "caption": "title"}}],
-  "important_links": ["important links"],
-  "reading_time": estimated_minutes,
-  "sentiment": "positive|neutral|negative",
-  "action_items": ["actionable suggestions"]
+{self.fields}
 }}"""
-    
-    def _get_default_analysis(self) -> Dict[str, Any]:
+
+    def _format_batch_email(self, item: Dict[str, str]) -> str:
+        return f"""<email id="{item['id']}">
+Subject: {item['subject']}
+Sender: {item['sender']}
+Content: {item['content']}
+</email>"""
+
+    def _create_batch_analysis_prompt(self, batch: List[Dict[str, str]]) -> str:
+        emails = "\n\n".join(self._format_batch_email(item) for item in batch)
+
+        return f"""You are a professional email content editor. Please intelligently process each of the following {len(batch)} emails independently:
+
+{emails}
+
+For every email, perform the following tasks:
+{self.tasks}
+
+Return a JSON array with exactly one object per email, using the email id attribute as "id":
+[
+  {{
+  "id": "email id",
+{self.fields}
+  }}
+]"""
+
+    def _get_default_analysis(self, reason: str) -> Dict[str, Any]:
+        ANALYSIS_FALLBACKS.labels(reason).inc()
         return {
             "category": "OTHER",
             "importance_score": 5,
@@ -102,5 +316,6 @@ Return JSON format:
             "important_links": [],
             "reading_time": 1,
             "sentiment": "neutral",
-            "action_items": []
-        }
\ No newline at end of file
+            "action_items": [],
+            "source": "fallback"
+        }
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+from redis.asyncio import Redis
+from app.core.config import settings
+from app.core.redis import redis_client
+import logging
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+class AnalysisCache:
+    def __init__(
+        self,
+        redis: Redis,
+        max_entries: int,
+        ttl: int,
+        prefix: str = "analysis_cache"
+    ):
+        self.redis = redis
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.prefix = prefix
+        self._local: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def make_key(
+        self,
+        model: str,
+        prompt_version: str,
+        subject: str,
+        sender: str,
+        content: str
+    ) -> str:
+        normalized = "\x00".join(
+            WHITESPACE_RE.sub(" ", part or "").strip()
+            for part in (subject, sender, content)
+        )
+        digest = hashlib.sha256(
+            f"{model}\x00{prompt_version}\x00{normalized}".encode("utf-8")
+        ).hexdigest()
+        return f"{self.prefix}:{digest}"
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not settings.ANALYSIS_CACHE_ENABLED:
+            return None
+
+        entry = self._local.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(key)
+                self.local_hits += 1
+                return dict(value)
+            del self._local[key]
+
+        try:
+            raw = await self.redis.get(key)
+        except Exception as e:
+            logger.warning(f"Analysis cache lookup failed: {e}")
+            raw = None
+
+        if raw is None:
+            self.misses += 1
+            return None
+
+        value = json.loads(raw)
+        self._set_local(key, value)
+        self.redis_hits += 1
+        return dict(value)
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        if not settings.ANALYSIS_CACHE_ENABLED:
+            return
+
+        self._set_local(key, value)
+
+        try:
+            await self.redis.set(key, json.dumps(value), ex=self.ttl)
+        except Exception as e:
+            logger.warning(f"Analysis cache write failed: {e}")
+
+    def _set_local(self, key: str, value: Dict[str, Any]):
+        self._local[key] = (time.monotonic() + self.ttl, dict(value))
+        self._local.move_to_end(key)
+
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.local_hits + self.redis_hits
+        lookups = hits + self.misses
+        return {
+            "enabled": settings.ANALYSIS_CACHE_ENABLED,
+            "local_entries": len(self._local),
+            "local_max_entries": self.max_entries,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": hits / lookups if lookups else 0.0
+        }
+
+analysis_cache = AnalysisCache(
+    redis_client,
+    max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+    ttl=settings.ANALYSIS_CACHE_TTL
+)
@@ -0,0 +1,307 @@
+import asyncio
+import json
+import random
+import time
+from typing import Awaitable, Callable, Dict, Any, List, NamedTuple, Optional
+from redis.asyncio import Redis
+from app.core.config import settings
+from app.core.redis import redis_client
+import logging
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[str], Awaitable[None]]
+BatchJobHandler = Callable[[List[str]], Awaitable[None]]
+
+CLAIM_SCRIPT = """
+local job_id = redis.call('RPOP', KEYS[1])
+if not job_id then
+    return nil
+end
+redis.call('ZADD', KEYS[2], ARGV[1], job_id)
+return {job_id, redis.call('HINCRBY', KEYS[3], job_id, 1)}
+"""
+
+RELEASE_SCRIPT = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+return redis.call('ZREM', KEYS[1], ARGV[1])
+"""
+
+ACK_SCRIPT = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+return 1
+"""
+
+ENQUEUE_SCRIPT = """
+if redis.call('HEXISTS', KEYS[3], ARGV[1]) == 1 then
+    return 0
+end
+if redis.call('HSETNX', KEYS[2], ARGV[1], ARGV[2]) == 0 then
+    return 0
+end
+redis.call('LPUSH', KEYS[1], ARGV[1])
+return 1
+"""
+
+class Claim(NamedTuple):
+    job_id: str
+    attempt: int
+    deadline: float
+
+class AnalysisQueue:
+    def __init__(self, redis: Redis, prefix: str = "analysis_queue"):
+        self.redis = redis
+        self.pending_key = f"{prefix}:pending"
+        self.inflight_key = f"{prefix}:inflight"
+        self.delayed_key = f"{prefix}:delayed"
+        self.jobs_key = f"{prefix}:jobs"
+        self.attempts_key = f"{prefix}:attempts"
+        self.dead_key = f"{prefix}:dead"
+        self._claim = redis.register_script(CLAIM_SCRIPT)
+        self._enqueue = redis.register_script(ENQUEUE_SCRIPT)
+        self._release = redis.register_script(RELEASE_SCRIPT)
+        self._ack_claim = redis.register_script(ACK_SCRIPT)
+        self._handler: Optional[JobHandler] = None
+        self._batch_handler: Optional[BatchJobHandler] = None
+        self._workers: List[asyncio.Task] = []
+        self._maintenance: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    async def enqueue(self, email_id: str) -> bool:
+        return bool(await self._enqueue(
+            keys=[self.pending_key, self.jobs_key, self.dead_key],
+            args=[email_id, self._job_payload(email_id)]
+        ))
+
+    async def enqueue_many(self, email_ids: List[str]) -> int:
+        if not email_ids:
+            return 0
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for email_id in email_ids:
+                await self._enqueue(
+                    keys=[self.pending_key, self.jobs_key, self.dead_key],
+                    args=[email_id, self._job_payload(email_id)],
+                    client=pipe
+                )
+            results = await pipe.execute()
+
+        return sum(1 for result in results if result)
+
+    def _job_payload(self, email_id: str) -> str:
+        return json.dumps({"email_id": email_id, "enqueued_at": time.time()})
+
+    async def requeue_dead(self, email_id: str) -> bool:
+        await self.redis.hdel(self.dead_key, email_id)
+        return await self.enqueue(email_id)
+
+    async def start(
+        self,
+        handler: JobHandler,
+        batch_handler: Optional[BatchJobHandler] = None,
+        concurrency: Optional[int] = None
+    ):
+        self._handler = handler
+        self._batch_handler = batch_handler
+        self._stopping.clear()
+        concurrency = concurrency or settings.ANALYSIS_QUEUE_CONCURRENCY
+
+        self._workers = [
+            asyncio.create_task(self._worker_loop(idx))
+            for idx in range(concurrency)
+        ]
+        self._maintenance = asyncio.create_task(self._maintenance_loop())
+        logger.info(f"Analysis queue started with {concurrency} workers")
+
+    async def stop(self):
+        self._stopping.set()
+        tasks = self._workers + ([self._maintenance] if self._maintenance else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._maintenance = None
+        logger.info("Analysis queue stopped")
+
+    async def depth(self) -> int:
+        return await self.redis.llen(self.pending_key)
+
+    async def stats(self) -> Dict[str, Any]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.llen(self.pending_key)
+            pipe.zcard(self.inflight_key)
+            pipe.zcard(self.delayed_key)
+            pipe.hlen(self.dead_key)
+            pipe.lindex(self.pending_key, -1)
+            depth, in_flight, delayed, dead, oldest_id = await pipe.execute()
+
+        oldest_job_age = None
+        if oldest_id:
+            job = await self.redis.hget(self.jobs_key, oldest_id)
+            if job:
+                oldest_job_age = max(0.0, time.time() - json.loads(job)["enqueued_at"])
+
+        return {
+            "depth": depth,
+            "in_flight": in_flight,
+            "delayed": delayed,
+            "dead_letter": dead,
+            "oldest_job_age_seconds": oldest_job_age,
+            "workers": len(self._workers)
+        }
+
+    async def _claim_job(self) -> Optional[Claim]:
+        deadline = time.time() + settings.ANALYSIS_QUEUE_VISIBILITY_TIMEOUT
+        claimed = await self._claim(
+            keys=[self.pending_key, self.inflight_key, self.attempts_key],
+            args=[deadline]
+        )
+        if not claimed:
+            return None
+        job_id, attempt = claimed
+        return Claim(job_id, int(attempt), deadline)
+
+    async def _claim_jobs(self) -> List[Claim]:
+        limit = settings.ANALYSIS_BATCH_MAX_SIZE if self._batch_handler else 1
+        claims = []
+
+        while len(claims) < limit:
+            claim = await self._claim_job()
+            if claim is None:
+                break
+            claims.append(claim)
+
+        return claims
+
+    def _handler_timeout(self, claims: List[Claim]) -> float:
+        margin = min(
+            settings.ANALYSIS_QUEUE_VISIBILITY_MARGIN,
+            settings.ANALYSIS_QUEUE_VISIBILITY_TIMEOUT / 2
+        )
+        return max(0.0, min(claim.deadline for claim in claims) - margin - time.time())
+
+    async def _worker_loop(self, worker_id: int):
+        while not self._stopping.is_set():
+            try:
+                claims = await self._claim_jobs()
+                if not claims:
+                    await asyncio.sleep(settings.ANALYSIS_QUEUE_POLL_INTERVAL)
+                    continue
+
+                if len(claims) == 1:
+                    await self._run_job(claims[0])
+                else:
+                    await self._run_batch(claims)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Analysis worker {worker_id} error: {e}")
+                await asyncio.sleep(settings.ANALYSIS_QUEUE_POLL_INTERVAL)
+
+    async def _run_job(self, claim: Claim):
+        try:
+            await asyncio.wait_for(
+                self._handler(claim.job_id),
+                timeout=self._handler_timeout([claim])
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Analysis job {claim.job_id} failed: {e!r}")
+            await self._fail(claim.job_id, repr(e), claim)
+        else:
+            await self._ack(claim)
+
+    async def _run_batch(self, claims: List[Claim]):
+        try:
+            await asyncio.wait_for(
+                self._batch_handler([claim.job_id for claim in claims]),
+                timeout=self._handler_timeout(claims)
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Analysis batch of {len(claims)} jobs failed: {e!r}")
+            for claim in claims:
+                await self._fail(claim.job_id, repr(e), claim)
+        else:
+            for claim in claims:
+                await self._ack(claim)
+
+    async def _ack(self, claim: Claim):
+        acked = await self._ack_claim(
+            keys=[self.inflight_key, self.attempts_key, self.jobs_key],
+            args=[claim.job_id, claim.attempt]
+        )
+        if not acked:
+            logger.warning(f"Analysis job {claim.job_id} attempt {claim.attempt} finished after its claim expired")
+
+    async def _fail(self, job_id: str, error: str, claim: Optional[Claim] = None):
+        if claim is not None:
+            released = await self._release(
+                keys=[self.inflight_key, self.attempts_key],
+                args=[job_id, claim.attempt]
+            )
+        else:
+            released = await self.redis.zrem(self.inflight_key, job_id)
+        if not released:
+            return
+
+        attempts = int(await self.redis.hget(self.attempts_key, job_id) or 0)
+        if attempts >= settings.ANALYSIS_QUEUE_MAX_ATTEMPTS:
+            await self._dead_letter(job_id, attempts, error)
+            return
+
+        delay = min(
+            settings.ANALYSIS_QUEUE_RETRY_BASE_DELAY * (2 ** (attempts - 1)),
+            settings.ANALYSIS_QUEUE_RETRY_MAX_DELAY
+        )
+        delay *= random.uniform(0.5, 1.0)
+        await self.redis.zadd(self.delayed_key, {job_id: time.time() + delay})
+        logger.info(f"Analysis job {job_id} retry {attempts} scheduled in {delay:.1f}s")
+
+    async def _dead_letter(self, job_id: str, attempts: int, error: str):
+        record = json.dumps({
+            "email_id": job_id,
+            "attempts": attempts,
+            "error": error,
+            "failed_at": time.time()
+        })
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self.dead_key, job_id, record)
+            pipe.hdel(self.jobs_key, job_id)
+            pipe.hdel(self.attempts_key, job_id)
+            await pipe.execute()
+        logger.warning(f"Analysis job {job_id} moved to dead letter after {attempts} attempts")
+
+    async def _promote_delayed(self, now: float):
+        for job_id in await self.redis.zrangebyscore(self.delayed_key, "-inf", now):
+            if await self.redis.zrem(self.delayed_key, job_id):
+                await self.redis.lpush(self.pending_key, job_id)
+
+    async def _maintenance_loop(self):
+        while not self._stopping.is_set():
+            try:
+                now = time.time()
+                await self._promote_delayed(now)
+
+                for job_id in await self.redis.zrangebyscore(self.inflight_key, "-inf", now):
+                    logger.warning(f"Analysis job {job_id} exceeded visibility timeout")
+                    await self._fail(job_id, "visibility timeout expired")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Analysis queue maintenance error: {e}")
+
+            await asyncio.sleep(max(settings.ANALYSIS_QUEUE_POLL_INTERVAL, 1.0))
+
+analysis_queue = AnalysisQueue(redis_client)
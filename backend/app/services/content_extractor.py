@@ -0,0 +1,116 @@
+import math
+import re
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+from bs4 import BeautifulSoup
+from app.services.html_cleaner import LXML_ERRORS, lxml_available, strip_xml_declaration
+import logging
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+logger = logging.getLogger(__name__)
+
+WORDS_PER_MINUTE = 200
+MAX_LINKS = 10
+MAX_IMAGES = 10
+
+URL_RE = re.compile(r"https?://[^\s<>()\"']+[^\s<>()\"'.,;:!?]")
+MARKDOWN_LINK_RE = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+HIDDEN_STYLE_RE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden|(?:width|height)\s*:\s*[01]px")
+TRACKING_URL_RE = re.compile(r"(?:^|[/._?=-])(?:pixel|beacon|open|track|tracking)(?:[/._?=-]|$)")
+SKIPPED_LINK_RE = re.compile(
+    r"unsubscribe|opt-?out|preferences|prefs|manage[-_ ]?subscription|view[-_ ]?in[-_ ]?browser|privacy"
+)
+
+def reading_time(text: str) -> int:
+    words = len(WORD_RE.findall(MARKDOWN_LINK_RE.sub(r"\1", text or "")))
+    return max(1, math.ceil(words / WORDS_PER_MINUTE))
+
+def extract_from_html(raw_html: str, use_lxml: bool = True) -> Dict[str, List[Any]]:
+    anchors = None
+    if use_lxml and lxml_available():
+        try:
+            root = lxml.html.document_fromstring(strip_xml_declaration(raw_html))
+            anchors = [(a.get("href"), a.text_content()) for a in root.iter("a")]
+            images = [dict(img.attrib) for img in root.iter("img")]
+        except LXML_ERRORS as e:
+            logger.warning(f"lxml could not parse email HTML, using BeautifulSoup: {e}")
+    if anchors is None:
+        soup = BeautifulSoup(raw_html, "html.parser")
+        anchors = [(a.get("href"), a.get_text()) for a in soup.find_all("a")]
+        images = [
+            {key: " ".join(value) if isinstance(value, list) else value for key, value in img.attrs.items()}
+            for img in soup.find_all("img")
+        ]
+
+    return {
+        "important_links": _select_links(anchors),
+        "images": _select_images(images)
+    }
+
+def extract_from_text(text: str) -> Dict[str, List[Any]]:
+    return {
+        "important_links": _select_links([(url, url) for url in URL_RE.findall(text or "")]),
+        "images": []
+    }
+
+def _select_links(anchors: List[tuple]) -> List[str]:
+    links: List[str] = []
+    seen = set()
+
+    for href, label in anchors:
+        href = (href or "").strip()
+        if not _is_http(href) or href in seen:
+            continue
+        if SKIPPED_LINK_RE.search(href.lower()) or SKIPPED_LINK_RE.search((label or "").lower()):
+            continue
+
+        seen.add(href)
+        links.append(href)
+        if len(links) >= MAX_LINKS:
+            break
+
+    return links
+
+def _select_images(images: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    selected: List[Dict[str, str]] = []
+    seen = set()
+
+    for attrs in images:
+        url = (attrs.get("src") or "").strip()
+        if not _is_http(url) or url in seen or _is_tracking_pixel(url, attrs):
+            continue
+
+        seen.add(url)
+        alt = (attrs.get("alt") or "").strip()
+        selected.append({
+            "url": url,
+            "alt": alt,
+            "caption": (attrs.get("title") or alt).strip()
+        })
+        if len(selected) >= MAX_IMAGES:
+            break
+
+    return selected
+
+def _is_tracking_pixel(url: str, attrs: Dict[str, str]) -> bool:
+    width = _dimension(attrs.get("width"))
+    height = _dimension(attrs.get("height"))
+    if (width is not None and width <= 2) or (height is not None and height <= 2):
+        return True
+
+    if HIDDEN_STYLE_RE.search((attrs.get("style") or "").lower()):
+        return True
+
+    return not (attrs.get("alt") or "").strip() and TRACKING_URL_RE.search(urlsplit(url).path.lower()) is not None
+
+def _dimension(value: Optional[str]) -> Optional[int]:
+    match = re.match(r"\s*(\d+)", value or "")
+    return int(match.group(1)) if match else None
+
+def _is_http(url: str) -> bool:
+    return url.lower().startswith(("http://", "https://"))
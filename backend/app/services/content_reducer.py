@@ -0,0 +1,243 @@
+import argparse
+import hashlib
+import os
+import re
+from typing import Dict, List, Optional
+from app.core.config import settings
+import logging
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("TIKTOKEN_CACHE_DIR", os.path.join(BACKEND_DIR, settings.TIKTOKEN_CACHE_DIR))
+
+TIKTOKEN_BLOB_URL = "https://openaipublic.blob.core.windows.net/encodings/{}.tiktoken"
+
+LEAD_TOKENS = 60
+
+HEADING_RE = re.compile(r"^\s{0,3}(#{1,6})\s+\S|^\s*\*\*[^*]+\*\*\s*$")
+BLOCK_SPLIT_RE = re.compile(r"\n\s*\n")
+LINK_RE = re.compile(r"!?\[([^\]]*)\]\(([^)]*)\)|https?://\S+")
+MARKDOWN_LINK_RE = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+HEURISTIC_TOKEN_RE = re.compile(r"\w{1,6}|[^\w\s]", re.UNICODE)
+NORMALIZE_RE = re.compile(r"[\W\d_]+", re.UNICODE)
+BOILERPLATE_RE = re.compile(
+    r"view (?:this email )?in (?:your )?browser|unsubscribe|email preferences|forward to a friend"
+    r"|add us to your address book|you(?:'re| are) receiving this|privacy policy|all rights reserved"
+)
+
+class Block:
+    def __init__(self, text: str, section: int, index: int, tokens: int):
+        self.text = text
+        self.section = section
+        self.index = index
+        self.tokens = tokens
+        self.score = 0.0
+
+class ContentReducer:
+    def __init__(self, encoding_name: str):
+        self.encoding_name = encoding_name
+        self._encoding = None
+        self._encoding_loaded = False
+
+    def load(self):
+        self._get_encoding()
+        logger.info(f"Content reducer tokenizer: {self.tokenizer}")
+
+    @property
+    def tokenizer(self) -> str:
+        return self.encoding_name if self._get_encoding() is not None else "heuristic"
+
+    def count_tokens(self, text: str) -> int:
+        encoding = self._get_encoding()
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+        return len(HEURISTIC_TOKEN_RE.findall(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if max_tokens <= 0:
+            return ""
+
+        encoding = self._get_encoding()
+        if encoding is not None:
+            tokens = encoding.encode(text, disallowed_special=())
+            return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+
+        for i, match in enumerate(HEURISTIC_TOKEN_RE.finditer(text)):
+            if i == max_tokens:
+                return text[:match.start()].rstrip()
+        return text
+
+    def reduce(self, content: str, budget: int, strip_links: bool = False) -> str:
+        content = (content or "").strip()
+        compact = MARKDOWN_LINK_RE.sub(r"\1", content) if strip_links else content
+        if self.count_tokens(compact) <= budget:
+            return compact
+
+        headings, blocks = self._split(content)
+        blocks = self._dedupe(blocks)
+        if not blocks:
+            return self.truncate(compact, budget)
+
+        for block in blocks:
+            block.score = self._score(block, len(blocks), headings[block.section] is not None)
+            if strip_links:
+                block.text = MARKDOWN_LINK_RE.sub(r"\1", block.text)
+                block.tokens = self.count_tokens(block.text)
+        if strip_links:
+            headings = [heading and MARKDOWN_LINK_RE.sub(r"\1", heading) for heading in headings]
+
+        ranked = sorted(
+            (block for block in blocks if block.score > 0),
+            key=lambda block: (-block.score, block.index)
+        )
+
+        chosen: Dict[int, str] = {}
+        headed = set()
+        remaining = budget
+
+        def take(block: Block, text: str, tokens: int) -> bool:
+            nonlocal remaining
+            heading = headings[block.section]
+            cost = tokens
+            if heading is not None and block.section not in headed:
+                cost += self.count_tokens(heading)
+            if cost > remaining:
+                return False
+            chosen[block.index] = text
+            headed.add(block.section)
+            remaining -= cost
+            return True
+
+        lead_tokens: Dict[int, int] = {}
+        for block in ranked:
+            if block.section in headed:
+                continue
+            lead = self.truncate(SENTENCE_END_RE.split(block.text, maxsplit=1)[0], LEAD_TOKENS)
+            tokens = self.count_tokens(lead)
+            if take(block, lead, tokens):
+                lead_tokens[block.index] = tokens
+
+        for block in ranked:
+            if block.index in chosen:
+                extra = block.tokens - lead_tokens[block.index]
+                if 0 < extra <= remaining:
+                    chosen[block.index] = block.text
+                    remaining -= extra
+            else:
+                take(block, block.text, block.tokens)
+
+        if not chosen:
+            return self.truncate(compact, budget)
+
+        parts: List[str] = []
+        emitted = set()
+        for block in blocks:
+            if block.index not in chosen:
+                continue
+            heading = headings[block.section]
+            if heading is not None and block.section not in emitted:
+                parts.append(heading)
+                emitted.add(block.section)
+            parts.append(chosen[block.index])
+
+        return "\n\n".join(parts)
+
+    def _split(self, content: str):
+        headings: List[Optional[str]] = [None]
+        blocks: List[Block] = []
+
+        for raw in BLOCK_SPLIT_RE.split(content):
+            lines = [line for line in raw.strip().split("\n") if line.strip()]
+            body: List[str] = []
+
+            for line in lines:
+                if HEADING_RE.match(line):
+                    if body:
+                        blocks.append(self._block("\n".join(body), len(headings) - 1, len(blocks)))
+                        body = []
+                    headings.append(line.strip())
+                else:
+                    body.append(line)
+
+            if body:
+                blocks.append(self._block("\n".join(body), len(headings) - 1, len(blocks)))
+
+        return headings, blocks
+
+    def _block(self, text: str, section: int, index: int) -> Block:
+        return Block(text, section, index, self.count_tokens(text))
+
+    def _dedupe(self, blocks: List[Block]) -> List[Block]:
+        seen = set()
+        unique = []
+        for block in blocks:
+            normalized = NORMALIZE_RE.sub(" ", LINK_RE.sub(r"\1", block.text).lower()).strip()
+            digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+            if not normalized or digest in seen:
+                continue
+            seen.add(digest)
+            unique.append(block)
+        return unique
+
+    def _score(self, block: Block, total: int, has_heading: bool) -> float:
+        text = block.text
+        if BOILERPLATE_RE.search(text.lower()):
+            return 0.0
+
+        link_chars = sum(len(match.group(0)) for match in LINK_RE.finditer(text))
+        link_density = link_chars / max(len(text), 1)
+        words = len(WORD_RE.findall(LINK_RE.sub(r"\1", text)))
+
+        score = 1.0 + (0.5 if has_heading else 0.0)
+        score *= 1.0 / (1.0 + block.index / max(total, 1))
+        score *= (1.0 - link_density) ** 2
+        score *= min(1.0, words / 12)
+        return score
+
+    def _get_encoding(self, download: bool = False):
+        if self._encoding_loaded or tiktoken is None:
+            return self._encoding
+        self._encoding_loaded = True
+
+        if not download and not os.path.exists(tokenizer_cache_path(self.encoding_name)):
+            logger.warning(
+                f"Tokenizer {self.encoding_name} is not cached in {os.environ['TIKTOKEN_CACHE_DIR']}, "
+                f"estimating tokens"
+            )
+            return None
+
+        try:
+            self._encoding = tiktoken.get_encoding(self.encoding_name)
+        except Exception as e:
+            logger.warning(f"Tokenizer {self.encoding_name} unavailable, estimating tokens: {e}")
+        return self._encoding
+
+def tokenizer_cache_path(encoding_name: str) -> str:
+    blob_url = TIKTOKEN_BLOB_URL.format(encoding_name)
+    return os.path.join(os.environ["TIKTOKEN_CACHE_DIR"], hashlib.sha1(blob_url.encode()).hexdigest())
+
+content_reducer = ContentReducer(settings.CONTENT_REDUCER_ENCODING)
+
+def main():
+    parser = argparse.ArgumentParser(description="Download the tokenizer into TIKTOKEN_CACHE_DIR")
+    parser.add_argument("--encoding", default=settings.CONTENT_REDUCER_ENCODING)
+    args = parser.parse_args()
+
+    cache_dir = os.environ["TIKTOKEN_CACHE_DIR"]
+    os.makedirs(cache_dir, exist_ok=True)
+    reducer = ContentReducer(args.encoding)
+    if reducer._get_encoding(download=True) is None:
+        raise SystemExit(f"Could not load tokenizer {args.encoding}")
+    print(f"Tokenizer {args.encoding} cached in {cache_dir}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,191 @@
+import argparse
+import asyncio
+import copy
+import heapq
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import select, func, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import AsyncSessionLocal
+from app.models.email import Email
+from app.models.analyzed_content import AnalyzedContent
+from app.models.daily_aggregate import DailyAggregate
+import logging
+
+logger = logging.getLogger(__name__)
+
+TOP_STORIES_LIMIT = 10
+CATEGORY_TOP_ITEMS_LIMIT = 5
+TOP_ITEM_MIN_SCORE = 7
+
+async def record_analysis(
+    db: AsyncSession,
+    summary_date: date,
+    content: AnalyzedContent,
+    previous: Optional[Dict[str, Any]],
+    newly_processed: bool
+):
+    aggregate = await _lock_aggregate(db, summary_date)
+    email_id = str(content.email_id)
+
+    categories = copy.deepcopy(aggregate.categories or {})
+    top_stories = [
+        story for story in aggregate.top_stories or []
+        if story.get("email_id") != email_id
+    ]
+
+    if previous:
+        aggregate.analyzed_count = max(0, aggregate.analyzed_count - 1)
+        _remove_from_category(categories, email_id, previous)
+    if newly_processed:
+        aggregate.total_emails += 1
+
+    aggregate.analyzed_count += 1
+    _add_to_category(categories, email_id, content)
+
+    aggregate.categories = categories
+    aggregate.top_stories = _push_top(top_stories, _top_story(email_id, content), TOP_STORIES_LIMIT)
+
+def utc_day_bounds(summary_date: date) -> Tuple[datetime, datetime]:
+    start_datetime = datetime.combine(summary_date, datetime.min.time(), tzinfo=timezone.utc)
+    return start_datetime, start_datetime + timedelta(days=1)
+
+async def rebuild_daily_aggregate(db: AsyncSession, summary_date: date) -> DailyAggregate:
+    start_datetime, end_datetime = utc_day_bounds(summary_date)
+
+    total_emails = await db.scalar(
+        select(func.count(Email.id)).where(
+            and_(
+                Email.received_at >= start_datetime,
+                Email.received_at < end_datetime,
+                Email.processed == True
+            )
+        )
+    )
+
+    result = await db.execute(
+        select(
+            AnalyzedContent.email_id,
+            AnalyzedContent.category_id,
+            AnalyzedContent.importance_score,
+            AnalyzedContent.title_optimized,
+            AnalyzedContent.summary,
+            AnalyzedContent.key_points
+        )
+        .join(Email)
+        .where(
+            and_(
+                Email.received_at >= start_datetime,
+                Email.received_at < end_datetime
+            )
+        )
+    )
+
+    categories: Dict[str, Any] = {}
+    top_stories: List[Dict[str, Any]] = []
+    analyzed_count = 0
+
+    for row in result:
+        analyzed_count += 1
+        email_id = str(row.email_id)
+        _add_to_category(categories, email_id, row)
+        top_stories = _push_top(top_stories, _top_story(email_id, row), TOP_STORIES_LIMIT)
+
+    aggregate = await _lock_aggregate(db, summary_date)
+    aggregate.total_emails = total_emails or 0
+    aggregate.analyzed_count = analyzed_count
+    aggregate.categories = categories
+    aggregate.top_stories = top_stories
+
+    await db.commit()
+    logger.info(f"Rebuilt daily aggregate for {summary_date}: {analyzed_count} analyses")
+
+    return aggregate
+
+async def _lock_aggregate(db: AsyncSession, summary_date: date) -> DailyAggregate:
+    await db.execute(
+        pg_insert(DailyAggregate)
+        .values(
+            date=summary_date,
+            total_emails=0,
+            analyzed_count=0,
+            top_stories=[],
+            categories={}
+        )
+        .on_conflict_do_nothing(index_elements=["date"])
+    )
+
+    result = await db.execute(
+        select(DailyAggregate)
+        .where(DailyAggregate.date == summary_date)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+def _top_story(email_id: str, content: Any) -> Dict[str, Any]:
+    return {
+        "email_id": email_id,
+        "title": content.title_optimized,
+        "summary": content.summary,
+        "score": content.importance_score or 0,
+        "key_points": list(content.key_points or [])[:3]
+    }
+
+def _push_top(items: List[Dict[str, Any]], item: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    return heapq.nlargest(limit, items + [item], key=lambda x: x["score"])
+
+def _add_to_category(categories: Dict[str, Any], email_id: str, content: Any):
+    if not content.category_id:
+        return
+
+    stats = categories.setdefault(str(content.category_id), {
+        "count": 0,
+        "importance_total": 0,
+        "top_items": []
+    })
+    stats["count"] += 1
+    stats["importance_total"] += content.importance_score or 0
+
+    if content.importance_score and content.importance_score >= TOP_ITEM_MIN_SCORE:
+        stats["top_items"] = _push_top(
+            stats["top_items"],
+            {
+                "email_id": email_id,
+                "title": content.title_optimized,
+                "summary": content.summary,
+                "score": content.importance_score
+            },
+            CATEGORY_TOP_ITEMS_LIMIT
+        )
+
+def _remove_from_category(categories: Dict[str, Any], email_id: str, previous: Dict[str, Any]):
+    category_id = previous.get("category_id")
+    if not category_id or str(category_id) not in categories:
+        return
+
+    stats = categories[str(category_id)]
+    stats["count"] -= 1
+    stats["importance_total"] -= previous.get("importance_score") or 0
+    stats["top_items"] = [item for item in stats["top_items"] if item.get("email_id") != email_id]
+
+    if stats["count"] <= 0:
+        del categories[str(category_id)]
+
+async def _rebuild_range(start: date, days: int):
+    async with AsyncSessionLocal() as db:
+        for offset in range(days):
+            await rebuild_daily_aggregate(db, start + timedelta(days=offset))
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild daily summary aggregates from raw rows")
+    parser.add_argument("--date", type=date.fromisoformat, default=datetime.now(timezone.utc).date())
+    parser.add_argument("--days", type=int, default=1, help="Number of days to rebuild from --date")
+    args = parser.parse_args()
+
+    asyncio.run(_rebuild_range(args.date, args.days))
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,150 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from redis.exceptions import RedisError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import INGEST_COMMIT_SECONDS, observe_seconds
+from app.core.tracing import get_trace_id
+from app.models.email import Email
+from app.schemas.email import EmailCreate
+from app.services.analysis_queue import analysis_queue
+from app.services.event_bus import event_bus, EMAIL_INGESTED
+from app.services.rollups import record_received
+import logging
+
+logger = logging.getLogger(__name__)
+
+class BackendSaturatedError(Exception):
+    pass
+
+async def check_capacity():
+    try:
+        depth = await analysis_queue.depth()
+    except (RedisError, OSError) as e:
+        raise BackendSaturatedError(f"Analysis queue unavailable: {e}")
+    if depth >= settings.INGEST_MAX_QUEUE_DEPTH:
+        raise BackendSaturatedError(
+            f"Analysis queue depth {depth} exceeds {settings.INGEST_MAX_QUEUE_DEPTH}"
+        )
+
+async def ingest_email(db: AsyncSession, email_data: EmailCreate) -> Email:
+    emails = await ingest_emails(db, [email_data])
+    return emails[0]
+
+async def submit_email(email_data: EmailCreate) -> Email:
+    if settings.INGEST_MICRO_BATCH_ENABLED:
+        return await ingest_batcher.submit(email_data)
+
+    async with AsyncSessionLocal() as db:
+        return await ingest_email(db, email_data)
+
+async def ingest_emails(
+    db: AsyncSession,
+    items: List[EmailCreate],
+    trace_ids: Optional[List[Optional[str]]] = None
+) -> List[Email]:
+    if not items:
+        return []
+
+    received_at = datetime.now(timezone.utc)
+    trace_ids = trace_ids or [get_trace_id()] * len(items)
+    rows = [
+        {
+            "subject": item.subject,
+            "sender_email": item.sender_email,
+            "sender_name": item.sender_name,
+            "raw_content": item.raw_content,
+            "received_at": received_at,
+            "trace_id": trace_id
+        }
+        for item, trace_id in zip(items, trace_ids)
+    ]
+
+    with observe_seconds(INGEST_COMMIT_SECONDS):
+        result = await db.scalars(
+            insert(Email)
+            .returning(Email, sort_by_parameter_order=True)
+            .options(undefer(Email.raw_content)),
+            rows
+        )
+        emails = result.all()
+        await record_received(db, emails)
+        await db.commit()
+
+    try:
+        await analysis_queue.enqueue_many([str(email.id) for email in emails])
+    except Exception as e:
+        logger.error(f"Enqueue of {len(emails)} stored emails failed, left for the startup requeue: {e}")
+
+    try:
+        await event_bus.publish_many(EMAIL_INGESTED, [
+            {
+                "email_id": str(email.id),
+                "subject": email.subject,
+                "sender_email": email.sender_email,
+                "sender_name": email.sender_name,
+                "received_at": email.received_at.isoformat(),
+                "trace_id": email.trace_id
+            }
+            for email in emails
+        ])
+    except Exception as e:
+        logger.warning(f"Publishing {len(emails)} ingested emails failed: {e}")
+
+    return emails
+
+class IngestBatcher:
+    def __init__(self, window: float, max_size: int):
+        self.window = window
+        self.max_size = max_size
+        self._pending: List[Tuple[EmailCreate, Optional[str], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, email_data: EmailCreate) -> Email:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((email_data, get_trace_id(), future))
+
+        if len(self._pending) >= self.max_size:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._schedule_flush)
+
+        return await future
+
+    def _schedule_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        items, self._pending = self._pending, []
+        if items:
+            asyncio.get_running_loop().create_task(self._flush(items))
+
+    async def _flush(self, items: List[Tuple[EmailCreate, Optional[str], asyncio.Future]]):
+        try:
+            async with AsyncSessionLocal() as db:
+                emails = await ingest_emails(
+                    db,
+                    [email_data for email_data, _, _ in items],
+                    [trace_id for _, trace_id, _ in items]
+                )
+        except Exception as e:
+            logger.error(f"Group commit of {len(items)} emails failed: {e}")
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, _, future), email in zip(items, emails):
+            if not future.done():
+                future.set_result(email)
+
+ingest_batcher = IngestBatcher(
+    window=settings.INGEST_MICRO_BATCH_WINDOW_MS / 1000,
+    max_size=settings.INGEST_MICRO_BATCH_MAX_SIZE
+)
@@ -0,0 +1,312 @@
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+from uuid import UUID
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer, undefer_group
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import EMAIL_PROCESSING_LAG_SECONDS, exemplar, pipeline_stage
+from app.core.tracing import trace_context
+from app.models.email import Email
+from app.models.analyzed_content import AnalyzedContent
+from app.models.category import Category
+from app.services.email_processor import EmailProcessor
+from app.services.ai_analyzer import AIAnalyzer
+from app.services.analysis_queue import analysis_queue
+from app.services.daily_aggregates import record_analysis
+from app.services.event_bus import event_bus, EMAIL_ANALYZED
+from app.services.near_duplicates import near_duplicate_index, compute_signature, Signature
+from app.services.pre_classifier import pre_classifier
+from app.services.rollups import record_processed
+import logging
+
+logger = logging.getLogger(__name__)
+
+async def process_email(email_id: str):
+    timings: Dict[str, float] = {}
+    async with AsyncSessionLocal() as db:
+        processor = EmailProcessor()
+        analyzer = AIAnalyzer()
+
+        query = (
+            select(Email)
+            .where(Email.id == UUID(email_id))
+            .options(undefer(Email.raw_content))
+        )
+        result = await db.execute(query)
+        email = result.scalar_one_or_none()
+
+        if not email:
+            logger.warning(f"Email {email_id} no longer exists, skipping analysis")
+            return
+
+        with trace_context(email.trace_id):
+            with pipeline_stage("extract", timings):
+                extraction = await processor.extract(email.raw_content)
+                processed_content = extraction["content"]
+                signature = await compute_signature(processed_content) if settings.DEDUP_ENABLED else None
+
+            with pipeline_stage("analyze", timings):
+                analysis_result = await _reuse_duplicate_analysis(db, email, signature)
+                if analysis_result is None:
+                    prediction = pre_classifier.predict(email.subject, email.sender_email, processed_content)
+                    if pre_classifier.should_skip_llm(prediction):
+                        analysis_result = pre_classifier.local_analysis(prediction, email.subject, processed_content)
+                    else:
+                        analysis_result = await analyzer.analyze(
+                            subject=email.subject,
+                            sender=email.sender_email,
+                            content=processed_content
+                        )
+                        pre_classifier.record_llm_result(prediction, analysis_result)
+                    analysis_result = _apply_extraction(analysis_result, extraction)
+
+            with pipeline_stage("persist", timings):
+                await store_analysis(db, email, analysis_result)
+                await db.commit()
+
+            _record_timings(email, timings)
+
+    await _index_originals([email], {email.id: signature})
+    await response_cache.invalidate("analytics", "summaries")
+    await event_bus.publish(EMAIL_ANALYZED, _analyzed_event(email, analysis_result))
+
+async def process_emails(email_ids: List[str]):
+    async with AsyncSessionLocal() as db:
+        processor = EmailProcessor()
+        analyzer = AIAnalyzer()
+
+        result = await db.execute(
+            select(Email)
+            .where(Email.id.in_([UUID(email_id) for email_id in email_ids]))
+            .options(undefer(Email.raw_content))
+        )
+        emails = result.scalars().all()
+
+        if not emails:
+            return
+
+        batch = []
+        analyses = {}
+        signatures = {}
+        predictions = {}
+        extractions = {}
+        timings: Dict[str, Dict[str, float]] = {str(email.id): {} for email in emails}
+        for email in emails:
+            email_timings = timings[str(email.id)]
+            with trace_context(email.trace_id):
+                with pipeline_stage("extract", email_timings):
+                    extraction = await processor.extract(email.raw_content)
+                    processed_content = extraction["content"]
+                    signatures[email.id] = await compute_signature(processed_content) if settings.DEDUP_ENABLED else None
+
+                with pipeline_stage("analyze", email_timings):
+                    reused = await _reuse_duplicate_analysis(db, email, signatures[email.id])
+                    if reused is not None:
+                        analyses[str(email.id)] = reused
+                        continue
+
+                    prediction = pre_classifier.predict(email.subject, email.sender_email, processed_content)
+                    if pre_classifier.should_skip_llm(prediction):
+                        analyses[str(email.id)] = _apply_extraction(
+                            pre_classifier.local_analysis(prediction, email.subject, processed_content),
+                            extraction
+                        )
+                        continue
+
+            predictions[str(email.id)] = prediction
+            extractions[str(email.id)] = extraction
+            batch.append({
+                "id": str(email.id),
+                "subject": email.subject,
+                "sender": email.sender_email,
+                "content": processed_content
+            })
+
+        batch_timings: Dict[str, float] = {}
+        with pipeline_stage("analyze_batch", batch_timings):
+            analyses.update(await analyzer.analyze_batch(batch))
+        for email_id, prediction in predictions.items():
+            pre_classifier.record_llm_result(prediction, analyses[email_id])
+            analyses[email_id] = _apply_extraction(analyses[email_id], extractions[email_id])
+            timings[email_id].update(batch_timings)
+
+        with pipeline_stage("persist", batch_timings):
+            for email in sorted(emails, key=lambda email: email.received_at):
+                await store_analysis(db, email, analyses[str(email.id)])
+
+            await db.commit()
+
+        for email in emails:
+            with trace_context(email.trace_id):
+                _record_timings(email, {**timings[str(email.id)], "persist": batch_timings["persist"]})
+
+    await _index_originals(emails, signatures)
+    await response_cache.invalidate("analytics", "summaries")
+    await event_bus.publish_many(EMAIL_ANALYZED, [
+        _analyzed_event(email, analyses[str(email.id)])
+        for email in emails
+    ])
+
+async def store_analysis(
+    db: AsyncSession,
+    email: Email,
+    analysis: Dict[str, Any]
+) -> AnalyzedContent:
+    previous = await db.execute(
+        delete(AnalyzedContent)
+        .where(AnalyzedContent.email_id == email.id)
+        .returning(AnalyzedContent.category_id, AnalyzedContent.importance_score)
+    )
+    previous_row = previous.first()
+
+    content = AnalyzedContent(
+        email_id=email.id,
+        category_id=await _resolve_category_id(db, analysis.get("category")),
+        importance_score=analysis.get("importance_score"),
+        title_optimized=analysis.get("title_optimized"),
+        summary=analysis.get("summary"),
+        content_markdown=analysis.get("content_markdown"),
+        key_points=analysis.get("key_points", []),
+        tags=analysis.get("tags", []),
+        images=analysis.get("images", []),
+        important_links=analysis.get("important_links", []),
+        reading_time=analysis.get("reading_time"),
+        sentiment=analysis.get("sentiment"),
+        action_items=analysis.get("action_items", []),
+        source=analysis.get("source", "llm")
+    )
+    db.add(content)
+
+    await record_analysis(
+        db,
+        email.received_at.astimezone(timezone.utc).date(),
+        content,
+        previous=dict(previous_row._mapping) if previous_row else None,
+        newly_processed=not email.processed
+    )
+    await record_processed(
+        db,
+        email,
+        category_id=content.category_id,
+        previous_category_id=previous_row.category_id if previous_row else None,
+        newly_processed=not email.processed,
+        reanalyzed=previous_row is not None
+    )
+
+    await db.execute(
+        update(Email)
+        .where(Email.id == email.id)
+        .values(processed=True)
+    )
+    return content
+
+def _apply_extraction(analysis: Dict[str, Any], extraction: Dict[str, Any]) -> Dict[str, Any]:
+    analysis = {
+        **analysis,
+        "images": extraction["images"],
+        "important_links": extraction["important_links"],
+        "reading_time": extraction["reading_time"]
+    }
+    if not analysis.get("content_markdown") or analysis.get("source") == "fallback":
+        analysis["content_markdown"] = extraction["content"]
+    return analysis
+
+def _record_timings(email: Email, timings: Dict[str, float]):
+    stages = ", ".join(f"{stage} {seconds * 1000:.0f}ms" for stage, seconds in timings.items())
+    if email.received_at is None:
+        logger.info(f"Email {email.id} analyzed ({stages})")
+        return
+
+    received_at = email.received_at
+    if received_at.tzinfo is None:
+        received_at = received_at.replace(tzinfo=timezone.utc)
+    lag = max(0.0, (datetime.now(timezone.utc) - received_at).total_seconds())
+    EMAIL_PROCESSING_LAG_SECONDS.observe(lag, exemplar=exemplar())
+    logger.info(f"Email {email.id} analyzed {lag:.1f}s after receipt ({stages})")
+
+def _analyzed_event(email: Email, analysis: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "email_id": str(email.id),
+        "subject": email.subject,
+        "sender_email": email.sender_email,
+        "category": analysis.get("category"),
+        "importance_score": analysis.get("importance_score"),
+        "title": analysis.get("title_optimized"),
+        "summary": analysis.get("summary"),
+        "duplicate_of": str(email.duplicate_of_id) if email.duplicate_of_id else None,
+        "trace_id": email.trace_id
+    }
+
+async def _reuse_duplicate_analysis(
+    db: AsyncSession,
+    email: Email,
+    signature: Optional[Signature]
+) -> Optional[Dict[str, Any]]:
+    if signature is None:
+        return None
+
+    duplicate_of = await near_duplicate_index.find(signature, exclude=str(email.id))
+    if not duplicate_of:
+        return None
+
+    row = (await db.execute(
+        select(AnalyzedContent, Category.name)
+        .outerjoin(Category, Category.id == AnalyzedContent.category_id)
+        .where(AnalyzedContent.email_id == UUID(duplicate_of))
+        .options(undefer_group("body"))
+    )).first()
+
+    if row is None:
+        logger.info(f"Email {email.id} duplicates unanalyzed email {duplicate_of}, analyzing it anyway")
+        return None
+
+    email.duplicate_of_id = UUID(duplicate_of)
+    content, category = row
+    logger.info(f"Email {email.id} is a near-duplicate of {duplicate_of}, reusing its analysis")
+
+    return {
+        "category": category,
+        "importance_score": content.importance_score,
+        "title_optimized": content.title_optimized,
+        "summary": content.summary,
+        "content_markdown": content.content_markdown,
+        "key_points": content.key_points or [],
+        "tags": content.tags or [],
+        "images": content.images or [],
+        "important_links": content.important_links or [],
+        "reading_time": content.reading_time,
+        "sentiment": content.sentiment,
+        "action_items": content.action_items or [],
+        "source": "duplicate"
+    }
+
+async def _index_originals(emails: List[Email], signatures: Dict[UUID, Optional[Signature]]):
+    for email in emails:
+        signature = signatures.get(email.id)
+        if signature is not None and email.duplicate_of_id is None:
+            await near_duplicate_index.add(str(email.id), signature)
+
+async def _resolve_category_id(db: AsyncSession, name: Optional[str]) -> Optional[UUID]:
+    if not name:
+        return None
+
+    return await db.scalar(
+        select(Category.id).where(func.upper(Category.name) == name.upper())
+    )
+
+async def requeue_unprocessed() -> int:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Email.id)
+            .where(Email.processed == False)
+            .order_by(Email.received_at)
+        )
+        email_ids = [str(email_id) for email_id in result.scalars()]
+
+    requeued = await analysis_queue.enqueue_many(email_ids)
+
+    logger.info(f"Re-enqueued {requeued} unprocessed emails for analysis")
+    return requeued
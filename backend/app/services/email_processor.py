@@ -1,21 +1,187 @@
+import asyncio
+import html
 import re
-from typing import Dict, Any
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures._base import BrokenExecutor
+from functools import partial
+from typing import Callable, Dict, Any, Optional
 from bs4 import BeautifulSoup
 import html2text
+from app.core.config import settings
+from app.core.metrics import PROCESSOR_INPUT_CHARS, PROCESSOR_SECONDS, observe_seconds
+from app.services.content_extractor import extract_from_html, extract_from_text, reading_time
+from app.services.content_reducer import content_reducer
+from app.services.html_cleaner import LXML_ERRORS, LxmlMarkdownCleaner, lxml_available
 import logging
 
 logger = logging.getLogger(__name__)
 
+TAG_RE = re.compile(r"<[^>]+>")
+
+HTML_RE = re.compile(r"<(?:html|body|div|p>|br|table)")
+
+FOOTER_RE = re.compile(
+    r"(?:unsubscribe"
+    r"|to unsubscribe"
+    r"|click here to unsubscribe"
+    r"|manage your preferences"
+    r"|update your email preferences"
+    r"|copyright"
+    r"|all rights reserved"
+    r"|sent by"
+    r"|this email was sent to"
+    r"|powered by)"
+)
+
+_executor: Optional[Executor] = None
+_worker_processor: Optional["EmailProcessor"] = None
+
+def get_executor() -> Optional[Executor]:
+    global _executor
+    if _executor is None and settings.EMAIL_PROCESSOR_EXECUTOR != "inline":
+        if settings.EMAIL_PROCESSOR_EXECUTOR == "process":
+            try:
+                _executor = ProcessPoolExecutor(max_workers=settings.EMAIL_PROCESSOR_WORKERS)
+            except (OSError, NotImplementedError) as e:
+                logger.warning(f"Process pool unavailable, using thread pool: {e}")
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.EMAIL_PROCESSOR_WORKERS,
+                thread_name_prefix="email-processor"
+            )
+    return _executor
+
+def _use_thread_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = ThreadPoolExecutor(
+        max_workers=settings.EMAIL_PROCESSOR_WORKERS,
+        thread_name_prefix="email-processor"
+    )
+
+def _recycle_executor(executor: Executor):
+    global _executor
+    if _executor is not executor:
+        return
+
+    if isinstance(executor, ProcessPoolExecutor):
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        _executor = ProcessPoolExecutor(max_workers=settings.EMAIL_PROCESSOR_WORKERS)
+    else:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.EMAIL_PROCESSOR_WORKERS,
+            thread_name_prefix="email-processor"
+        )
+    executor.shutdown(wait=False)
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+def _process_in_worker(raw_content: str) -> str:
+    global _worker_processor
+    if _worker_processor is None:
+        _worker_processor = EmailProcessor()
+    return _worker_processor._process_sync(raw_content)
+
+def _extract_in_worker(raw_content: str) -> Dict[str, Any]:
+    global _worker_processor
+    if _worker_processor is None:
+        _worker_processor = EmailProcessor()
+    return _worker_processor._extract_sync(raw_content)
+
+def _reduce_in_worker(content: str, budget: int, strip_links: bool) -> str:
+    return content_reducer.reduce(content, budget, strip_links=strip_links)
+
 class EmailProcessor:
-    def __init__(self):
-        self.html_to_text = html2text.HTML2Text()
-        self.html_to_text.ignore_links = False
-        self.html_to_text.ignore_images = False
-        self.html_to_text.ignore_emphasis = False
-        
+    def _create_html_converter(self) -> html2text.HTML2Text:
+        html_to_text = html2text.HTML2Text()
+        html_to_text.ignore_links = False
+        html_to_text.ignore_images = False
+        html_to_text.ignore_emphasis = False
+        return html_to_text
+    
     async def process(self, raw_content: str) -> str:
+        return await self._run("process", raw_content, _process_in_worker, self._process_sync, self._fallback_text)
+    
+    async def extract(self, raw_content: str) -> Dict[str, Any]:
+        return await self._run("extract", raw_content, _extract_in_worker, self._extract_sync, self._fallback_extraction)
+    
+    async def reduce(self, content: str, budget: int, strip_links: bool = False) -> str:
+        reduce = partial(_reduce_in_worker, budget=budget, strip_links=strip_links)
+        return await self._run("reduce", content, reduce, reduce, lambda text: content_reducer.truncate(text, budget))
+    
+    async def _run(
+        self,
+        operation: str,
+        raw_content: str,
+        worker: Callable[[str], Any],
+        inline: Callable[[str], Any],
+        fallback: Callable[[str], Any]
+    ) -> Any:
+        PROCESSOR_INPUT_CHARS.labels(operation).observe(len(raw_content))
+        with observe_seconds(PROCESSOR_SECONDS, operation=operation):
+            return await self._execute(raw_content, worker, inline, fallback)
+    
+    async def _execute(
+        self,
+        raw_content: str,
+        worker: Callable[[str], Any],
+        inline: Callable[[str], Any],
+        fallback: Callable[[str], Any]
+    ) -> Any:
+        if len(raw_content) > settings.EMAIL_PROCESSOR_MAX_INPUT_CHARS:
+            logger.warning(
+                f"Email content of {len(raw_content)} chars exceeds cap, using fast fallback"
+            )
+            return await asyncio.to_thread(fallback, raw_content[:settings.EMAIL_PROCESSOR_MAX_INPUT_CHARS])
+        
+        executor = get_executor()
+        if executor is None:
+            return inline(raw_content)
+        
+        try:
+            return await self._submit(executor, raw_content, worker, fallback)
+        except BrokenExecutor as e:
+            if executor is _executor:
+                logger.error(f"Email processor pool broken, falling back to threads: {e}")
+                _use_thread_executor()
+            return await self._submit(get_executor(), raw_content, worker, fallback)
+    
+    async def _submit(
+        self,
+        executor: Executor,
+        raw_content: str,
+        worker: Callable[[str], Any],
+        fallback: Callable[[str], Any]
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(executor, worker, raw_content),
+                timeout=settings.EMAIL_PROCESSOR_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Email content processing timed out, recycling worker pool and using fast fallback")
+            _recycle_executor(executor)
+            return await asyncio.to_thread(fallback, raw_content)
+    
+    def _process_sync(self, raw_content: str) -> str:
         try:
             if self._is_html(raw_content):
+                if self._use_lxml():
+                    try:
+                        markdown_content = LxmlMarkdownCleaner().convert(
+                            raw_content, self._create_html_converter()
+                        )
+                        return self._clean_markdown(markdown_content)
+                    except LXML_ERRORS as e:
+                        logger.warning(f"lxml could not parse email HTML, using html2text: {e}")
+                
                 soup = BeautifulSoup(raw_content, 'html.parser')
                 
                 for element in soup(['script', 'style', 'meta', 'link']):
@@ -23,7 +189,7 @@ class EmailProcessor:
                 
                 cleaned_html = str(soup)
                 
-                markdown_content = self.html_to_text.handle(cleaned_html)
+                markdown_content = self._create_html_converter().handle(cleaned_html)
                 
                 markdown_content = self._clean_markdown(markdown_content)
                 
@@ -35,18 +201,33 @@ class EmailProcessor:
             logger.error(f"Error processing email content: {e}")
             return raw_content
     
-    def _is_html(self, content: str) -> bool:
-        html_patterns = [
-            r'<html',
-            r'<body',
-            r'<div',
-            r'<p>',
-            r'<br',
-            r'<table'
-        ]
+    def _extract_sync(self, raw_content: str) -> Dict[str, Any]:
+        content = self._process_sync(raw_content)
+        
+        try:
+            if self._is_html(raw_content):
+                extracted = extract_from_html(raw_content, use_lxml=self._use_lxml())
+            else:
+                extracted = extract_from_text(raw_content)
+        except Exception as e:
+            logger.error(f"Error extracting links and images: {e}")
+            extracted = extract_from_text(content)
         
-        content_lower = content[:1000].lower()
-        return any(re.search(pattern, content_lower) for pattern in html_patterns)
+        return {"content": content, "reading_time": reading_time(content), **extracted}
+    
+    def _fallback_extraction(self, raw_content: str) -> Dict[str, Any]:
+        content = self._fallback_text(raw_content)
+        return {"content": content, "reading_time": reading_time(content), **extract_from_text(content)}
+    
+    def _use_lxml(self) -> bool:
+        return settings.HTML_CLEANER_ENGINE == "lxml" and lxml_available()
+    
+    def _fallback_text(self, raw_content: str) -> str:
+        text = TAG_RE.sub(" ", raw_content) if self._is_html(raw_content) else raw_content
+        return self._clean_text(html.unescape(text))
+    
+    def _is_html(self, content: str) -> bool:
+        return HTML_RE.search(content[:1000].lower()) is not None
     
     def _clean_markdown(self, markdown: str) -> str:
         lines = markdown.split('\n')
@@ -82,18 +263,4 @@ class EmailProcessor:
         return '\n\n'.join(cleaned_lines)
     
     def _is_footer_content(self, line: str) -> bool:
-        footer_patterns = [
-            r'^unsubscribe',
-            r'^to unsubscribe',
-            r'^click here to unsubscribe',
-            r'^manage your preferences',
-            r'^update your email preferences',
-            r'^copyright',
-            r'^all rights reserved',
-            r'^sent by',
-            r'^this email was sent to',
-            r'^powered by'
-        ]
-        
-        line_lower = line.lower()
-        return any(re.match(pattern, line_lower) for pattern in footer_patterns)
\ No newline at end of file
+        return FOOTER_RE.match(line.lower()) is not None
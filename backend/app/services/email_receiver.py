@@ -1,5 +1,6 @@
 import asyncio
 import email
+import time
 from email.message import EmailMessage
 from aiosmtpd.controller import Controller
 from aiosmtpd.smtp import SMTP as SMTPServer
@@ -7,12 +8,53 @@ from typing import Optional
 import logging
 from datetime import datetime
 import httpx
+from pydantic import ValidationError
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
 from app.core.config import settings
+from app.core.http import get_http_client, close_http_client
+from app.core.metrics import SMTP_ACCEPT_SECONDS, SMTP_REJECTED, exemplar
+from app.core.tracing import TRACE_HEADER, get_trace_id, trace_context
+from app.schemas.email import EmailCreate
+from app.services.email_ingestion import submit_email, check_capacity, BackendSaturatedError
 
 logger = logging.getLogger(__name__)
 
+SMTP_RESULTS = {
+    "250": "accepted",
+    "451": "saturated",
+    "550": "unauthorized",
+    "554": "invalid"
+}
+
 class EmailHandler:
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        ingest_mode: Optional[str] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ):
+        self.client = client or get_http_client()
+        self.ingest_mode = ingest_mode or settings.SMTP_INGEST_MODE
+        self.loop = loop
+    
     async def handle_DATA(self, server, session, envelope):
+        if self.loop is None or self.loop is asyncio.get_running_loop():
+            return await self._handle(envelope)
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(self._handle(envelope), self.loop)
+        )
+    
+    async def _handle(self, envelope):
+        started = time.perf_counter()
+        with trace_context():
+            response = await self._handle_message(envelope)
+            result = SMTP_RESULTS.get(response[:3], "error")
+            SMTP_ACCEPT_SECONDS.labels(result).observe(time.perf_counter() - started, exemplar=exemplar())
+        if result != "accepted":
+            SMTP_REJECTED.labels(result).inc()
+        return response
+    
+    async def _handle_message(self, envelope):
         try:
             sender = envelope.mail_from
             
@@ -26,16 +68,27 @@ class EmailHandler:
             sender_name = self._extract_sender_name(msg.get("From", ""))
             content = self._extract_content(msg)
             
-            await self._forward_to_api({
+            email_data = {
                 "subject": subject,
                 "sender_email": sender,
                 "sender_name": sender_name,
                 "raw_content": content
-            })
+            }
+            
+            if self.ingest_mode == "direct":
+                await self._ingest_direct(email_data)
+            else:
+                await self._forward_to_api(email_data)
             
             logger.info(f"Email received and processed from {sender}")
             return "250 Message accepted for delivery"
             
+        except BackendSaturatedError as e:
+            logger.warning(f"Deferring email from {envelope.mail_from}: {e}")
+            return "451 Backend saturated, try again later"
+        except ValidationError as e:
+            logger.warning(f"Rejected malformed email from {envelope.mail_from}: {e}")
+            return "554 Message rejected: invalid content"
         except Exception as e:
             logger.error(f"Error handling email: {e}")
             return "500 Internal server error"
@@ -60,44 +113,76 @@ class EmailHandler:
         
         if msg.is_multipart():
             for part in msg.walk():
-                content_type = part.get_content_type()
-                
-                if content_type == "text/plain":
-                    try:
-                        content_parts.append(part.get_payload(decode=True).decode())
-                    except:
-                        pass
-                elif content_type == "text/html":
-                    try:
-                        content_parts.append(part.get_payload(decode=True).decode())
-                    except:
-                        pass
+                if part.get_content_type() in ("text/plain", "text/html"):
+                    text = self._decode_part(part)
+                    if text is not None:
+                        content_parts.append(text)
         else:
-            try:
-                content_parts.append(msg.get_payload(decode=True).decode())
-            except:
-                content_parts.append(msg.get_payload())
+            text = self._decode_part(msg)
+            content_parts.append(text if text is not None else msg.get_payload())
         
         return "\n\n".join(content_parts)
     
+    def _decode_part(self, part: EmailMessage) -> Optional[str]:
+        payload = part.get_payload(decode=True)
+        if payload is None:
+            return None
+        
+        charset = part.get_content_charset() or "utf-8"
+        try:
+            return payload.decode(charset, errors="replace")
+        except LookupError:
+            return payload.decode("utf-8", errors="replace")
+    
+    async def _ingest_direct(self, email_data: dict):
+        email_create = EmailCreate(**email_data)
+        await check_capacity()
+        
+        try:
+            await submit_email(email_create)
+        except (OperationalError, PoolTimeoutError) as e:
+            raise BackendSaturatedError(f"Database unavailable: {e}")
+    
     async def _forward_to_api(self, email_data: dict):
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "http://localhost:8000/api/v1/emails/receive",
-                    json=email_data,
-                    timeout=10.0
-                )
-                response.raise_for_status()
-        except Exception as e:
-            logger.error(f"Failed to forward email to API: {e}")
+            response = await self.client.post(
+                settings.SMTP_FORWARD_URL,
+                json=email_data,
+                headers={TRACE_HEADER: get_trace_id()}
+            )
+        except httpx.HTTPError as e:
+            raise BackendSaturatedError(f"Failed to forward email to API: {e}")
+        
+        if response.status_code in (429, 503) or response.status_code >= 500:
+            raise BackendSaturatedError(f"API returned {response.status_code}")
+        response.raise_for_status()
 
 class EmailReceiver:
-    def __init__(self):
-        self.handler = EmailHandler()
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        ingest_mode: Optional[str] = None,
+        embedded: bool = False
+    ):
+        self._owns_client = client is None
+        self.client = client or get_http_client()
+        self.handler = EmailHandler(self.client, ingest_mode)
+        self.embedded = embedded
         self.controller = None
+        self.server = None
     
     async def start(self):
+        if self.embedded:
+            loop = asyncio.get_running_loop()
+            self.server = await loop.create_server(
+                lambda: SMTPServer(self.handler),
+                host=settings.SMTP_HOST,
+                port=settings.SMTP_PORT
+            )
+            logger.info(f"Embedded SMTP server started on {settings.SMTP_HOST}:{settings.SMTP_PORT}")
+            return
+        
+        self.handler.loop = asyncio.get_running_loop()
         self.controller = Controller(
             self.handler,
             hostname=settings.SMTP_HOST,
@@ -108,9 +193,17 @@ class EmailReceiver:
         logger.info(f"SMTP server started on {settings.SMTP_HOST}:{settings.SMTP_PORT}")
     
     async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            logger.info("Embedded SMTP server stopped")
+        
         if self.controller:
             self.controller.stop()
             logger.info("SMTP server stopped")
+        
+        if self._owns_client:
+            await close_http_client()
 
 async def run_email_receiver():
     receiver = EmailReceiver()
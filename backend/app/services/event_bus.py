@@ -0,0 +1,176 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from redis.asyncio import Redis
+from app.core.config import settings
+from app.core.redis import redis_client
+import logging
+
+logger = logging.getLogger(__name__)
+
+EMAIL_INGESTED = "email.ingested"
+EMAIL_ANALYZED = "email.analyzed"
+SUMMARY_GENERATED = "summary.generated"
+
+PUBLISH_SCRIPT = """
+local id = redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*', 'type', ARGV[2], 'data', ARGV[3])
+redis.call('PUBLISH', KEYS[2], id .. '\\n' .. ARGV[2] .. '\\n' .. ARGV[3])
+return id
+"""
+
+Event = Dict[str, Any]
+
+class Subscriber:
+    def __init__(self, buffer_size: int):
+        self.queue: "asyncio.Queue[Event]" = asyncio.Queue(maxsize=buffer_size)
+        self.overflowed = False
+
+    def offer(self, event: Event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+class EventBus:
+    def __init__(
+        self,
+        redis: Redis,
+        max_len: int,
+        buffer_size: int,
+        prefix: str = "events"
+    ):
+        self.redis = redis
+        self.max_len = max_len
+        self.buffer_size = buffer_size
+        self.stream_key = f"{prefix}:stream"
+        self.channel = f"{prefix}:live"
+        self._publish = redis.register_script(PUBLISH_SCRIPT)
+        self._subscribers: Set[Subscriber] = set()
+        self._listener: Optional[asyncio.Task] = None
+
+    async def publish(self, event_type: str, data: Dict[str, Any]) -> Optional[str]:
+        try:
+            return await self._publish(
+                keys=[self.stream_key, self.channel],
+                args=[self.max_len, event_type, json.dumps(data, default=str)]
+            )
+        except Exception as e:
+            logger.warning(f"Failed to publish {event_type} event: {e}")
+            return None
+
+    async def publish_many(self, event_type: str, items: List[Dict[str, Any]]):
+        if not items:
+            return
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for data in items:
+                    await self._publish(
+                        keys=[self.stream_key, self.channel],
+                        args=[self.max_len, event_type, json.dumps(data, default=str)],
+                        client=pipe
+                    )
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to publish {len(items)} {event_type} events: {e}")
+
+    async def start(self):
+        self._listener = asyncio.create_task(self._listen())
+        logger.info("Event bus listener started")
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        logger.info("Event bus listener stopped")
+
+    async def events(
+        self,
+        subscriber: Subscriber,
+        last_event_id: Optional[str] = None,
+        heartbeat: Optional[float] = None
+    ) -> AsyncIterator[Optional[Event]]:
+        self._subscribers.add(subscriber)
+        try:
+            last_seen = _parse_id(last_event_id)
+
+            if last_seen is not None:
+                async for event in self._replay(last_event_id):
+                    last_seen = _parse_id(event["id"])
+                    yield event
+
+            while not (subscriber.overflowed and subscriber.queue.empty()):
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+
+                event_id = _parse_id(event["id"])
+                if last_seen is not None and event_id <= last_seen:
+                    continue
+
+                last_seen = event_id
+                yield event
+        finally:
+            self._subscribers.discard(subscriber)
+
+    async def _replay(self, last_event_id: str) -> AsyncIterator[Event]:
+        start = f"({last_event_id}"
+
+        while True:
+            entries = await self.redis.xrange(
+                self.stream_key, min=start, max="+", count=self.buffer_size
+            )
+            for entry_id, fields in entries:
+                yield {
+                    "id": entry_id,
+                    "type": fields["type"],
+                    "data": json.loads(fields["data"])
+                }
+
+            if len(entries) < self.buffer_size:
+                return
+            start = f"({entries[-1][0]}"
+
+    async def _listen(self):
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        self._dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event bus listener failed, reconnecting: {e}")
+                await asyncio.sleep(1)
+
+    def _dispatch(self, payload: str):
+        event_id, event_type, data = payload.split("\n", 2)
+        event = {"id": event_id, "type": event_type, "data": json.loads(data)}
+
+        for subscriber in list(self._subscribers):
+            subscriber.offer(event)
+            if subscriber.overflowed:
+                self._subscribers.discard(subscriber)
+                logger.warning(f"Dropping slow event subscriber after {subscriber.queue.maxsize} buffered events")
+
+def _parse_id(event_id: Optional[str]) -> Optional[Tuple[int, int]]:
+    if not event_id:
+        return None
+
+    try:
+        millis, _, sequence = event_id.partition("-")
+        return int(millis), int(sequence or 0)
+    except ValueError:
+        return None
+
+event_bus = EventBus(
+    redis_client,
+    max_len=settings.EVENT_STREAM_MAX_LEN,
+    buffer_size=settings.EVENT_STREAM_BUFFER_SIZE
+)
@@ -0,0 +1,74 @@
+import re
+from typing import Optional
+import html2text
+import logging
+
+try:
+    import lxml.html
+    from lxml import etree
+    LXML_ERRORS = (ValueError, etree.LxmlError)
+except ImportError:
+    lxml = None
+    LXML_ERRORS = (ValueError,)
+
+logger = logging.getLogger(__name__)
+
+DROP_TAGS = frozenset(["script", "style", "meta", "link"])
+
+VOID_TAGS = frozenset([
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr"
+])
+
+XML_DECLARATION_RE = re.compile(r"^\s*<\?xml[^>]*\?>", re.IGNORECASE)
+
+def lxml_available() -> bool:
+    return lxml is not None
+
+def strip_xml_declaration(raw_html: str) -> str:
+    return XML_DECLARATION_RE.sub("", raw_html, count=1)
+
+class LxmlMarkdownCleaner:
+    def __init__(self):
+        self.parser = lxml.html.HTMLParser(remove_comments=True, remove_pis=True)
+
+    def convert(self, raw_html: str, converter: html2text.HTML2Text) -> str:
+        root = lxml.html.document_fromstring(strip_xml_declaration(raw_html), parser=self.parser)
+        converter.start = True
+
+        self._walk(root, converter)
+
+        return converter.optwrap(converter.finish())
+
+    def _walk(self, root: "etree._Element", converter: html2text.HTML2Text):
+        stack = [(root, False)]
+
+        while stack:
+            node, closing = stack.pop()
+
+            if closing:
+                converter.handle_endtag(node.tag)
+                self._emit_text(node.tail, converter)
+                continue
+
+            tag = node.tag
+            if not isinstance(tag, str) or tag in DROP_TAGS:
+                self._emit_text(node.tail, converter)
+                continue
+
+            converter.handle_starttag(tag, list(node.attrib.items()))
+
+            if tag in VOID_TAGS:
+                converter.handle_endtag(tag)
+                self._emit_text(node.tail, converter)
+                continue
+
+            self._emit_text(node.text, converter)
+
+            stack.append((node, True))
+            for child in reversed(node):
+                stack.append((child, False))
+
+    def _emit_text(self, text: Optional[str], converter: html2text.HTML2Text):
+        if text:
+            converter.handle_data(text)
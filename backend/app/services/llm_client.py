@@ -0,0 +1,483 @@
+import asyncio
+import random
+import re
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Dict, List, Optional
+import httpx
+from app.core.config import settings
+from app.core.metrics import LLM_TOKENS
+import logging
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = frozenset([408, 429, 500, 502, 503, 504])
+
+DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+class LLMUnavailableError(Exception):
+    pass
+
+class TokenBucket:
+    def __init__(self, per_minute: float, min_fraction: float = 0.1):
+        self.capacity = float(per_minute)
+        self.limit = per_minute / 60.0
+        self.rate = self.limit
+        self.min_rate = self.limit * min_fraction
+        self.level = self.capacity
+        self.paused_until = 0.0
+        self.waited = 0.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0):
+        amount = min(amount, self.capacity)
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+
+                delay = self.paused_until - now
+                if delay <= 0:
+                    if self.level >= amount:
+                        self.level -= amount
+                        return
+                    delay = (amount - self.level) / self.rate
+
+                self.waited += delay
+                await asyncio.sleep(delay)
+
+    def refund(self, amount: float):
+        self.level = min(self.capacity, self.level + amount)
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.level = 0.0
+
+    def observe_remaining(self, remaining: float):
+        self.level = min(self.level, remaining)
+
+    def throttle(self):
+        self.rate = max(self.min_rate, self.rate / 2)
+
+    def recover(self):
+        self.rate = min(self.limit, self.rate + self.limit * 0.05)
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill(time.monotonic())
+        return {
+            "available": round(self.level, 1),
+            "rate_per_minute": round(self.rate * 60, 1),
+            "limit_per_minute": round(self.limit * 60, 1),
+            "paused_for": round(max(0.0, self.paused_until - time.monotonic()), 2),
+            "waited_seconds": round(self.waited, 2)
+        }
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe: Optional[object] = None
+
+    @property
+    def probing(self) -> bool:
+        return self.probe is not None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> Optional[object]:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.probing:
+            self.probe = object()
+            return self.probe
+        return None
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probe = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.probing or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self.probing:
+                logger.warning(f"Circuit opened after {self.failures} consecutive LLM failures")
+            self.opened_at = time.monotonic()
+        self.probe = None
+
+    def release_probe(self, permit: Optional[object]):
+        if permit is not None and permit is self.probe:
+            self.probe = None
+
+class ModelStats:
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.requests = 0
+        self.successes = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        p50 = self.percentile(0.5)
+        p95 = self.percentile(0.95)
+        return {
+            "requests": self.requests,
+            "successes": self.successes,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "error_rate": self.errors / self.requests if self.requests else 0.0,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None
+        }
+
+class LLMClient:
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_retries: int,
+        retry_base_delay: float,
+        retry_max_delay: float,
+        request_timeout: float,
+        hedge_model: Optional[str],
+        hedge_min_samples: int,
+        hedge_min_delay: float,
+        breaker_failure_threshold: int,
+        breaker_reset_timeout: float,
+        stats_window: int
+    ):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.request_timeout = request_timeout
+        self.hedge_model = hedge_model
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.breaker_failure_threshold = breaker_failure_threshold
+        self.breaker_reset_timeout = breaker_reset_timeout
+        self.stats_window = stats_window
+        self._stats: Dict[str, ModelStats] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    async def complete(
+        self,
+        client: httpx.AsyncClient,
+        model: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        estimated_tokens: int,
+        temperature: float = 0.3
+    ) -> str:
+        hedge_model = self.hedge_model if self.hedge_model and self.hedge_model != model else None
+
+        permit = self._breaker(model).allow()
+        if not permit:
+            hedge_permit = self._breaker(hedge_model).allow() if hedge_model else None
+            if hedge_permit:
+                logger.info(f"Circuit for {model} is open, routing to {hedge_model}")
+                return await self._call(
+                    client, hedge_model, hedge_permit, messages, max_tokens, estimated_tokens, temperature
+                )
+            raise LLMUnavailableError(f"Circuit for {model} is open")
+
+        delay = self._hedge_delay(model) if hedge_model else None
+        if delay is None:
+            return await self._call(client, model, permit, messages, max_tokens, estimated_tokens, temperature)
+
+        sent = asyncio.Event()
+        primary = asyncio.create_task(
+            self._call(client, model, permit, messages, max_tokens, estimated_tokens, temperature, sent)
+        )
+        waiter = asyncio.create_task(sent.wait())
+        try:
+            await asyncio.wait({primary, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+
+        if not primary.done():
+            await asyncio.wait({primary}, timeout=delay)
+        if primary.done():
+            return await primary
+        hedge_permit = self._breaker(hedge_model).allow()
+        if not hedge_permit:
+            return await primary
+
+        self._model_stats(model).hedged += 1
+        hedge = asyncio.create_task(
+            self._call(client, hedge_model, hedge_permit, messages, max_tokens, estimated_tokens, temperature)
+        )
+
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._model_stats(model).hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _call(
+        self,
+        client: httpx.AsyncClient,
+        model: str,
+        permit: object,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        estimated_tokens: int,
+        temperature: float,
+        sent: Optional[asyncio.Event] = None
+    ) -> str:
+        breaker = self._breaker(model)
+        permits = [permit]
+        try:
+            return await self._call_with_retries(
+                client, model, breaker, permits, messages, max_tokens, estimated_tokens, temperature, sent
+            )
+        finally:
+            for permit in permits:
+                breaker.release_probe(permit)
+
+    async def _call_with_retries(
+        self,
+        client: httpx.AsyncClient,
+        model: str,
+        breaker: CircuitBreaker,
+        permits: List[object],
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        estimated_tokens: int,
+        temperature: float,
+        sent: Optional[asyncio.Event]
+    ) -> str:
+        stats = self._model_stats(model)
+        reserved = estimated_tokens + max_tokens
+
+        for attempt in range(self.max_retries + 1):
+            await self.requests.acquire()
+            await self.tokens.acquire(reserved)
+            if sent is not None:
+                sent.set()
+
+            stats.requests += 1
+            started = time.monotonic()
+            retry_after: Optional[float] = None
+
+            try:
+                response = await client.post(
+                    f"{self.base_url}/chat/completions",
+                    headers={
+                        "Authorization": f"Bearer {self.api_key}",
+                        "Content-Type": "application/json",
+                        "HTTP-Referer": "http://localhost:3000",
+                        "X-Title": "Email Aggregator"
+                    },
+                    json={
+                        "model": model,
+                        "messages": messages,
+                        "temperature": temperature,
+                        "max_tokens": max_tokens
+                    },
+                    timeout=self.request_timeout
+                )
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                stats.errors += 1
+                breaker.record_failure()
+                reason = f"{type(e).__name__}: {e}"
+            else:
+                self._observe_rate_limits(response.headers)
+
+                if response.status_code == 429:
+                    stats.rate_limited += 1
+                    self.requests.throttle()
+                    self.tokens.throttle()
+                    retry_after = _parse_retry_after(response.headers.get("retry-after"))
+                    if retry_after is not None:
+                        self.requests.pause(retry_after)
+                    reason = "rate limited"
+                elif response.status_code in RETRYABLE_STATUS:
+                    stats.errors += 1
+                    breaker.record_failure()
+                    retry_after = _parse_retry_after(response.headers.get("retry-after"))
+                    reason = f"HTTP {response.status_code}"
+                elif response.is_error:
+                    stats.errors += 1
+                    response.raise_for_status()
+                else:
+                    result = response.json()
+                    stats.successes += 1
+                    stats.latencies.append(time.monotonic() - started)
+                    breaker.record_success()
+                    self.requests.recover()
+                    self.tokens.recover()
+
+                    usage = result.get("usage") or {}
+                    for kind in ("prompt", "completion"):
+                        if usage.get(f"{kind}_tokens"):
+                            LLM_TOKENS.labels(model, kind).inc(usage[f"{kind}_tokens"])
+
+                    used = usage.get("total_tokens")
+                    if used is not None and used < reserved:
+                        self.tokens.refund(reserved - used)
+
+                    return result["choices"][0]["message"]["content"]
+
+            if attempt == self.max_retries:
+                break
+            permit = breaker.allow()
+            if not permit:
+                raise LLMUnavailableError(f"Circuit for {model} opened: {reason}")
+            permits.append(permit)
+
+            delay = retry_after if retry_after is not None else random.uniform(
+                0, min(self.retry_max_delay, self.retry_base_delay * (2 ** attempt))
+            )
+            if delay > self.retry_max_delay:
+                raise LLMUnavailableError(f"{model} asked to retry after {delay:.0f}s: {reason}")
+
+            stats.retries += 1
+            logger.info(f"LLM call to {model} failed ({reason}), retry {attempt + 1} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+        raise LLMUnavailableError(f"{model} failed after {self.max_retries + 1} attempts: {reason}")
+
+    def _observe_rate_limits(self, headers: httpx.Headers):
+        for bucket, remaining_keys, reset_keys in (
+            (self.requests, ("x-ratelimit-remaining-requests", "x-ratelimit-remaining"), ("x-ratelimit-reset-requests", "x-ratelimit-reset")),
+            (self.tokens, ("x-ratelimit-remaining-tokens",), ("x-ratelimit-reset-tokens",))
+        ):
+            remaining = _first_float(headers, remaining_keys)
+            if remaining is None:
+                continue
+
+            bucket.observe_remaining(remaining)
+            if remaining <= 0:
+                reset = _parse_reset(next((headers[key] for key in reset_keys if key in headers), None))
+                if reset:
+                    bucket.pause(reset)
+
+    def _hedge_delay(self, model: str) -> Optional[float]:
+        stats = self._model_stats(model)
+        if len(stats.latencies) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, stats.percentile(0.95))
+
+    def _model_stats(self, model: str) -> ModelStats:
+        if model not in self._stats:
+            self._stats[model] = ModelStats(self.stats_window)
+        return self._stats[model]
+
+    def _breaker(self, model: str) -> CircuitBreaker:
+        if model not in self._breakers:
+            self._breakers[model] = CircuitBreaker(self.breaker_failure_threshold, self.breaker_reset_timeout)
+        return self._breakers[model]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "models": {
+                model: {**stats.to_dict(), "circuit": self._breaker(model).state}
+                for model, stats in self._stats.items()
+            },
+            "hedge_model": self.hedge_model,
+            "request_bucket": self.requests.stats(),
+            "token_bucket": self.tokens.stats()
+        }
+
+def _first_float(headers: httpx.Headers, keys) -> Optional[float]:
+    for key in keys:
+        if key in headers:
+            try:
+                return float(headers[key])
+            except ValueError:
+                return None
+    return None
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+
+    try:
+        number = float(value)
+    except ValueError:
+        matches = DURATION_RE.findall(value)
+        if not matches:
+            return None
+        scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+        return sum(float(amount) * scale[unit] for amount, unit in matches)
+
+    if number > 1e12:
+        return max(0.0, number / 1000 - time.time())
+    if number > 1e9:
+        return max(0.0, number - time.time())
+    return number
+
+llm_client = LLMClient(
+    base_url=settings.OPENROUTER_BASE_URL,
+    api_key=settings.OPENROUTER_API_KEY,
+    requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+    max_retries=settings.LLM_MAX_RETRIES,
+    retry_base_delay=settings.LLM_RETRY_BASE_DELAY,
+    retry_max_delay=settings.LLM_RETRY_MAX_DELAY,
+    request_timeout=settings.LLM_REQUEST_TIMEOUT,
+    hedge_model=settings.LLM_HEDGE_MODEL,
+    hedge_min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+    hedge_min_delay=settings.LLM_HEDGE_MIN_DELAY,
+    breaker_failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+    breaker_reset_timeout=settings.LLM_BREAKER_RESET_TIMEOUT,
+    stats_window=settings.LLM_STATS_WINDOW
+)
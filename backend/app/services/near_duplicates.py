@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+import random
+import re
+import time
+from collections import Counter
+from typing import List, Optional, Tuple
+from redis.asyncio import Redis
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.services.email_processor import get_executor
+import logging
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 2
+MAX_HASH = (1 << 32) - 1
+MERSENNE_PRIME = (1 << 61) - 1
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_permutation_seed = random.Random(0x5EED)
+PERMUTATIONS = [
+    (_permutation_seed.randrange(1, MERSENNE_PRIME), _permutation_seed.randrange(0, MERSENNE_PRIME))
+    for _ in range(settings.DEDUP_NUM_PERM)
+]
+
+Signature = List[int]
+
+def minhash(text: str) -> Optional[Signature]:
+    tokens = TOKEN_RE.findall((text or "").lower())
+    if len(tokens) < settings.DEDUP_MIN_TOKENS:
+        return None
+
+    shingles = {
+        " ".join(tokens[i:i + SHINGLE_SIZE])
+        for i in range(len(tokens) - SHINGLE_SIZE + 1)
+    }
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for shingle in shingles
+    ]
+
+    return [
+        min((a * value + b) % MERSENNE_PRIME for value in hashes) & MAX_HASH
+        for a, b in PERMUTATIONS
+    ]
+
+async def compute_signature(text: str) -> Optional[Signature]:
+    executor = get_executor()
+    if executor is None:
+        return minhash(text)
+
+    try:
+        return await asyncio.wait_for(
+            asyncio.get_running_loop().run_in_executor(executor, minhash, text),
+            timeout=settings.EMAIL_PROCESSOR_TIMEOUT
+        )
+    except Exception as e:
+        logger.warning(f"Signature computation in worker failed, computing inline: {e}")
+        return minhash(text)
+
+def estimate_similarity(a: Signature, b: Signature) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+def encode_signature(signature: Signature) -> str:
+    return "".join(f"{value:08x}" for value in signature)
+
+def decode_signature(value: str) -> Signature:
+    return [int(value[i:i + 8], 16) for i in range(0, len(value), 8)]
+
+class NearDuplicateIndex:
+    def __init__(
+        self,
+        redis: Redis,
+        threshold: float,
+        bands: int,
+        window: int,
+        max_candidates: int,
+        prefix: str = "near_duplicates"
+    ):
+        self.redis = redis
+        self.threshold = threshold
+        self.bands = bands
+        self.window = window
+        self.max_candidates = max_candidates
+        self.prefix = prefix
+
+    async def find(self, signature: Signature, exclude: Optional[str] = None) -> Optional[str]:
+        try:
+            return await self._find(signature, exclude)
+        except Exception as e:
+            logger.warning(f"Near-duplicate lookup failed: {e}")
+            return None
+
+    async def add(self, email_id: str, signature: Signature):
+        now = time.time()
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for band_key in self._band_keys(signature):
+                    pipe.zadd(band_key, {email_id: now})
+                    pipe.zremrangebyscore(band_key, "-inf", now - self.window)
+                    pipe.expire(band_key, self.window)
+                pipe.set(self._signature_key(email_id), encode_signature(signature), ex=self.window)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to index signature for email {email_id}: {e}")
+
+    async def _find(self, signature: Signature, exclude: Optional[str]) -> Optional[str]:
+        now = time.time()
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for band_key in self._band_keys(signature):
+                pipe.zrevrangebyscore(
+                    band_key, "+inf", now - self.window,
+                    start=0, num=self.max_candidates
+                )
+            band_results = await pipe.execute()
+
+        band_hits = Counter(
+            email_id
+            for members in band_results
+            for email_id in members
+            if email_id != exclude
+        )
+        candidates = [email_id for email_id, _ in band_hits.most_common(self.max_candidates)]
+        if not candidates:
+            return None
+
+        stored = await self.redis.mget([self._signature_key(email_id) for email_id in candidates])
+
+        best: Optional[Tuple[float, str]] = None
+        for email_id, value in zip(candidates, stored):
+            if value is None:
+                continue
+            similarity = estimate_similarity(signature, decode_signature(value))
+            if similarity >= self.threshold and (best is None or similarity > best[0]):
+                best = (similarity, email_id)
+
+        return best[1] if best else None
+
+    def _band_keys(self, signature: Signature) -> List[str]:
+        rows = len(signature) // self.bands
+        return [
+            f"{self.prefix}:band:{band}:{encode_signature(signature[band * rows:(band + 1) * rows])}"
+            for band in range(self.bands)
+        ]
+
+    def _signature_key(self, email_id: str) -> str:
+        return f"{self.prefix}:signature:{email_id}"
+
+near_duplicate_index = NearDuplicateIndex(
+    redis_client,
+    threshold=settings.DEDUP_THRESHOLD,
+    bands=settings.DEDUP_BANDS,
+    window=settings.DEDUP_WINDOW,
+    max_candidates=settings.DEDUP_MAX_CANDIDATES
+)
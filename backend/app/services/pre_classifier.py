@@ -0,0 +1,360 @@
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import math
+import random
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import select, or_
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.email import Email
+from app.models.analyzed_content import AnalyzedContent
+from app.models.category import Category
+from app.services.content_extractor import reading_time
+import logging
+
+logger = logging.getLogger(__name__)
+
+MODEL_VERSION = 1
+FEATURE_BITS = 18
+CONTENT_CHARS = 3000
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9'_-]+")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+IMPORTANCE_BANDS = {"low": (1, 4), "medium": (5, 6), "high": (7, 10)}
+
+def importance_band(score: Optional[int]) -> str:
+    score = score or 5
+    for band, (low, high) in IMPORTANCE_BANDS.items():
+        if low <= score <= high:
+            return band
+    return "high" if score > 10 else "low"
+
+def extract_features(subject: str, sender: str, content: str) -> Counter:
+    features: Counter = Counter()
+    domain = (sender or "").rpartition("@")[2].lower()
+    if domain:
+        features[_bucket(f"domain:{domain}")] += 3
+
+    for prefix, text in (("s", subject or ""), ("b", (content or "")[:CONTENT_CHARS])):
+        tokens = TOKEN_RE.findall(text.lower())
+        for i, token in enumerate(tokens):
+            features[_bucket(f"{prefix}:{token}")] += 1
+            if i:
+                features[_bucket(f"{prefix}:{tokens[i - 1]} {token}")] += 1
+
+    return features
+
+def _bucket(feature: str) -> int:
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=4).digest()
+    return int.from_bytes(digest, "big") & ((1 << FEATURE_BITS) - 1)
+
+class NaiveBayes:
+    def __init__(
+        self,
+        log_priors: Dict[str, float],
+        log_likelihoods: Dict[str, Dict[int, float]],
+        unseen: Dict[str, float]
+    ):
+        self.log_priors = log_priors
+        self.log_likelihoods = log_likelihoods
+        self.unseen = unseen
+
+    @classmethod
+    def fit(cls, samples: List[Tuple[Counter, str]], alpha: float = 0.5) -> "NaiveBayes":
+        label_counts: Counter = Counter()
+        feature_counts: Dict[str, Counter] = defaultdict(Counter)
+        for features, label in samples:
+            label_counts[label] += 1
+            feature_counts[label].update(features)
+
+        vocabulary = len({feature for counts in feature_counts.values() for feature in counts})
+        total = sum(label_counts.values())
+
+        log_priors = {label: math.log(count / total) for label, count in label_counts.items()}
+        log_likelihoods = {}
+        unseen = {}
+        for label, counts in feature_counts.items():
+            denominator = sum(counts.values()) + alpha * vocabulary
+            log_likelihoods[label] = {
+                feature: math.log((count + alpha) / denominator)
+                for feature, count in counts.items()
+            }
+            unseen[label] = math.log(alpha / denominator)
+
+        return cls(log_priors, log_likelihoods, unseen)
+
+    def predict(self, features: Counter) -> Tuple[str, float]:
+        scores = {}
+        for label, prior in self.log_priors.items():
+            likelihoods = self.log_likelihoods[label]
+            unseen = self.unseen[label]
+            scores[label] = prior + sum(
+                count * likelihoods.get(feature, unseen)
+                for feature, count in features.items()
+            )
+
+        best = max(scores, key=scores.get)
+        normalizer = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1.0 / normalizer
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "log_priors": self.log_priors,
+            "log_likelihoods": {
+                label: {str(feature): round(value, 5) for feature, value in likelihoods.items()}
+                for label, likelihoods in self.log_likelihoods.items()
+            },
+            "unseen": self.unseen
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "NaiveBayes":
+        return cls(
+            data["log_priors"],
+            {
+                label: {int(feature): value for feature, value in likelihoods.items()}
+                for label, likelihoods in data["log_likelihoods"].items()
+            },
+            data["unseen"]
+        )
+
+class PreClassifier:
+    def __init__(self):
+        self.category_model: Optional[NaiveBayes] = None
+        self.importance_model: Optional[NaiveBayes] = None
+        self.band_scores: Dict[str, int] = {}
+        self.trained_on = 0
+        self.local = 0
+        self.routed_low_confidence = 0
+        self.routed_high_importance = 0
+        self.audited = 0
+        self.compared = 0
+        self.category_agreements = 0
+        self.importance_agreements = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self.category_model is not None
+
+    def load(self, path: Optional[str] = None):
+        path = Path(path or settings.PRE_CLASSIFIER_MODEL_PATH)
+        if not settings.PRE_CLASSIFIER_ENABLED or not path.exists():
+            logger.info(f"Pre-classifier disabled (model file {path} not loaded)")
+            return
+
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+
+        if data.get("version") != MODEL_VERSION:
+            logger.warning(f"Ignoring pre-classifier model {path} with version {data.get('version')}")
+            return
+
+        self.category_model = NaiveBayes.from_dict(data["category"])
+        self.importance_model = NaiveBayes.from_dict(data["importance"])
+        self.band_scores = data["band_scores"]
+        self.trained_on = data["trained_on"]
+        logger.info(f"Pre-classifier loaded from {path} ({self.trained_on} training emails)")
+
+    def save(self, path: str):
+        data = {
+            "version": MODEL_VERSION,
+            "trained_on": self.trained_on,
+            "band_scores": self.band_scores,
+            "category": self.category_model.to_dict(),
+            "importance": self.importance_model.to_dict()
+        }
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def predict(self, subject: str, sender: str, content: str) -> Optional[Dict[str, Any]]:
+        if not self.loaded:
+            return None
+
+        features = extract_features(subject, sender, content)
+        category, category_confidence = self.category_model.predict(features)
+        band, band_confidence = self.importance_model.predict(features)
+
+        return {
+            "category": category,
+            "category_confidence": category_confidence,
+            "importance_band": band,
+            "importance_confidence": band_confidence,
+            "importance_score": self.band_scores.get(band, 5)
+        }
+
+    def should_skip_llm(self, prediction: Optional[Dict[str, Any]]) -> bool:
+        if prediction is None:
+            return False
+
+        if (
+            prediction["category_confidence"] < settings.PRE_CLASSIFIER_MIN_CONFIDENCE
+            or prediction["importance_confidence"] < settings.PRE_CLASSIFIER_MIN_CONFIDENCE
+        ):
+            self.routed_low_confidence += 1
+            return False
+
+        if prediction["importance_score"] > settings.PRE_CLASSIFIER_MAX_LOCAL_IMPORTANCE:
+            self.routed_high_importance += 1
+            return False
+
+        if random.random() < settings.PRE_CLASSIFIER_AUDIT_RATE:
+            self.audited += 1
+            return False
+
+        self.local += 1
+        return True
+
+    def record_llm_result(self, prediction: Optional[Dict[str, Any]], analysis: Dict[str, Any]):
+        if prediction is None or analysis.get("source") == "fallback":
+            return
+
+        self.compared += 1
+        if (analysis.get("category") or "").upper() == prediction["category"].upper():
+            self.category_agreements += 1
+        if importance_band(analysis.get("importance_score")) == prediction["importance_band"]:
+            self.importance_agreements += 1
+
+    def local_analysis(
+        self,
+        prediction: Dict[str, Any],
+        subject: str,
+        content: str
+    ) -> Dict[str, Any]:
+        sentences = SENTENCE_RE.split((content or "").strip(), maxsplit=1)
+        summary = sentences[0][:300] if sentences and sentences[0] else subject
+
+        return {
+            "category": prediction["category"],
+            "importance_score": prediction["importance_score"],
+            "title_optimized": subject,
+            "summary": summary,
+            "content_markdown": content,
+            "key_points": [],
+            "tags": [],
+            "images": [],
+            "important_links": [],
+            "reading_time": reading_time(content),
+            "sentiment": "neutral",
+            "action_items": [],
+            "source": "local"
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        routed = self.routed_low_confidence + self.routed_high_importance + self.audited
+        decided = self.local + routed
+        return {
+            "enabled": self.loaded,
+            "trained_on": self.trained_on,
+            "llm_calls_saved": self.local,
+            "routed_low_confidence": self.routed_low_confidence,
+            "routed_high_importance": self.routed_high_importance,
+            "audited": self.audited,
+            "local_rate": self.local / decided if decided else 0.0,
+            "compared_with_llm": self.compared,
+            "category_agreement": self.category_agreements / self.compared if self.compared else None,
+            "importance_agreement": self.importance_agreements / self.compared if self.compared else None
+        }
+
+pre_classifier = PreClassifier()
+
+async def _load_training_samples(limit: Optional[int]) -> List[Tuple[Counter, str, int]]:
+    from app.services.email_processor import EmailProcessor
+
+    processor = EmailProcessor()
+    query = (
+        select(
+            Email.subject,
+            Email.sender_email,
+            Email.raw_content,
+            Category.name,
+            AnalyzedContent.importance_score
+        )
+        .join(AnalyzedContent, AnalyzedContent.email_id == Email.id)
+        .join(Category, Category.id == AnalyzedContent.category_id)
+        .where(or_(AnalyzedContent.source == "llm", AnalyzedContent.source.is_(None)))
+        .order_by(Email.received_at.desc())
+    )
+    if limit:
+        query = query.limit(limit)
+
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(query)).all()
+
+    samples = []
+    for row in rows:
+        content = await processor.process(row.raw_content or "")
+        features = extract_features(row.subject, row.sender_email, content)
+        samples.append((features, row.name.upper(), row.importance_score or 5))
+    return samples
+
+def train(samples: List[Tuple[Counter, str, int]], holdout: float) -> Tuple[PreClassifier, Dict[str, Any]]:
+    random.Random(42).shuffle(samples)
+    split = int(len(samples) * (1 - holdout)) if holdout else len(samples)
+    training, evaluation = samples[:split], samples[split:]
+
+    model = PreClassifier()
+    model.category_model = NaiveBayes.fit([(features, category) for features, category, _ in training])
+    model.importance_model = NaiveBayes.fit([
+        (features, importance_band(score)) for features, _, score in training
+    ])
+
+    band_totals: Dict[str, List[int]] = defaultdict(list)
+    for _, _, score in training:
+        band_totals[importance_band(score)].append(score)
+    model.band_scores = {
+        band: round(sum(scores) / len(scores)) for band, scores in band_totals.items()
+    }
+    model.trained_on = len(training)
+
+    metrics: Dict[str, Any] = {"training": len(training), "evaluation": len(evaluation)}
+    if evaluation:
+        local = agree = correct = 0
+        for features, category, score in evaluation:
+            predicted, category_confidence = model.category_model.predict(features)
+            band, band_confidence = model.importance_model.predict(features)
+            correct += predicted == category
+            if (
+                min(category_confidence, band_confidence) >= settings.PRE_CLASSIFIER_MIN_CONFIDENCE
+                and model.band_scores.get(band, 5) <= settings.PRE_CLASSIFIER_MAX_LOCAL_IMPORTANCE
+            ):
+                local += 1
+                agree += predicted == category and band == importance_band(score)
+        metrics.update({
+            "category_accuracy": correct / len(evaluation),
+            "local_rate": local / len(evaluation),
+            "local_agreement": agree / local if local else None
+        })
+
+    return model, metrics
+
+async def _train(output: str, holdout: float, limit: Optional[int], min_samples: int):
+    samples = await _load_training_samples(limit)
+    if len(samples) < min_samples:
+        logger.error(f"Only {len(samples)} labelled emails available, need at least {min_samples}")
+        return
+
+    model, metrics = train(samples, holdout)
+    model.save(output)
+    logger.info(f"Saved pre-classifier to {output}: {json.dumps(metrics)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the local pre-classifier from stored LLM analyses")
+    parser.add_argument("--output", default=settings.PRE_CLASSIFIER_MODEL_PATH)
+    parser.add_argument("--holdout", type=float, default=0.1, help="Fraction of emails held out for metrics")
+    parser.add_argument("--limit", type=int, default=None, help="Train on the most recent N emails")
+    parser.add_argument("--min-samples", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(_train(args.output, args.holdout, args.limit, args.min_samples))
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
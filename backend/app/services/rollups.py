@@ -0,0 +1,204 @@
+import argparse
+import asyncio
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select, delete, func, and_, literal, case, cast, String
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import AsyncSessionLocal
+from app.models.email import Email
+from app.models.analyzed_content import AnalyzedContent
+from app.models.email_rollup import EmailRollup
+import logging
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ("hour", "day")
+
+DIMENSION_TOTAL = "total"
+DIMENSION_CATEGORY = "category"
+DIMENSION_SENDER_DOMAIN = "sender_domain"
+
+RollupKey = Tuple[str, datetime, str, str]
+
+def sender_domain(sender_email: Optional[str]) -> str:
+    if not sender_email or "@" not in sender_email:
+        return ""
+    return sender_email.rpartition("@")[2].lower()
+
+def truncate(value: datetime, granularity: str) -> datetime:
+    if granularity == "day":
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+    return value.replace(minute=0, second=0, microsecond=0)
+
+def utc_bucket(granularity: str, column):
+    return func.timezone("UTC", func.date_trunc(granularity, func.timezone("UTC", column)))
+
+async def record_received(db: AsyncSession, emails: Iterable[Email]):
+    received: Counter = Counter()
+    for email in emails:
+        for dimension, key in (
+            (DIMENSION_TOTAL, ""),
+            (DIMENSION_SENDER_DOMAIN, sender_domain(email.sender_email))
+        ):
+            for rollup_key in _rollup_keys(email.received_at, dimension, key):
+                received[rollup_key] += 1
+
+    await _apply(db, {rollup_key: (count, 0) for rollup_key, count in received.items()})
+
+async def record_processed(
+    db: AsyncSession,
+    email: Email,
+    category_id: Optional[UUID],
+    previous_category_id: Optional[UUID],
+    newly_processed: bool,
+    reanalyzed: bool
+):
+    processed: Counter = Counter()
+
+    if newly_processed:
+        for dimension, key in (
+            (DIMENSION_TOTAL, ""),
+            (DIMENSION_SENDER_DOMAIN, sender_domain(email.sender_email))
+        ):
+            for rollup_key in _rollup_keys(email.received_at, dimension, key):
+                processed[rollup_key] += 1
+
+    if reanalyzed and previous_category_id:
+        for rollup_key in _rollup_keys(email.received_at, DIMENSION_CATEGORY, str(previous_category_id)):
+            processed[rollup_key] -= 1
+    if category_id:
+        for rollup_key in _rollup_keys(email.received_at, DIMENSION_CATEGORY, str(category_id)):
+            processed[rollup_key] += 1
+
+    await _apply(db, {
+        rollup_key: (0, count)
+        for rollup_key, count in processed.items()
+        if count
+    })
+
+async def rebuild_rollups(db: AsyncSession, start: date, end: date):
+    start_datetime = datetime.combine(start, datetime.min.time(), tzinfo=timezone.utc)
+    end_datetime = datetime.combine(end, datetime.min.time(), tzinfo=timezone.utc)
+
+    await db.execute(
+        delete(EmailRollup).where(
+            and_(
+                EmailRollup.bucket >= start_datetime,
+                EmailRollup.bucket < end_datetime
+            )
+        )
+    )
+
+    in_range = and_(
+        Email.received_at >= start_datetime,
+        Email.received_at < end_datetime
+    )
+    domain = func.coalesce(
+        func.substring(func.lower(Email.sender_email), "@([^@]*)$"), ""
+    ).label("domain")
+    processed = func.count(case((Email.processed == True, 1)))
+
+    for granularity in GRANULARITIES:
+        bucket = utc_bucket(granularity, Email.received_at).label("bucket")
+
+        sources = [
+            select(
+                literal(granularity), bucket, literal(DIMENSION_TOTAL), literal(""),
+                func.count(Email.id), processed
+            )
+            .where(in_range)
+            .group_by(bucket),
+            select(
+                literal(granularity), bucket, literal(DIMENSION_SENDER_DOMAIN), domain,
+                func.count(Email.id), processed
+            )
+            .where(in_range)
+            .group_by(bucket, domain),
+            select(
+                literal(granularity), bucket, literal(DIMENSION_CATEGORY),
+                cast(AnalyzedContent.category_id, String),
+                literal(0), func.count(AnalyzedContent.id)
+            )
+            .join(Email, Email.id == AnalyzedContent.email_id)
+            .where(and_(in_range, AnalyzedContent.category_id.isnot(None)))
+            .group_by(bucket, AnalyzedContent.category_id)
+        ]
+
+        for source in sources:
+            await db.execute(
+                pg_insert(EmailRollup).from_select(
+                    ["granularity", "bucket", "dimension", "key", "received", "processed"],
+                    source
+                )
+            )
+
+    await db.commit()
+    logger.info(f"Rebuilt email rollups for {start} to {end}")
+
+def _rollup_keys(received_at: datetime, dimension: str, key: str) -> Iterable[RollupKey]:
+    for granularity in GRANULARITIES:
+        yield (granularity, truncate(received_at, granularity), dimension, key)
+
+async def _apply(db: AsyncSession, deltas: Dict[RollupKey, Tuple[int, int]]):
+    if not deltas:
+        return
+
+    rows = [
+        {
+            "granularity": granularity,
+            "bucket": bucket,
+            "dimension": dimension,
+            "key": key,
+            "received": received,
+            "processed": processed
+        }
+        for (granularity, bucket, dimension, key), (received, processed) in sorted(deltas.items())
+    ]
+
+    statement = pg_insert(EmailRollup).values(rows)
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=["granularity", "bucket", "dimension", "key"],
+            set_={
+                "received": EmailRollup.received + statement.excluded.received,
+                "processed": EmailRollup.processed + statement.excluded.processed
+            }
+        )
+    )
+
+async def _rebuild_range(start: date, days: int):
+    async with AsyncSessionLocal() as db:
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            await rebuild_rollups(db, day, day + timedelta(days=1))
+
+async def _rebuild_all():
+    async with AsyncSessionLocal() as db:
+        first, last = (await db.execute(
+            select(func.min(Email.received_at), func.max(Email.received_at))
+        )).one()
+
+    if first is None:
+        logger.info("No emails to roll up")
+        return
+
+    await _rebuild_range(first.date(), (last.date() - first.date()).days + 1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild analytics rollups from raw rows")
+    parser.add_argument("--date", type=date.fromisoformat, default=datetime.now(timezone.utc).date())
+    parser.add_argument("--days", type=int, default=1, help="Number of days to rebuild from --date")
+    parser.add_argument("--all", action="store_true", help="Rebuild the entire email history")
+    args = parser.parse_args()
+
+    if args.all:
+        asyncio.run(_rebuild_all())
+    else:
+        asyncio.run(_rebuild_range(args.date, args.days))
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
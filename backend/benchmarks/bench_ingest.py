@@ -0,0 +1,65 @@
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List
+import httpx
+
+def make_email(idx: int) -> Dict[str, Any]:
+    return {
+        "subject": f"Benchmark newsletter #{idx}",
+        "sender_email": "bench@example.com",
+        "sender_name": "Benchmark",
+        "raw_content": f"<html><body><p>Benchmark body {idx}</p></body></html>"
+    }
+
+async def run_single(client: httpx.AsyncClient, total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(idx: int):
+        async with semaphore:
+            response = await client.post("/api/v1/emails/receive", json=make_email(idx))
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*[send(idx) for idx in range(total)])
+    return total / (time.perf_counter() - started)
+
+async def run_batched(
+    client: httpx.AsyncClient,
+    total: int,
+    concurrency: int,
+    batch_size: int
+) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    batches: List[List[Dict[str, Any]]] = [
+        [make_email(idx) for idx in range(start, min(start + batch_size, total))]
+        for start in range(0, total, batch_size)
+    ]
+
+    async def send(batch: List[Dict[str, Any]]):
+        async with semaphore:
+            response = await client.post("/api/v1/emails/receive/batch", json=batch)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*[send(batch) for batch in batches])
+    return total / (time.perf_counter() - started)
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare single vs batched email ingestion")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--total", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60.0) as client:
+        single_rate = await run_single(client, args.total, args.concurrency)
+        batched_rate = await run_batched(client, args.total, args.concurrency, args.batch_size)
+
+    print(f"single  : {single_rate:8.1f} emails/s ({args.total} emails, concurrency {args.concurrency})")
+    print(f"batched : {batched_rate:8.1f} emails/s (batch size {args.batch_size})")
+    print(f"speedup : {batched_rate / single_rate:8.2f}x")
+
+if __name__ == "__main__":
+    asyncio.run(main())
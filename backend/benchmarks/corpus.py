@@ -0,0 +1,136 @@
+import argparse
+import random
+from email.charset import BASE64, QP, Charset
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, NamedTuple
+
+KINDS = ("multipart", "table_newsletter", "plain_text", "non_utf8", "huge")
+
+WORDS = (
+    "release model launch pricing update security patch dataset benchmark inference latency "
+    "research funding startup conference ticket discount order shipping market earnings "
+    "quarter guidance analyst volatility kernel database queue cache throughput memory"
+).split()
+
+NON_UTF8_SAMPLES = (
+    ("iso-8859-1", QP, "Café crème, naïve façade, Señor Müller: prix réduit à 15 £"),
+    ("windows-1252", QP, "“Smart quotes” and an ellipsis… plus 30 € off — limited time"),
+    ("shift_jis", BASE64, "新製品のお知らせ。本日より販売開始します。"),
+    ("koi8-r", BASE64, "Новости недели: выпуск новой версии и обновления безопасности"),
+)
+
+class CorpusEmail(NamedTuple):
+    name: str
+    kind: str
+    raw: bytes
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def paragraph(rng: random.Random) -> str:
+    return " ".join(sentence(rng, rng.randint(8, 20)) for _ in range(rng.randint(2, 5)))
+
+def table_newsletter_html(rng: random.Random, stories: int) -> str:
+    rows = []
+    for i in range(stories):
+        rows.append(f"""
+      <tr><td style="padding:0 24px">
+        <table role="presentation" width="100%" cellpadding="0" cellspacing="0" border="0">
+          <tr>
+            <td width="120" valign="top" style="padding:12px 12px 12px 0">
+              <a href="https://news.example.com/s/{i}?utm_source=newsletter"><img src="https://cdn.example.com/thumb/{i}.jpg" width="120" height="80" alt="{sentence(rng, 3)[:-1]}" style="display:block;border:0"></a>
+            </td>
+            <td valign="top" style="padding:12px 0;font-family:Arial,sans-serif;font-size:14px;line-height:20px;color:#333333">
+              <h2 style="margin:0 0 6px;font-size:18px"><a href="https://news.example.com/s/{i}" style="color:#1a1a1a;text-decoration:none">{sentence(rng, 6)[:-1]}</a></h2>
+              <p style="margin:0">{paragraph(rng)}</p>
+              <p style="margin:6px 0 0"><a href="https://news.example.com/s/{i}" style="color:#0066cc">Read more &raquo;</a></p>
+            </td>
+          </tr>
+        </table>
+      </td></tr>""")
+
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><style>body{{margin:0}} .hide{{display:none}}</style></head>
+<body style="margin:0;padding:0;background:#f4f4f4">
+<table role="presentation" width="100%" cellpadding="0" cellspacing="0" border="0" bgcolor="#f4f4f4"><tr><td align="center">
+  <table role="presentation" width="600" cellpadding="0" cellspacing="0" border="0" bgcolor="#ffffff">
+    <tr><td style="padding:12px 24px;font-size:11px"><a href="https://news.example.com/view">View in browser</a></td></tr>
+    <tr><td style="padding:0 24px"><img src="https://cdn.example.com/logo.png" width="200" height="50" alt="Example News"></td></tr>{"".join(rows)}
+    <tr><td style="padding:24px;font-size:11px;color:#999999">
+      <p>You are receiving this because you subscribed.</p>
+      <p><a href="https://news.example.com/unsubscribe">Unsubscribe</a> | <a href="https://news.example.com/prefs">Manage your preferences</a></p>
+      <img src="https://track.example.com/open.gif?u=1" width="1" height="1" alt="">
+    </td></tr>
+  </table>
+</td></tr></table>
+</body></html>"""
+
+def _headers(message, rng: random.Random, index: int, subject: str):
+    sent = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=37 * index)
+    message["Subject"] = subject
+    message["From"] = f"Example Sender {index % 7} <news{index % 7}@example.com>"
+    message["To"] = "inbox@example.com"
+    message["Date"] = format_datetime(sent)
+    message["Message-ID"] = f"<corpus-{index}@example.com>"
+    if message.is_multipart():
+        message.set_boundary(f"=====corpus-{index}=====")
+    return message
+
+def make_email(kind: str, index: int, rng: random.Random, huge_kb: int) -> CorpusEmail:
+    subject = sentence(rng, 5)[:-1]
+
+    if kind == "multipart":
+        message = MIMEMultipart("alternative")
+        body = "\n\n".join(paragraph(rng) for _ in range(rng.randint(3, 8)))
+        message.attach(MIMEText(body, "plain", "utf-8"))
+        html = "".join(f"<p>{part}</p>" for part in body.split("\n\n"))
+        message.attach(MIMEText(f"<html><body><h1>{subject}</h1>{html}</body></html>", "html", "utf-8"))
+    elif kind == "table_newsletter":
+        message = MIMEText(table_newsletter_html(rng, rng.randint(6, 15)), "html", "utf-8")
+    elif kind == "plain_text":
+        body = "\n\n".join(paragraph(rng) for _ in range(rng.randint(2, 10)))
+        message = MIMEText(body + "\n\n--\nTo unsubscribe reply STOP", "plain", "utf-8")
+    elif kind == "non_utf8":
+        charset_name, encoding, sample = NON_UTF8_SAMPLES[index % len(NON_UTF8_SAMPLES)]
+        charset = Charset(charset_name)
+        charset.body_encoding = encoding
+        html = f"<html><body><p>{sample}</p><p>{sample}</p></body></html>"
+        message = MIMEMultipart("alternative")
+        message.attach(MIMEText(sample, "plain", charset))
+        message.attach(MIMEText(html, "html", charset))
+    elif kind == "huge":
+        stories = max(1, huge_kb * 1024 // 1800)
+        message = MIMEText(table_newsletter_html(rng, stories), "html", "utf-8")
+    else:
+        raise ValueError(f"Unknown corpus kind: {kind}")
+
+    return CorpusEmail(f"{index:04d}-{kind}", kind, _headers(message, rng, index, subject).as_bytes())
+
+def generate_corpus(size: int = 50, seed: int = 1234, huge_kb: int = 2048) -> List[CorpusEmail]:
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(size):
+        kind = KINDS[index % len(KINDS)]
+        corpus.append(make_email(kind, index, rng, huge_kb if kind == "huge" else 0))
+    return corpus
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the deterministic synthetic email corpus as .eml files")
+    parser.add_argument("--output", default="benchmarks/corpus")
+    parser.add_argument("--size", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--huge-kb", type=int, default=2048)
+    args = parser.parse_args()
+
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    for item in generate_corpus(args.size, args.seed, args.huge_kb):
+        (output / f"{item.name}.eml").write_bytes(item.raw)
+    print(f"Wrote {args.size} emails to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import re
+import smtplib
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email import message_from_bytes
+from email.utils import parseaddr
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).parent / "results"
+TAG = re.compile(r"\[(lt\d+-\d+)\]")
+
+COMPARED_METRICS = (
+    ("accepted_per_sec", "higher"),
+    ("analyzed_per_sec", "higher"),
+    ("accept_to_processed_ms.p50", "lower"),
+    ("accept_to_processed_ms.p95", "lower"),
+    ("accept_to_processed_ms.p99", "lower"),
+    ("smtp_accept_ms.p95", "lower"),
+    ("queue_depth_max", "lower"),
+    ("db_connections_max", "lower")
+)
+
+Message = Tuple[str, str, bytes]
+
+def build_schedule(args: argparse.Namespace) -> List[float]:
+    steady = [i / args.rate for i in range(int(args.rate * args.duration))]
+
+    if args.shape == "steady":
+        return steady
+
+    if args.shape == "burst":
+        offsets = []
+        offset = 0.0
+        while offset < args.duration:
+            offsets.extend([offset] * args.burst_size)
+            offset += args.burst_interval
+        return offsets
+
+    spike = [args.spike_at + args.spike_window * i / args.spike_size for i in range(args.spike_size)]
+    return sorted(steady + spike)
+
+def build_messages(count: int, run_id: str, seed: int, huge_kb: int) -> List[Message]:
+    from benchmarks.corpus import generate_corpus
+
+    messages = []
+    for seq, item in enumerate(generate_corpus(count, seed=seed, huge_kb=huge_kb)):
+        message = message_from_bytes(item.raw)
+        tag = f"{run_id}-{seq:06d}"
+        message.replace_header("Subject", f"{message['Subject']} [{tag}]")
+        messages.append((tag, parseaddr(message["From"])[1], message.as_bytes()))
+    return messages
+
+def send_one(host: str, port: int, sender: str, raw: bytes, timeout: float) -> Tuple[int, float]:
+    started = time.perf_counter()
+    try:
+        with smtplib.SMTP(host, port, timeout=timeout) as smtp:
+            smtp.sendmail(sender, ["inbox@example.com"], raw)
+        code = 250
+    except smtplib.SMTPResponseException as e:
+        code = e.smtp_code
+    except (OSError, smtplib.SMTPException):
+        code = 0
+    return code, time.perf_counter() - started
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    if len(values) == 1:
+        return {key: round(values[0] * 1000, 1) for key in ("p50", "p95", "p99", "max")}
+
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "p50": round(cuts[49] * 1000, 1),
+        "p95": round(cuts[94] * 1000, 1),
+        "p99": round(cuts[98] * 1000, 1),
+        "max": round(max(values) * 1000, 1)
+    }
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+class LoadTracker:
+    def __init__(self, started: float):
+        self.started = started
+        self.codes: Counter = Counter()
+        self.smtp_latency: List[float] = []
+        self.accepted_at: Dict[str, float] = {}
+        self.analyzed_at: Dict[str, float] = {}
+        self.timeline: List[Dict[str, Any]] = []
+        self.last_send: Optional[float] = None
+
+    def record_send(self, tag: str, code: int, latency: float):
+        now = time.monotonic()
+        self.codes[code] += 1
+        self.smtp_latency.append(latency)
+        self.last_send = now
+        if code == 250:
+            self.accepted_at[tag] = now
+
+    def record_analyzed(self, tag: str):
+        self.analyzed_at.setdefault(tag, time.monotonic())
+
+    def pending(self) -> int:
+        return sum(1 for tag in self.accepted_at if tag not in self.analyzed_at)
+
+    def processing_latencies(self) -> List[float]:
+        return [
+            max(0.0, self.analyzed_at[tag] - accepted)
+            for tag, accepted in self.accepted_at.items()
+            if tag in self.analyzed_at
+        ]
+
+async def watch_analyzed(tracker: LoadTracker):
+    from app.services.event_bus import EMAIL_ANALYZED, Subscriber, event_bus
+
+    subscriber = Subscriber(buffer_size=1_000_000)
+    async for event in event_bus.events(subscriber):
+        if event is None or event["type"] != EMAIL_ANALYZED:
+            continue
+        match = TAG.search(event["data"].get("subject") or "")
+        if match:
+            tracker.record_analyzed(match.group(1))
+
+async def sample(tracker: LoadTracker, interval: float):
+    from app.core.database import engine
+    from app.services.analysis_queue import analysis_queue
+
+    pool = engine.pool
+    while True:
+        stats = await analysis_queue.stats()
+        tracker.timeline.append({
+            "t": round(time.monotonic() - tracker.started, 2),
+            "accepted": len(tracker.accepted_at),
+            "analyzed": len(tracker.analyzed_at),
+            "queue_depth": stats["depth"],
+            "in_flight": stats["in_flight"],
+            "delayed": stats["delayed"],
+            "dead_letter": stats["dead_letter"],
+            "db_checked_out": pool.checkedout(),
+            "db_overflow": max(0, pool.overflow())
+        })
+        await asyncio.sleep(interval)
+
+async def drive(args: argparse.Namespace, schedule: List[float], messages: List[Message], tracker: LoadTracker):
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=args.connections)
+
+    async def send(tag: str, sender: str, raw: bytes):
+        code, latency = await loop.run_in_executor(
+            executor, send_one, "127.0.0.1", args.smtp_port, sender, raw, args.smtp_timeout
+        )
+        tracker.record_send(tag, code, latency)
+
+    tasks = []
+    for offset, (tag, sender, raw) in zip(schedule, messages):
+        delay = tracker.started + offset - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(tag, sender, raw)))
+
+    await asyncio.gather(*tasks)
+    executor.shutdown()
+
+async def drain(tracker: LoadTracker, timeout: float):
+    deadline = time.monotonic() + timeout
+    while tracker.pending() and time.monotonic() < deadline:
+        await asyncio.sleep(0.2)
+
+async def count_processed(run_id: str) -> int:
+    from sqlalchemy import func, select
+    from app.core.database import AsyncSessionLocal
+    from app.models.email import Email
+
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(
+            select(func.count())
+            .select_from(Email)
+            .where(Email.subject.like(f"%[{run_id}-%"), Email.processed == True)
+        )
+
+def start_mock(args: argparse.Namespace) -> subprocess.Popen:
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.mock_openrouter",
+            "--port", str(args.mock_port),
+            "--latency-ms", str(args.llm_latency_ms),
+            "--jitter-ms", str(args.llm_jitter_ms),
+            "--distribution", args.llm_distribution,
+            "--slow-rate", str(args.llm_slow_rate),
+            "--slow-ms", str(args.llm_slow_ms),
+            "--error-rate", str(args.llm_error_rate),
+            "--rate-limit", str(args.llm_rate_limit),
+            "--rate-window", str(args.llm_rate_window),
+            "--retry-after", str(args.llm_retry_after)
+        ],
+        cwd=BACKEND_DIR
+    )
+
+async def wait_for(url: str, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(url)
+                return
+            except httpx.HTTPError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+                await asyncio.sleep(0.2)
+
+async def fetch_json(url: str) -> Optional[Dict[str, Any]]:
+    try:
+        async with httpx.AsyncClient() as client:
+            return (await client.get(url)).json()
+    except (httpx.HTTPError, ValueError):
+        return None
+
+def configure_environment(args: argparse.Namespace):
+    os.environ["OPENROUTER_BASE_URL"] = f"http://127.0.0.1:{args.mock_port}"
+    os.environ.setdefault("OPENROUTER_API_KEY", "load-test")
+    os.environ["SMTP_HOST"] = "127.0.0.1"
+    os.environ["SMTP_PORT"] = str(args.smtp_port)
+    os.environ["SMTP_EMBEDDED"] = "true" if args.ingest_mode == "direct" else "false"
+    os.environ["SMTP_FORWARD_URL"] = f"http://127.0.0.1:{args.api_port}/api/v1/emails/receive"
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    configure_environment(args)
+
+    import uvicorn
+    from app.core.http import get_http_client
+    from app.main import app
+    from app.services.email_receiver import EmailReceiver
+    from app.services.llm_client import llm_client
+
+    logging.getLogger().setLevel(args.log_level.upper())
+
+    run_id = f"lt{int(time.time())}"
+    schedule = build_schedule(args)
+    messages = build_messages(len(schedule), run_id, args.seed, args.huge_kb)
+    print(f"Run {run_id}: {len(schedule)} emails, shape {args.shape}, ingest {args.ingest_mode}")
+
+    mock = start_mock(args)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.api_port, log_level="warning"))
+    server_task = None
+    receiver = None
+    background: List[asyncio.Task] = []
+
+    try:
+        await wait_for(f"http://127.0.0.1:{args.mock_port}/stats")
+
+        server_task = asyncio.create_task(server.serve())
+        while not server.started:
+            if server_task.done():
+                raise RuntimeError("API failed to start, check DATABASE_URL and REDIS_URL")
+            await asyncio.sleep(0.1)
+
+        if args.ingest_mode == "http":
+            receiver = EmailReceiver(client=get_http_client(), ingest_mode="http", embedded=True)
+            await receiver.start()
+
+        tracker = LoadTracker(time.monotonic())
+        background = [
+            asyncio.create_task(watch_analyzed(tracker)),
+            asyncio.create_task(sample(tracker, args.sample_interval))
+        ]
+        await asyncio.sleep(0)
+
+        await drive(args, schedule, messages, tracker)
+        send_finished = time.monotonic()
+        await drain(tracker, args.drain_timeout)
+
+        processed = await count_processed(run_id)
+        mock_stats = await fetch_json(f"http://127.0.0.1:{args.mock_port}/stats")
+        llm_stats = llm_client.stats()
+    finally:
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        if receiver:
+            await receiver.stop()
+        if server_task:
+            server.should_exit = True
+            await server_task
+        mock.terminate()
+        mock.wait()
+
+    send_window = max(send_finished - tracker.started, 1e-9)
+    analyzed_window = max(max(tracker.analyzed_at.values(), default=tracker.started) - tracker.started, 1e-9)
+    checked_out = [point["db_checked_out"] for point in tracker.timeline]
+    dead_letter = [point["dead_letter"] for point in tracker.timeline]
+
+    summary = {
+        "sent": len(schedule),
+        "accepted": len(tracker.accepted_at),
+        "deferred": tracker.codes[451],
+        "rejected": sum(count for code, count in tracker.codes.items() if code not in (0, 250, 451)),
+        "connection_errors": tracker.codes[0],
+        "analyzed": len(tracker.analyzed_at),
+        "processed_in_db": processed,
+        "unanalyzed": tracker.pending(),
+        "send_seconds": round(send_window, 2),
+        "accepted_per_sec": round(len(tracker.accepted_at) / send_window, 2),
+        "analyzed_per_sec": round(len(tracker.analyzed_at) / analyzed_window, 2),
+        "accept_to_processed_ms": percentiles(tracker.processing_latencies()),
+        "smtp_accept_ms": percentiles(tracker.smtp_latency),
+        "queue_depth_max": max((point["queue_depth"] for point in tracker.timeline), default=0),
+        "db_connections_max": max(checked_out, default=0),
+        "db_connections_mean": round(statistics.fmean(checked_out), 2) if checked_out else 0,
+        "dead_lettered": dead_letter[-1] - dead_letter[0] if dead_letter else 0
+    }
+
+    return {
+        "run_id": run_id,
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "summary": summary,
+        "response_codes": {str(code): count for code, count in sorted(tracker.codes.items())},
+        "llm": llm_stats,
+        "mock": mock_stats,
+        "timeline": tracker.timeline
+    }
+
+def lookup(summary: Dict[str, Any], path: str) -> Optional[float]:
+    value: Any = summary
+    for key in path.split("."):
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+def compare(report: Dict[str, Any], previous: Dict[str, Any], tolerance: float) -> List[str]:
+    regressions = []
+    print(f"\nCompared with {previous.get('commit')} ({previous.get('run_id')}):")
+    for metric, better in COMPARED_METRICS:
+        before = lookup(previous["summary"], metric)
+        after = lookup(report["summary"], metric)
+        if before is None or after is None:
+            continue
+
+        change = (after - before) / before if before else 0.0
+        print(f"  {metric:32s} {before:10.1f} -> {after:10.1f} ({change:+.0%})")
+        worse = change < -tolerance if better == "higher" else change > tolerance
+        if worse and before:
+            regressions.append(f"{metric}: {before:.1f} -> {after:.1f} ({change:+.0%})")
+    return regressions
+
+def print_summary(report: Dict[str, Any]):
+    summary = report["summary"]
+    latency = summary["accept_to_processed_ms"]
+    print(
+        f"accepted {summary['accepted']}/{summary['sent']} ({summary['accepted_per_sec']:.1f}/s), "
+        f"deferred {summary['deferred']}, rejected {summary['rejected']}, errors {summary['connection_errors']}"
+    )
+    print(
+        f"analyzed {summary['analyzed']} ({summary['analyzed_per_sec']:.1f}/s), "
+        f"processed in DB {summary['processed_in_db']}, unanalyzed {summary['unanalyzed']}"
+    )
+    print(f"accept -> processed p50 {latency['p50']} ms, p95 {latency['p95']} ms, p99 {latency['p99']} ms")
+    print(
+        f"queue depth max {summary['queue_depth_max']}, "
+        f"db connections max {summary['db_connections_max']} (mean {summary['db_connections_mean']})"
+    )
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="End-to-end load test: SMTP traffic through the API and analysis queue against a mock OpenRouter"
+    )
+    parser.add_argument("--shape", choices=["steady", "burst", "digest"], default="steady")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds of traffic")
+    parser.add_argument("--rate", type=float, default=5.0, help="Emails/s for steady traffic and the digest baseline")
+    parser.add_argument("--burst-size", type=int, default=50)
+    parser.add_argument("--burst-interval", type=float, default=15.0)
+    parser.add_argument("--spike-at", type=float, default=10.0, help="Seconds into the run the digest spike starts")
+    parser.add_argument("--spike-size", type=int, default=300)
+    parser.add_argument("--spike-window", type=float, default=5.0, help="Seconds the digest spike is spread over")
+    parser.add_argument("--connections", type=int, default=20, help="Concurrent SMTP client connections")
+    parser.add_argument("--smtp-timeout", type=float, default=60.0)
+    parser.add_argument("--ingest-mode", choices=["direct", "http"], default="direct")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--huge-kb", type=int, default=256, help="Size of every fifth (huge) corpus email")
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=300.0)
+    parser.add_argument("--llm-distribution", choices=["normal", "lognormal"], default="lognormal")
+    parser.add_argument("--llm-slow-rate", type=float, default=0.02)
+    parser.add_argument("--llm-slow-ms", type=float, default=5000.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.02)
+    parser.add_argument("--llm-rate-limit", type=int, default=600, help="Mock requests per --llm-rate-window before 429s")
+    parser.add_argument("--llm-rate-window", type=float, default=60.0)
+    parser.add_argument("--llm-retry-after", type=float, default=1.0)
+    parser.add_argument("--smtp-port", type=int, default=2526)
+    parser.add_argument("--api-port", type=int, default=8001)
+    parser.add_argument("--mock-port", type=int, default=8099)
+    parser.add_argument("--sample-interval", type=float, default=1.0)
+    parser.add_argument("--drain-timeout", type=float, default=300.0, help="Seconds to wait for accepted emails to be analyzed")
+    parser.add_argument("--log-level", default="warning")
+    parser.add_argument("--output", type=Path, help="Report path (default benchmarks/results/load-<shape>-<commit>-<run>.json)")
+    parser.add_argument("--compare", type=Path, help="Previous report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression when comparing")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_summary(report)
+
+    output = args.output or RESULTS_DIR / f"load-{args.shape}-{report['commit'] or 'unknown'}-{report['run_id']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, default=str) + "\n")
+    print(f"Report written to {output}")
+
+    if args.compare:
+        regressions = compare(report, json.loads(args.compare.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
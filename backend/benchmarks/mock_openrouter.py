@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from collections import deque
+from typing import Deque
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.requests import ClientDisconnect
+
+ANALYSIS = {
+    "category": "TECH",
+    "importance_score": 6,
+    "title_optimized": "Mock analysis",
+    "summary": "Mock OpenRouter response.",
+    "key_points": ["First point", "Second point"],
+    "tags": ["mock"],
+    "sentiment": "neutral",
+    "action_items": []
+}
+
+def create_app(
+    latency_ms: float = 200.0,
+    jitter_ms: float = 50.0,
+    slow_rate: float = 0.05,
+    slow_ms: float = 3000.0,
+    error_rate: float = 0.02,
+    rate_limit: int = 600,
+    rate_window: float = 60.0,
+    retry_after: float = 1.0,
+    slow_models: str = "",
+    distribution: str = "normal"
+) -> FastAPI:
+    app = FastAPI(title="Mock OpenRouter")
+    window: Deque[float] = deque()
+    slow = set(filter(None, slow_models.split(",")))
+    app.state.calls = {"total": 0, "rate_limited": 0, "errors": 0}
+
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        try:
+            body = await request.json()
+        except ClientDisconnect:
+            return JSONResponse({}, status_code=499)
+        calls = app.state.calls
+        calls["total"] += 1
+
+        now = time.monotonic()
+        while window and now - window[0] > rate_window:
+            window.popleft()
+
+        remaining = rate_limit - len(window)
+        reset_in = rate_window - (now - window[0]) if window else rate_window
+        headers = {
+            "X-RateLimit-Limit": str(rate_limit),
+            "X-RateLimit-Remaining": str(max(0, remaining - 1)),
+            "X-RateLimit-Reset": str(int((time.time() + reset_in) * 1000))
+        }
+        if remaining <= 0:
+            calls["rate_limited"] += 1
+            headers["Retry-After"] = str(retry_after)
+            return JSONResponse({"error": {"message": "Rate limit exceeded"}}, status_code=429, headers=headers)
+        window.append(now)
+
+        if distribution == "lognormal" and latency_ms > 0:
+            delay = latency_ms * random.lognormvariate(0.0, math.log1p(jitter_ms / latency_ms))
+        else:
+            delay = max(0.0, random.gauss(latency_ms, jitter_ms))
+        if body.get("model") in slow or random.random() < slow_rate:
+            delay += slow_ms
+        await asyncio.sleep(delay / 1000)
+
+        if random.random() < error_rate:
+            calls["errors"] += 1
+            return JSONResponse({"error": {"message": "Upstream error"}}, status_code=502, headers=headers)
+
+        content = json.dumps(ANALYSIS)
+        return JSONResponse(
+            {
+                "id": f"mock-{calls['total']}",
+                "model": body.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 400, "completion_tokens": len(content) // 4, "total_tokens": 400 + len(content) // 4}
+            },
+            headers=headers
+        )
+
+    @app.get("/stats")
+    async def stats():
+        return app.state.calls
+
+    return app
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local mock of the OpenRouter chat completions API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument(
+        "--distribution",
+        choices=["normal", "lognormal"],
+        default="normal",
+        help="normal: latency +/- jitter; lognormal: median latency with a long tail scaled by jitter"
+    )
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-ms", type=float, default=3000.0)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--rate-limit", type=int, default=600, help="Requests allowed per --rate-window")
+    parser.add_argument("--rate-window", type=float, default=60.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--slow-models", default="", help="Comma-separated models that always add --slow-ms")
+    args = parser.parse_args()
+
+    app = create_app(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        slow_rate=args.slow_rate,
+        slow_ms=args.slow_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        rate_window=args.rate_window,
+        retry_after=args.retry_after,
+        slow_models=args.slow_models,
+        distribution=args.distribution
+    )
+    print(f"Point OPENROUTER_BASE_URL at http://{args.host}:{args.port}")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import pytest
+
+from benchmarks.bench_pipeline import build_stages, calibration_workload, peak_kb
+
+STAGES = (
+    "parse_mime",
+    "extract_content",
+    "process",
+    "extract",
+    "clean_markdown",
+    "analysis_prompt",
+    "categories_summary",
+    "markdown_summary"
+)
+
+pytestmark = pytest.mark.benchmark(group="pipeline")
+
+@pytest.fixture(scope="module")
+def stages():
+    return {name: (func, inputs) for name, func, inputs, _ in build_stages(10, huge_kb=256)}
+
+def test_calibration(benchmark):
+    benchmark(calibration_workload, 2000)
+
+@pytest.mark.parametrize("name", STAGES)
+def test_stage(benchmark, stages, name):
+    func, inputs = stages[name]
+
+    def run():
+        for item in inputs:
+            func(item)
+
+    benchmark.extra_info["inputs"] = len(inputs)
+    benchmark.extra_info["peak_kb"] = round(peak_kb(func, inputs), 1)
+    benchmark(run)
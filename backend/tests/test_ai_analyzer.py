@@ -0,0 +1,113 @@
+import json
+import threading
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services import ai_analyzer, email_processor
+from app.services.ai_analyzer import AIAnalyzer
+from app.services.content_reducer import content_reducer
+
+ANALYSIS = {"category": "TECH", "importance_score": 7, "title_optimized": "Title", "summary": "Summary"}
+
+@pytest.fixture
+async def analyzer(monkeypatch):
+    cache = {}
+
+    async def get(key):
+        return cache.get(key)
+
+    async def set(key, value):
+        cache[key] = value
+
+    monkeypatch.setattr(ai_analyzer.analysis_cache, "get", get)
+    monkeypatch.setattr(ai_analyzer.analysis_cache, "set", set)
+    async with httpx.AsyncClient() as client:
+        yield AIAnalyzer(client=client)
+
+async def test_content_is_reduced_once_before_prompting(analyzer, monkeypatch):
+    reduced = []
+    prompts = []
+
+    async def reduce(content, budget, strip_links=False):
+        reduced.append(content)
+        return f"reduced:{content}"
+
+    async def complete(prompt, max_tokens, kind="single"):
+        prompts.append(prompt)
+        return json.dumps(ANALYSIS)
+
+    monkeypatch.setattr(analyzer.processor, "reduce", reduce)
+    monkeypatch.setattr(analyzer, "_complete", complete)
+
+    assert await analyzer.analyze("Subject", "news@example.com", "body") == ANALYSIS
+    assert await analyzer.analyze("Subject", "news@example.com", "body") == ANALYSIS
+
+    assert reduced == ["body"]
+    assert "Content: reduced:body" in prompts[0]
+
+async def test_batch_reduces_each_email_once(analyzer, monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_BATCH_MAX_SIZE", 10)
+    reduced = []
+
+    async def reduce(content, budget, strip_links=False):
+        reduced.append(content)
+        return f"reduced:{content}"
+
+    async def complete(prompt, max_tokens, kind="single"):
+        assert "Content: reduced:first" in prompt and "Content: reduced:second" in prompt
+        return json.dumps([{"id": "1", **ANALYSIS}])
+
+    monkeypatch.setattr(analyzer.processor, "reduce", reduce)
+    monkeypatch.setattr(analyzer, "_complete", complete)
+    emails = [
+        {"id": "1", "subject": "A", "sender": "a@example.com", "content": "first"},
+        {"id": "2", "subject": "B", "sender": "b@example.com", "content": "second"}
+    ]
+
+    results = await analyzer.analyze_batch(emails)
+
+    assert sorted(reduced) == ["first", "second"]
+    assert set(results) == {"1", "2"}
+
+async def test_reduction_runs_in_the_processor_pool(monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_PROCESSOR_EXECUTOR", "thread")
+    email_processor.shutdown_executor()
+    threads = []
+    reduce = content_reducer.reduce
+
+    def record(content, budget, strip_links=False):
+        threads.append(threading.current_thread())
+        return reduce(content, budget, strip_links=strip_links)
+
+    monkeypatch.setattr(content_reducer, "reduce", record)
+    content = "\n\n".join(f"## Story {i}\n\n" + "word " * 200 for i in range(50))
+
+    try:
+        result = await email_processor.EmailProcessor().reduce(content, 100)
+    finally:
+        email_processor.shutdown_executor()
+
+    assert threads and threads[0] is not threading.main_thread()
+    assert content_reducer.count_tokens(result) <= 100
+
+@pytest.mark.parametrize("response", [
+    json.dumps(["TECH"]),
+    json.dumps("TECH"),
+    json.dumps({"category": "TECH"})
+])
+async def test_incomplete_analysis_is_not_cached(analyzer, monkeypatch, response):
+    calls = []
+
+    async def complete(prompt, max_tokens, kind="single"):
+        calls.append(prompt)
+        return response
+
+    monkeypatch.setattr(analyzer, "_complete", complete)
+
+    first = await analyzer.analyze("Subject", "news@example.com", "body")
+    await analyzer.analyze("Subject", "news@example.com", "body")
+
+    assert first == analyzer._get_default_analysis("parse_error")
+    assert len(calls) == 2
@@ -0,0 +1,154 @@
+import json
+import time
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from app.core.config import settings
+from app.services.analysis_queue import AnalysisQueue, Claim
+
+@pytest.fixture
+async def queue():
+    redis = FakeAsyncRedis(decode_responses=True)
+    yield AnalysisQueue(redis, prefix="test_queue")
+    await redis.flushall()
+    await redis.aclose()
+
+async def test_enqueue_deduplicates_pending_jobs(queue):
+    assert await queue.enqueue("email-1") is True
+    assert await queue.enqueue("email-1") is False
+    assert await queue.depth() == 1
+
+async def test_enqueue_many_counts_new_jobs(queue):
+    await queue.enqueue("email-1")
+    assert await queue.enqueue_many(["email-1", "email-2", "email-3"]) == 2
+    assert await queue.depth() == 3
+
+async def test_claim_is_fifo_and_tracks_attempts(queue):
+    await queue.enqueue_many(["email-1", "email-2"])
+
+    claim = await queue._claim_job()
+    assert (claim.job_id, claim.attempt) == ("email-1", 1)
+    assert await queue.redis.zscore(queue.inflight_key, "email-1") == claim.deadline
+    assert claim.deadline > time.time()
+    assert await queue.depth() == 1
+
+    assert (await queue._claim_job()).job_id == "email-2"
+    assert await queue._claim_job() is None
+
+async def test_ack_clears_job_state(queue):
+    await queue.enqueue("email-1")
+
+    await queue._ack(await queue._claim_job())
+
+    assert await queue.redis.zcard(queue.inflight_key) == 0
+    assert not await queue.redis.hexists(queue.jobs_key, "email-1")
+    assert not await queue.redis.hexists(queue.attempts_key, "email-1")
+    assert await queue.enqueue("email-1") is True
+
+async def test_claimed_job_is_not_enqueued_twice(queue):
+    await queue.enqueue("email-1")
+    await queue._claim_job()
+
+    assert await queue.enqueue("email-1") is False
+    assert await queue.depth() == 0
+
+async def test_fail_schedules_delayed_retry(queue, monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_QUEUE_MAX_ATTEMPTS", 3)
+    await queue.enqueue("email-1")
+    await queue._claim_job()
+
+    await queue._fail("email-1", "boom")
+
+    assert await queue.redis.zcard(queue.inflight_key) == 0
+    assert await queue.redis.zscore(queue.delayed_key, "email-1") is not None
+    assert await queue.redis.hexists(queue.jobs_key, "email-1")
+
+async def test_fail_ignores_jobs_no_longer_in_flight(queue):
+    await queue.enqueue("email-1")
+    claim = await queue._claim_job()
+    await queue._ack(claim)
+
+    await queue._fail("email-1", "late failure", claim)
+
+    assert await queue.redis.zcard(queue.delayed_key) == 0
+    assert await queue.redis.hlen(queue.dead_key) == 0
+
+async def test_retry_is_claimed_again_after_delay(queue, monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_QUEUE_MAX_ATTEMPTS", 3)
+    await queue.enqueue("email-1")
+    await queue._claim_job()
+    await queue._fail("email-1", "boom")
+
+    await queue._promote_delayed(time.time() + settings.ANALYSIS_QUEUE_RETRY_MAX_DELAY)
+
+    assert (await queue._claim_job()).attempt == 2
+
+async def test_exhausted_job_moves_to_dead_letter(queue, monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_QUEUE_MAX_ATTEMPTS", 1)
+    await queue.enqueue("email-1")
+    await queue._claim_job()
+
+    await queue._fail("email-1", "boom")
+
+    record = json.loads(await queue.redis.hget(queue.dead_key, "email-1"))
+    assert record["attempts"] == 1
+    assert record["error"] == "boom"
+    assert await queue.redis.zcard(queue.delayed_key) == 0
+    assert await queue.enqueue("email-1") is False
+
+    assert await queue.requeue_dead("email-1") is True
+    assert (await queue._claim_job()).job_id == "email-1"
+
+async def test_run_job_acks_on_success_and_retries_on_error(queue, monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_QUEUE_MAX_ATTEMPTS", 3)
+    await queue.enqueue_many(["ok", "bad"])
+
+    async def handler(job_id):
+        if job_id == "bad":
+            raise RuntimeError("analysis failed")
+
+    queue._handler = handler
+    await queue._run_job(await queue._claim_job())
+    await queue._run_job(await queue._claim_job())
+
+    assert not await queue.redis.hexists(queue.jobs_key, "ok")
+    assert await queue.redis.zscore(queue.delayed_key, "bad") is not None
+
+async def test_stats_reports_oldest_job_age(queue):
+    await queue.enqueue_many(["email-1", "email-2"])
+    await queue._claim_job()
+
+    stats = await queue.stats()
+
+    assert stats["depth"] == 1
+    assert stats["in_flight"] == 1
+    assert stats["oldest_job_age_seconds"] >= 0
+
+async def test_late_ack_of_expired_claim_keeps_rescheduled_job(queue, monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_QUEUE_MAX_ATTEMPTS", 3)
+    await queue.enqueue("email-1")
+    expired = await queue._claim_job()
+    await queue._fail("email-1", "visibility timeout expired")
+    await queue._promote_delayed(time.time() + settings.ANALYSIS_QUEUE_RETRY_MAX_DELAY)
+    current = await queue._claim_job()
+
+    await queue._ack(expired)
+    await queue._fail("email-1", "late failure", expired)
+
+    assert await queue.redis.zscore(queue.inflight_key, "email-1") == current.deadline
+    assert await queue.redis.hget(queue.attempts_key, "email-1") == "2"
+    assert await queue.redis.zcard(queue.delayed_key) == 0
+
+    await queue._ack(current)
+    assert not await queue.redis.hexists(queue.jobs_key, "email-1")
+
+async def test_handler_times_out_before_visibility_deadline(queue, monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_QUEUE_VISIBILITY_TIMEOUT", 60.0)
+    monkeypatch.setattr(settings, "ANALYSIS_QUEUE_VISIBILITY_MARGIN", 15.0)
+    now = time.time()
+    claims = [Claim("email-1", 1, now + 30), Claim("email-2", 1, now + 60)]
+
+    assert 14 < queue._handler_timeout(claims[:1]) <= 15
+    assert 14 < queue._handler_timeout(claims) <= 15
+    assert queue._handler_timeout([Claim("email-3", 1, now + 5)]) == 0
@@ -0,0 +1,32 @@
+import os
+
+import pytest
+
+from app.services import content_reducer as reducer_module
+from app.services.content_reducer import ContentReducer, tokenizer_cache_path
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+def test_cache_dir_is_absolute():
+    assert os.path.isabs(os.environ["TIKTOKEN_CACHE_DIR"])
+
+def test_missing_cache_falls_back_without_downloading(cache_dir, monkeypatch):
+    def get_encoding(name):
+        raise AssertionError("tokenizer download attempted")
+
+    monkeypatch.setattr(reducer_module.tiktoken, "get_encoding", get_encoding)
+    reducer = ContentReducer("cl100k_base")
+
+    assert reducer.tokenizer == "heuristic"
+    assert reducer.count_tokens("hello world") == 2
+
+def test_cached_tokenizer_is_loaded(cache_dir, monkeypatch):
+    loaded = []
+    monkeypatch.setattr(reducer_module.tiktoken, "get_encoding", lambda name: loaded.append(name) or object())
+    (cache_dir / os.path.basename(tokenizer_cache_path("cl100k_base"))).write_text("")
+
+    assert ContentReducer("cl100k_base").tokenizer == "cl100k_base"
+    assert loaded == ["cl100k_base"]
@@ -0,0 +1,16 @@
+from datetime import date, datetime, timedelta, timezone
+
+from app.services.daily_aggregates import utc_day_bounds
+
+def test_rebuild_bounds_are_utc_days():
+    start, end = utc_day_bounds(date(2024, 3, 5))
+
+    assert start == datetime(2024, 3, 5, tzinfo=timezone.utc)
+    assert end - start == timedelta(days=1)
+
+def test_late_evening_email_elsewhere_falls_in_its_utc_day():
+    received_at = datetime(2024, 3, 5, 21, 0, tzinfo=timezone(timedelta(hours=-5)))
+    start, end = utc_day_bounds(received_at.astimezone(timezone.utc).date())
+
+    assert start == datetime(2024, 3, 6, tzinfo=timezone.utc)
+    assert start <= received_at < end
@@ -0,0 +1,93 @@
+from datetime import timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from app.core.config import settings
+from app.schemas.email import EmailCreate
+from app.services import email_ingestion
+
+EMAIL = EmailCreate(subject="Hello", sender_email="news@example.com", raw_content="Body")
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    async def ingest_emails(db, items, trace_ids=None):
+        calls.append(("session", db))
+        return [object()]
+
+    async def submit(email_data):
+        calls.append(("batcher", email_data))
+        return object()
+
+    monkeypatch.setattr(email_ingestion, "ingest_emails", ingest_emails)
+    monkeypatch.setattr(email_ingestion.ingest_batcher, "submit", submit)
+    monkeypatch.setattr(settings, "INGEST_MICRO_BATCH_ENABLED", True)
+    return calls
+
+async def test_ingest_email_writes_on_callers_session(calls):
+    db = object()
+
+    await email_ingestion.ingest_email(db, EMAIL)
+
+    assert calls == [("session", db)]
+
+async def test_submit_email_uses_group_commit(calls):
+    await email_ingestion.submit_email(EMAIL)
+
+    assert calls == [("batcher", EMAIL)]
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+class FakeSession:
+    def __init__(self):
+        self.committed = False
+
+    async def scalars(self, statement, rows):
+        return FakeResult([
+            SimpleNamespace(id=uuid4(), trace_id=None, **{k: v for k, v in row.items() if k != "trace_id"})
+            for row in rows
+        ])
+
+    async def commit(self):
+        self.committed = True
+
+async def test_redis_failure_after_commit_keeps_the_stored_email(monkeypatch):
+    async def record_received(db, emails):
+        pass
+
+    async def unavailable(*args):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(email_ingestion, "record_received", record_received)
+    monkeypatch.setattr(email_ingestion.analysis_queue, "enqueue_many", unavailable)
+    monkeypatch.setattr(email_ingestion.event_bus, "publish_many", unavailable)
+    db = FakeSession()
+
+    emails = await email_ingestion.ingest_emails(db, [EMAIL])
+
+    assert db.committed
+    assert [email.subject for email in emails] == ["Hello"]
+
+async def test_received_at_is_utc_aware(monkeypatch):
+    async def record_received(db, emails):
+        pass
+
+    async def accepted(*args):
+        return 1
+
+    monkeypatch.setattr(email_ingestion, "record_received", record_received)
+    monkeypatch.setattr(email_ingestion.analysis_queue, "enqueue_many", accepted)
+    monkeypatch.setattr(email_ingestion.event_bus, "publish_many", accepted)
+
+    emails = await email_ingestion.ingest_emails(FakeSession(), [EMAIL])
+
+    assert emails[0].received_at.utcoffset() == timedelta(0)
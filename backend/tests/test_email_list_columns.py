@@ -0,0 +1,33 @@
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.endpoints.emails import EMAIL_LIST_COLUMNS
+from app.models.analyzed_content import AnalyzedContent
+from app.models.email import Email
+from app.schemas.email import EmailListResponse
+
+BODY_COLUMNS = ["content_markdown", "key_points", "tags", "images", "important_links", "action_items"]
+
+def selected_columns(query) -> str:
+    sql = str(query.compile(dialect=postgresql.dialect()))
+    return sql.split("FROM", 1)[0]
+
+def test_email_list_query_projects_only_response_columns():
+    columns = selected_columns(select(*EMAIL_LIST_COLUMNS))
+
+    assert "raw_content" not in columns
+    assert "content_markdown" not in columns
+    assert [column.key for column in EMAIL_LIST_COLUMNS] == list(EmailListResponse.model_fields)
+
+def test_email_entity_defers_raw_content():
+    columns = selected_columns(select(Email))
+
+    assert "emails.subject" in columns
+    assert "raw_content" not in columns
+
+def test_analyzed_content_entity_defers_body_columns():
+    columns = selected_columns(select(AnalyzedContent))
+
+    assert "analyzed_content.summary" in columns
+    for name in BODY_COLUMNS + ["search_vector"]:
+        assert name not in columns
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services import email_processor
+from app.services.email_processor import EmailProcessor
+
+def slow_worker(raw_content):
+    time.sleep(2)
+    return "too late"
+
+def fast_worker(raw_content):
+    return raw_content.upper()
+
+@pytest.fixture
+def executor_mode(monkeypatch):
+    def use(mode):
+        monkeypatch.setattr(settings, "EMAIL_PROCESSOR_EXECUTOR", mode)
+        monkeypatch.setattr(settings, "EMAIL_PROCESSOR_WORKERS", 1)
+        monkeypatch.setattr(settings, "EMAIL_PROCESSOR_TIMEOUT", 0.2)
+        email_processor.shutdown_executor()
+
+    yield use
+    email_processor.shutdown_executor()
+
+async def test_timeout_kills_stuck_process_worker(executor_mode):
+    executor_mode("process")
+    processor = EmailProcessor()
+    executor = email_processor.get_executor()
+    await asyncio.get_running_loop().run_in_executor(executor, fast_worker, "warm")
+    stuck = list(executor._processes.values())
+
+    result = await processor._execute("<p>hello</p>", slow_worker, fast_worker, processor._fallback_text)
+
+    assert result == "hello"
+    assert email_processor.get_executor() is not executor
+    for process in stuck:
+        process.join(timeout=2)
+        assert not process.is_alive()
+    assert await processor._execute("next", fast_worker, fast_worker, processor._fallback_text) == "NEXT"
+
+async def test_timeout_replaces_thread_pool_and_runs_fallback_off_loop(executor_mode, monkeypatch):
+    executor_mode("thread")
+    processor = EmailProcessor()
+    executor = email_processor.get_executor()
+    fallback_threads = []
+
+    def fallback(raw_content):
+        fallback_threads.append(threading.current_thread())
+        return "fallback"
+
+    result = await processor._execute("text", slow_worker, fast_worker, fallback)
+
+    assert result == "fallback"
+    assert fallback_threads[0] is not threading.main_thread()
+    assert email_processor.get_executor() is not executor
+    assert await processor._execute("next", fast_worker, fast_worker, fallback) == "NEXT"
+
+async def test_oversized_input_uses_fallback_off_loop(executor_mode, monkeypatch):
+    executor_mode("thread")
+    monkeypatch.setattr(settings, "EMAIL_PROCESSOR_MAX_INPUT_CHARS", 10)
+    processor = EmailProcessor()
+    fallback_threads = []
+
+    def fallback(raw_content):
+        fallback_threads.append(threading.current_thread())
+        return raw_content
+
+    result = await processor._execute("x" * 50, fast_worker, fast_worker, fallback)
+
+    assert result == "x" * 10
+    assert fallback_threads[0] is not threading.main_thread()
@@ -0,0 +1,65 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.core.config import settings
+from app.services import email_ingestion
+from app.services.email_receiver import EmailHandler
+
+MESSAGE = b"From: Newsletter <news@example.com>\r\nSubject: Hello\r\n\r\nBody text\r\n"
+
+@pytest.fixture
+async def handler(monkeypatch):
+    monkeypatch.setattr(settings, "ALLOWED_SENDERS", [])
+    async with httpx.AsyncClient() as client:
+        yield EmailHandler(client=client, ingest_mode="direct")
+
+def envelope():
+    return SimpleNamespace(mail_from="news@example.com", content=MESSAGE)
+
+async def test_redis_outage_during_capacity_check_defers_mail(handler, monkeypatch):
+    async def depth():
+        raise RedisConnectionError("Connection refused")
+
+    monkeypatch.setattr(email_ingestion.analysis_queue, "depth", depth)
+
+    response = await handler.handle_DATA(None, None, envelope())
+
+    assert response.startswith("451 ")
+
+async def test_full_queue_defers_mail(handler, monkeypatch):
+    async def depth():
+        return settings.INGEST_MAX_QUEUE_DEPTH
+
+    monkeypatch.setattr(email_ingestion.analysis_queue, "depth", depth)
+
+    response = await handler.handle_DATA(None, None, envelope())
+
+    assert response.startswith("451 ")
+
+async def test_unauthorized_sender_is_rejected(handler, monkeypatch):
+    monkeypatch.setattr(settings, "ALLOWED_SENDERS", ["trusted@example.com"])
+
+    response = await handler.handle_DATA(None, None, envelope())
+
+    assert response.startswith("550 ")
+
+async def test_controller_thread_hands_messages_to_the_app_loop(monkeypatch):
+    monkeypatch.setattr(settings, "ALLOWED_SENDERS", [])
+    app_loop = asyncio.get_running_loop()
+    loops = []
+
+    async def ingest(email_data):
+        loops.append(asyncio.get_running_loop())
+
+    async with httpx.AsyncClient() as client:
+        handler = EmailHandler(client=client, ingest_mode="direct", loop=app_loop)
+        monkeypatch.setattr(handler, "_ingest_direct", ingest)
+
+        response = await asyncio.to_thread(asyncio.run, handler.handle_DATA(None, None, envelope()))
+
+    assert response.startswith("250 ")
+    assert loops == [app_loop]
@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import pytest
+
+from app.core.config import settings
+from app.services.content_extractor import extract_from_html
+from app.services.email_processor import EmailProcessor
+from app.services.html_cleaner import LxmlMarkdownCleaner
+
+FIXTURES_DIR = Path(__file__).parent.parent / "benchmarks" / "fixtures"
+FIXTURES = sorted(FIXTURES_DIR.glob("*.html"))
+
+def convert(engine: str, document: str, monkeypatch) -> str:
+    monkeypatch.setattr(settings, "HTML_CLEANER_ENGINE", engine)
+    return EmailProcessor()._process_sync(document)
+
+@pytest.mark.parametrize("fixture", FIXTURES, ids=lambda path: path.name)
+def test_lxml_matches_html2text(fixture, monkeypatch):
+    document = fixture.read_text(encoding="utf-8")
+
+    assert convert("lxml", document, monkeypatch) == convert("html2text", document, monkeypatch)
+
+@pytest.mark.parametrize("fixture", FIXTURES, ids=lambda path: path.name)
+def test_lxml_and_soup_extract_same_links_and_images(fixture):
+    document = fixture.read_text(encoding="utf-8")
+
+    assert extract_from_html(document, use_lxml=True) == extract_from_html(document, use_lxml=False)
+
+def test_xml_declaration_is_converted_not_returned_raw(monkeypatch):
+    document = (FIXTURES_DIR / "xhtml_newsletter.html").read_text(encoding="utf-8")
+
+    markdown = convert("lxml", document, monkeypatch)
+
+    assert "<?xml" not in markdown
+    assert "<table" not in markdown
+    assert "# Product Weekly" in markdown
+    assert "[Version 4.2](https://example.com/releases/4-2)" in markdown
+
+def test_lxml_errors_fall_back_to_html2text(monkeypatch):
+    document = "<html><body><p>Hello <b>reader</b></p></body></html>"
+
+    def broken(self, raw_html, converter):
+        raise ValueError("unparseable")
+
+    expected = convert("html2text", document, monkeypatch)
+    monkeypatch.setattr(LxmlMarkdownCleaner, "convert", broken)
+
+    assert convert("lxml", document, monkeypatch) == expected
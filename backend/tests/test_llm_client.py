@@ -0,0 +1,257 @@
+import asyncio
+import json
+import time
+from email.utils import formatdate
+
+import httpx
+import pytest
+
+from app.services.llm_client import (
+    CircuitBreaker,
+    LLMClient,
+    LLMUnavailableError,
+    TokenBucket,
+    _parse_reset,
+    _parse_retry_after
+)
+
+PRIMARY = "primary/model"
+HEDGE = "hedge/model"
+
+def make_client(**overrides) -> LLMClient:
+    options = dict(
+        base_url="http://llm.test",
+        api_key="test",
+        requests_per_minute=6000,
+        tokens_per_minute=10_000_000,
+        max_retries=2,
+        retry_base_delay=0.01,
+        retry_max_delay=1.0,
+        request_timeout=5.0,
+        hedge_model=None,
+        hedge_min_samples=1,
+        hedge_min_delay=0.05,
+        breaker_failure_threshold=3,
+        breaker_reset_timeout=60.0,
+        stats_window=100
+    )
+    options.update(overrides)
+    return LLMClient(**options)
+
+def completion(content: str = "ok") -> httpx.Response:
+    return httpx.Response(200, json={
+        "choices": [{"message": {"content": content}}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+    })
+
+async def complete(llm: LLMClient, client: httpx.AsyncClient, model: str = PRIMARY) -> str:
+    return await llm.complete(
+        client, model, messages=[{"role": "user", "content": "hi"}], max_tokens=10, estimated_tokens=10
+    )
+
+def open_half(breaker: CircuitBreaker):
+    breaker.failures = breaker.failure_threshold
+    breaker.opened_at = time.monotonic() - breaker.reset_timeout
+
+def test_breaker_opens_after_threshold_and_allows_one_probe():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    breaker.opened_at -= 60
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+def test_failed_probe_reopens_and_successful_probe_closes():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    open_half(breaker)
+
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    breaker.opened_at -= 60
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+
+def test_only_the_probe_holder_releases_the_probe():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    admitted_while_closed = breaker.allow()
+    open_half(breaker)
+    probe = breaker.allow()
+
+    breaker.release_probe(admitted_while_closed)
+    breaker.release_probe(None)
+    assert not breaker.allow()
+
+    breaker.release_probe(probe)
+    assert breaker.allow()
+
+async def test_concurrent_call_does_not_release_the_probe():
+    release = asyncio.Event()
+
+    async def handler(request):
+        await release.wait()
+        return httpx.Response(400)
+
+    llm = make_client()
+    breaker = llm._breaker(PRIMARY)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        in_flight = asyncio.create_task(complete(llm, client))
+        await asyncio.sleep(0.01)
+        open_half(breaker)
+        assert breaker.allow()
+
+        release.set()
+        with pytest.raises(httpx.HTTPStatusError):
+            await in_flight
+
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+
+async def test_cancelled_probe_releases_half_open_breaker():
+    started = asyncio.Event()
+
+    async def handler(request):
+        started.set()
+        await asyncio.sleep(10)
+        return completion()
+
+    llm = make_client()
+    breaker = llm._breaker(PRIMARY)
+    open_half(breaker)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        call = asyncio.create_task(complete(llm, client))
+        await started.wait()
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+async def test_primary_is_probed_again_after_hedge_wins():
+    calls = []
+
+    async def handler(request):
+        model = json.loads(request.content)["model"]
+        calls.append(model)
+        if model == PRIMARY:
+            await asyncio.sleep(10)
+        return completion(model)
+
+    llm = make_client(hedge_model=HEDGE)
+    llm._model_stats(PRIMARY).latencies.append(0.01)
+    breaker = llm._breaker(PRIMARY)
+    open_half(breaker)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        assert await complete(llm, client) == HEDGE
+        await asyncio.sleep(0)
+
+        assert not breaker.probing
+        assert breaker.allow()
+    assert calls == [PRIMARY, HEDGE]
+    assert llm._model_stats(PRIMARY).hedge_wins == 1
+
+async def test_rate_limited_probe_releases_breaker():
+    async def handler(request):
+        return httpx.Response(429, headers={"Retry-After": "0"})
+
+    llm = make_client()
+    breaker = llm._breaker(PRIMARY)
+    open_half(breaker)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        with pytest.raises(LLMUnavailableError):
+            await complete(llm, client)
+
+    assert breaker.allow()
+
+async def test_retries_transient_errors_then_succeeds():
+    responses = [httpx.Response(503), httpx.Response(429, headers={"Retry-After": "0"}), completion("done")]
+
+    async def handler(request):
+        return responses.pop(0)
+
+    llm = make_client()
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        assert await complete(llm, client) == "done"
+
+    stats = llm._model_stats(PRIMARY)
+    assert stats.retries == 2
+    assert stats.rate_limited == 1
+    assert llm._breaker(PRIMARY).state == "closed"
+
+async def test_open_circuit_fails_fast_without_request():
+    async def handler(request):
+        raise AssertionError("request sent while circuit is open")
+
+    llm = make_client(breaker_failure_threshold=1)
+    llm._breaker(PRIMARY).record_failure()
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        with pytest.raises(LLMUnavailableError):
+            await complete(llm, client)
+
+async def test_bucket_waits_for_refill():
+    bucket = TokenBucket(per_minute=600)
+    await bucket.acquire(600)
+
+    started = time.monotonic()
+    await bucket.acquire(1)
+
+    assert time.monotonic() - started >= 0.08
+    assert bucket.waited > 0
+
+async def test_bucket_pause_blocks_until_deadline():
+    bucket = TokenBucket(per_minute=6000)
+    bucket.pause(0.1)
+
+    started = time.monotonic()
+    await bucket.acquire(1)
+
+    assert time.monotonic() - started >= 0.09
+
+def test_bucket_throttle_and_recover_stay_within_bounds():
+    bucket = TokenBucket(per_minute=60, min_fraction=0.25)
+
+    for _ in range(5):
+        bucket.throttle()
+    assert bucket.rate == pytest.approx(bucket.limit * 0.25)
+
+    for _ in range(100):
+        bucket.recover()
+    assert bucket.rate == pytest.approx(bucket.limit)
+
+def test_bucket_clamps_oversized_requests_and_refunds():
+    bucket = TokenBucket(per_minute=60)
+    bucket.level = 0
+    bucket.refund(1000)
+
+    assert bucket.level == bucket.capacity
+
+def test_parse_retry_after():
+    assert _parse_retry_after("2.5") == 2.5
+    assert _parse_retry_after("-1") == 0.0
+    assert 0 < _parse_retry_after(formatdate(time.time() + 30, usegmt=True)) <= 30
+    assert _parse_retry_after("soon") is None
+    assert _parse_retry_after(None) is None
+
+def test_parse_reset():
+    assert _parse_reset("1m30s") == 90
+    assert _parse_reset("250ms") == pytest.approx(0.25)
+    assert _parse_reset("12") == 12
+    assert 0 < _parse_reset(str(time.time() + 20)) <= 20
+    assert 0 < _parse_reset(str((time.time() + 20) * 1000)) <= 20
+    assert _parse_reset("later") is None
@@ -0,0 +1,115 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from app.services import email_pipeline
+from app.services.near_duplicates import NearDuplicateIndex, estimate_similarity, minhash
+
+TEXT = " ".join(f"word{i}" for i in range(200))
+
+@pytest.fixture
+async def redis():
+    redis = FakeAsyncRedis(decode_responses=True)
+    yield redis
+    await redis.flushall()
+    await redis.aclose()
+
+def make_index(redis, max_candidates=64):
+    return NearDuplicateIndex(
+        redis, threshold=0.75, bands=16, window=3600, max_candidates=max_candidates, prefix="test_dedup"
+    )
+
+def test_minhash_tracks_jaccard_similarity():
+    near = minhash(TEXT + " footer unsubscribe")
+    unrelated = minhash(" ".join(f"other{i}" for i in range(200)))
+
+    assert estimate_similarity(minhash(TEXT), near) >= 0.75
+    assert estimate_similarity(minhash(TEXT), unrelated) < 0.25
+
+def test_minhash_skips_short_text():
+    assert minhash("too short") is None
+
+async def test_find_returns_indexed_near_duplicate(redis):
+    index = make_index(redis)
+    await index.add("original", minhash(TEXT))
+
+    assert await index.find(minhash(TEXT + " footer unsubscribe")) == "original"
+    assert await index.find(minhash(TEXT), exclude="original") is None
+
+async def test_find_keeps_candidates_with_most_band_hits(redis):
+    index = make_index(redis, max_candidates=1)
+    signature = minhash(TEXT)
+    weak = list(signature)
+    weak[2:] = [value ^ 1 for value in weak[2:]]
+    await index.add("weak", weak)
+    await index.add("original", signature)
+    for i in range(30):
+        await index.add(f"weak-{i}", weak)
+
+    assert await index.find(signature) == "original"
+
+class FakeResult:
+    def __init__(self, row):
+        self.row = row
+
+    def first(self):
+        return self.row
+
+class FakeSession:
+    def __init__(self, row):
+        self.row = row
+
+    async def execute(self, statement):
+        return FakeResult(self.row)
+
+@pytest.fixture
+def duplicate_of(monkeypatch):
+    original = str(uuid4())
+
+    async def find(signature, exclude=None):
+        return original
+
+    monkeypatch.setattr(email_pipeline.near_duplicate_index, "find", find)
+    return original
+
+async def test_unanalyzed_original_is_not_marked_as_duplicate(duplicate_of):
+    email = SimpleNamespace(id=uuid4(), duplicate_of_id=None)
+
+    assert await email_pipeline._reuse_duplicate_analysis(FakeSession(None), email, [1, 2]) is None
+    assert email.duplicate_of_id is None
+
+async def test_duplicate_reuses_original_analysis(duplicate_of):
+    email = SimpleNamespace(id=uuid4(), duplicate_of_id=None)
+    content = SimpleNamespace(
+        importance_score=8, title_optimized="Title", summary="Summary", content_markdown="Body",
+        key_points=["a"], tags=None, images=None, important_links=None, reading_time=2,
+        sentiment="neutral", action_items=None
+    )
+
+    analysis = await email_pipeline._reuse_duplicate_analysis(FakeSession((content, "TECH")), email, [1, 2])
+
+    assert str(email.duplicate_of_id) == duplicate_of
+    assert analysis["category"] == "TECH"
+    assert analysis["summary"] == "Summary"
+    assert analysis["tags"] == []
+    assert analysis["source"] == "duplicate"
+
+async def test_only_originals_are_indexed(monkeypatch):
+    added = []
+
+    async def add(email_id, signature):
+        added.append(email_id)
+
+    monkeypatch.setattr(email_pipeline.near_duplicate_index, "add", add)
+    original = SimpleNamespace(id=uuid4(), duplicate_of_id=None)
+    duplicate = SimpleNamespace(id=uuid4(), duplicate_of_id=original.id)
+    unsigned = SimpleNamespace(id=uuid4(), duplicate_of_id=None)
+
+    await email_pipeline._index_originals(
+        [original, duplicate, unsigned],
+        {original.id: [1], duplicate.id: [1], unsigned.id: None}
+    )
+
+    assert added == [str(original.id)]
@@ -0,0 +1,67 @@
+import base64
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.core.pagination import InvalidCursorError, apply_keyset, build_page, decode_cursor, encode_cursor
+from app.models.email import Email
+
+def test_cursor_round_trips_datetime_and_uuid():
+    received_at = datetime(2024, 1, 2, 3, 4, 5, 678901)
+    email_id = uuid4()
+
+    cursor = encode_cursor(received_at, email_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, [datetime, UUID]) == [received_at, email_id]
+
+def test_cursor_round_trips_numbers_and_strings():
+    cursor = encode_cursor(0.125, "a/b+c", 7)
+
+    assert decode_cursor(cursor, [float, str, int]) == [0.125, "a/b+c", 7]
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"{not json").decode(),
+    base64.urlsafe_b64encode(b'{"a": 1}').decode(),
+    encode_cursor("not a date", str(uuid4())),
+    encode_cursor(datetime(2024, 1, 1).isoformat(), "not a uuid")
+])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, [datetime, UUID])
+
+def test_cursor_with_wrong_arity_is_rejected():
+    with pytest.raises(InvalidCursorError, match="sort key"):
+        decode_cursor(encode_cursor(datetime(2024, 1, 1)), [datetime, UUID])
+
+def test_build_page_returns_cursor_only_when_more_rows_exist():
+    rows = [SimpleNamespace(received_at=datetime(2024, 1, day), id=uuid4()) for day in range(3, 0, -1)]
+    key = lambda row: (row.received_at, row.id)
+
+    items, next_cursor = build_page(rows, 2, key)
+    assert items == rows[:2]
+    assert decode_cursor(next_cursor, [datetime, UUID]) == [rows[1].received_at, rows[1].id]
+
+    items, next_cursor = build_page(rows[:2], 2, key)
+    assert items == rows[:2]
+    assert next_cursor is None
+
+    assert build_page([], 2, key) == ([], None)
+
+def test_apply_keyset_seeks_past_cursor_and_fetches_one_extra_row():
+    cursor = encode_cursor(datetime(2024, 1, 1), uuid4())
+
+    query = apply_keyset(
+        select(Email.id), [Email.received_at, Email.id], [datetime, UUID], cursor, 20
+    )
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert "(emails.received_at, emails.id) < (" in sql
+    assert "ORDER BY emails.received_at DESC, emails.id DESC" in sql
+    assert "LIMIT" in sql
+    assert query._limit_clause.value == 21
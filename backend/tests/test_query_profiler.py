@@ -0,0 +1,30 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.query_profiler import QueryProfiler, normalize_sql
+
+@pytest.fixture
+def profiler():
+    engine = create_engine("sqlite://")
+    profiler = QueryProfiler(slow_threshold_ms=1000, top_n=10, max_statements=100, request_warn_threshold=50)
+    profiler.install(engine)
+    yield profiler, engine
+    engine.dispose()
+
+def test_failed_statement_does_not_skew_later_timings(profiler):
+    profiler, engine = profiler
+
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing_table"))
+        conn.execute(text("SELECT 1"))
+        assert not any(key == "query_started" for key in conn.info)
+
+    statements = {item["sql"]: item for item in profiler.snapshot()["top_statements"]}
+    assert set(statements) == {"SELECT ?"}
+    assert statements["SELECT ?"]["count"] == 1
+    assert statements["SELECT ?"]["max_ms"] < 1000
+
+def test_normalize_sql_collapses_literals_and_value_lists():
+    assert normalize_sql("SELECT * FROM t WHERE a = 'x' AND b IN (1, 2,  3)") == "SELECT * FROM t WHERE a = ? AND b IN (?, ...)"
@@ -0,0 +1,133 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from app.core.cache import ResponseCache
+
+class FakeSession:
+    def __init__(self):
+        self.closed = False
+
+class FakeSessionFactory:
+    def __init__(self):
+        self.sessions = []
+
+    @asynccontextmanager
+    async def __call__(self):
+        session = FakeSession()
+        self.sessions.append(session)
+        try:
+            yield session
+        finally:
+            session.closed = True
+
+@pytest.fixture
+async def cache():
+    redis = FakeAsyncRedis(decode_responses=True)
+    yield ResponseCache(redis, max_entries=100, local_ttl=5, lock_timeout=1, prefix="test_cache")
+    await redis.aclose()
+
+async def test_loader_gets_its_own_session(cache):
+    factory = FakeSessionFactory()
+    seen = []
+
+    async def load(db):
+        seen.append(db)
+        return {"value": 1}
+
+    assert await cache.get_or_load("things", "all", 60, load, factory) == {"value": 1}
+    assert seen == factory.sessions
+    assert seen[0].closed
+
+async def test_cancelled_first_caller_does_not_break_shared_load(cache):
+    factory = FakeSessionFactory()
+    release = asyncio.Event()
+    closed_during_load = []
+
+    async def load(db):
+        await release.wait()
+        closed_during_load.append(db.closed)
+        return {"value": 1}
+
+    first = asyncio.create_task(cache.get_or_load("things", "all", 60, load, factory))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(cache.get_or_load("things", "all", 60, load, factory))
+    await asyncio.sleep(0.01)
+
+    first.cancel()
+    await asyncio.sleep(0.01)
+    release.set()
+
+    assert await second == {"value": 1}
+    assert first.cancelled()
+    assert closed_during_load == [False]
+    assert len(factory.sessions) == 1
+
+async def test_cached_value_is_served_without_opening_a_session(cache):
+    factory = FakeSessionFactory()
+
+    async def load(db):
+        return {"value": len(factory.sessions)}
+
+    await cache.get_or_load("things", "all", 60, load, factory)
+    assert await cache.get_or_load("things", "all", 60, load, factory) == {"value": 1}
+    assert len(factory.sessions) == 1
+
+async def test_invalidate_forces_reload(cache, monkeypatch):
+    factory = FakeSessionFactory()
+    monkeypatch.setattr("app.core.cache.AsyncSessionLocal", factory)
+
+    async def load(db):
+        return {"value": len(factory.sessions)}
+
+    await cache.get_or_load("things", "all", 60, load, factory)
+    await cache.invalidate("things")
+
+    assert await cache.get_or_load("things", "all", 60, load, factory) == {"value": 2}
+
+async def test_bypass_neither_reads_nor_populates(cache):
+    factory = FakeSessionFactory()
+
+    async def load(db):
+        return {"value": len(factory.sessions)}
+
+    await cache.get_or_load("things", "all", 60, load, factory)
+
+    assert await cache.get_or_load("things", "all", 60, load, factory, bypass=True) == {"value": 2}
+    assert await cache.get_or_load("things", "all", 60, load, factory) == {"value": 1}
+
+async def test_load_started_before_invalidate_is_not_cached(cache):
+    factory = FakeSessionFactory()
+    release = asyncio.Event()
+
+    async def stale(db):
+        await release.wait()
+        return {"value": "stale"}
+
+    async def fresh(db):
+        return {"value": "fresh"}
+
+    pending = asyncio.create_task(cache.get_or_load("things", "all", 60, stale, factory))
+    await asyncio.sleep(0.01)
+    await cache.invalidate("things")
+    release.set()
+
+    assert await pending == {"value": "stale"}
+    assert await cache.get_or_load("things", "all", 60, fresh, factory) == {"value": "fresh"}
+
+async def test_load_after_invalidate_uses_primary(cache, monkeypatch):
+    primary = FakeSessionFactory()
+    replica = FakeSessionFactory()
+    monkeypatch.setattr("app.core.cache.AsyncSessionLocal", primary)
+
+    async def load(db):
+        return {"value": 1}
+
+    await cache.get_or_load("things", "before", 60, load, replica)
+    await cache.invalidate("things")
+    await cache.get_or_load("things", "after", 60, load, replica)
+
+    assert len(replica.sessions) == 1
+    assert len(primary.sessions) == 1
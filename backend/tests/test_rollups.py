@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.dialects import postgresql
+
+from app.models.email import Email
+from app.services.rollups import _rollup_keys, truncate, utc_bucket
+
+def test_truncate_keeps_utc_timezone():
+    value = datetime(2024, 3, 5, 23, 47, 12, tzinfo=timezone.utc)
+
+    assert truncate(value, "hour") == datetime(2024, 3, 5, 23, tzinfo=timezone.utc)
+    assert truncate(value, "day") == datetime(2024, 3, 5, tzinfo=timezone.utc)
+
+def test_rollup_keys_bucket_by_utc_day():
+    received_at = datetime(2024, 3, 6, 1, 30, tzinfo=timezone(timedelta(hours=5))).astimezone(timezone.utc)
+
+    assert [key[1] for key in _rollup_keys(received_at, "total", "")] == [
+        datetime(2024, 3, 5, 20, tzinfo=timezone.utc),
+        datetime(2024, 3, 5, tzinfo=timezone.utc)
+    ]
+
+def test_rebuild_buckets_in_utc_regardless_of_session_timezone():
+    sql = str(utc_bucket("day", Email.received_at).compile(dialect=postgresql.dialect()))
+
+    assert sql == (
+        "timezone(%(timezone_1)s, date_trunc(%(date_trunc_1)s, timezone(%(timezone_2)s, emails.received_at)))"
+    )
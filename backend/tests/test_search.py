@@ -0,0 +1,130 @@
+import os
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.api.v1.endpoints.search import search, sender_filter
+from app.core.database import Base
+from app.core.pagination import apply_keyset, build_page
+from app.models.analyzed_content import ANALYZED_CONTENT_DDL, SEARCH_VECTOR_DDL, AnalyzedContent
+from app.models.category import Category
+from app.models.email import Email
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+def compile_filter(sender: str):
+    return select(Email.id).where(sender_filter(sender)).compile(dialect=postgresql.dialect())
+
+def test_search_trigger_ddl_is_idempotent_without_dropping():
+    ddl = "\n".join(SEARCH_VECTOR_DDL)
+
+    assert "DROP TRIGGER" not in ddl
+    assert "pg_trigger" in ddl
+    trigger_block = SEARCH_VECTOR_DDL[-1]
+    assert trigger_block.index("IF NOT EXISTS") < trigger_block.index("CREATE TRIGGER")
+    assert trigger_block.index("CREATE TRIGGER") < trigger_block.index("UPDATE analyzed_content")
+    assert trigger_block.index("UPDATE analyzed_content") < trigger_block.index("END IF")
+
+def test_sender_domain_filter_escapes_like_wildcards():
+    compiled = compile_filter("Exa_mple%.com")
+
+    assert "LIKE '%%' || %(lower_1)s ESCAPE '/'" in str(compiled)
+    assert list(compiled.params.values()) == ["@exa/_mple/%.com"]
+
+def test_full_sender_address_is_matched_exactly():
+    compiled = compile_filter("News@Example.com")
+
+    assert "LIKE" not in str(compiled)
+    assert list(compiled.params.values()) == ["news@example.com"]
+
+@pytest.fixture
+def sqlite_emails():
+    engine = create_engine("sqlite://")
+    Email.__table__.create(engine)
+    yield engine
+    engine.dispose()
+
+def test_sender_domain_filter_treats_wildcards_literally(sqlite_emails):
+    senders = ["a@exa_mple%.com", "B@EXA_MPLE%.COM", "c@exaxmplexyz.com", "d@sub.exa_mple%.com"]
+    with sqlite_emails.begin() as conn:
+        conn.execute(Email.__table__.insert(), [{"id": uuid4(), "sender_email": sender} for sender in senders])
+
+        matched = conn.scalars(select(Email.sender_email).where(sender_filter("Exa_mple%.com"))).all()
+
+    assert sorted(matched) == ["B@EXA_MPLE%.COM", "a@exa_mple%.com"]
+
+def test_keyset_pages_continue_across_equal_ranks(sqlite_emails):
+    subjects = ["aaa", "bbb", "ccc", "dd", "ee", "ff", "g"]
+    with sqlite_emails.begin() as conn:
+        conn.execute(
+            Email.__table__.insert(),
+            [{"id": uuid4(), "sender_email": "news@example.com", "subject": subject} for subject in subjects]
+        )
+
+        rank = (func.length(Email.subject) * 0.1).label("rank")
+        seen, cursor = [], None
+        while True:
+            query = apply_keyset(select(Email.id, rank), [rank, Email.id], [float, UUID], cursor, 2)
+            rows, cursor = build_page(conn.execute(query).all(), 2, lambda row: (row.rank, row.id))
+            seen.extend(rows)
+            if cursor is None:
+                break
+
+    assert len(seen) == len(subjects)
+    assert len({row.id for row in seen}) == len(subjects)
+    assert [(row.rank, row.id) for row in seen] == sorted(((row.rank, row.id) for row in seen), reverse=True)
+
+@pytest.fixture
+async def pg_session():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    engine = create_async_engine(TEST_DATABASE_URL)
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        await conn.run_sync(
+            Base.metadata.create_all,
+            tables=[Category.__table__, Email.__table__, AnalyzedContent.__table__]
+        )
+        for statement in ANALYZED_CONTENT_DDL + SEARCH_VECTOR_DDL:
+            await conn.execute(text(statement))
+
+        session = AsyncSession(bind=conn, expire_on_commit=False)
+        try:
+            yield session
+        finally:
+            await session.close()
+            await transaction.rollback()
+    await engine.dispose()
+
+async def run_search(db, q, cursor=None, limit=2):
+    return await search(
+        q=q, category=None, sender=None, date_from=None, date_to=None,
+        sort="relevance", limit=limit, cursor=cursor, db=db
+    )
+
+async def test_search_ranks_title_matches_first_and_pages_through_ties(pg_session):
+    strong = Email(subject="Release notes", sender_email="news@example.com")
+    pg_session.add(strong)
+    pg_session.add(AnalyzedContent(email=strong, title_optimized="Model release", summary="The release is out"))
+    for i in range(5):
+        email = Email(subject=f"Weekly digest {i}", sender_email="digest@example.com")
+        pg_session.add(email)
+        pg_session.add(AnalyzedContent(email=email, title_optimized="Digest", summary="A new release shipped"))
+    await pg_session.flush()
+
+    hits, cursor = [], None
+    while True:
+        page = await run_search(pg_session, "release", cursor)
+        hits.extend(page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert hits[0].email_id == strong.id
+    assert len(hits) == 6
+    assert len({hit.id for hit in hits}) == 6
+    assert [(hit.rank, hit.id) for hit in hits] == sorted(((hit.rank, hit.id) for hit in hits), reverse=True)